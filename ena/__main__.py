@@ -3,10 +3,11 @@ Point d'entrée principal d'ENA
 """
 import argparse
 import sys
-import time
 from pathlib import Path
 from .utils.logger import Logger
 from .utils.config import Config
+from .utils.tick_scheduler import TickScheduler
+from .core.event_ring import EventRing
 from .core import (
     AIManager,
     BehaviorManager,
@@ -36,33 +37,55 @@ def main():
         config = Config(config_path)
         
         # Initialisation des gestionnaires
-        event_manager = EventManager()
-        world_manager = WorldManager(config)
+        event_manager = EventManager(config)
+        world_manager = WorldManager(config, event_manager)
         quest_manager = QuestManager(config)
         faction_manager = FactionManager(config)
         behavior_manager = BehaviorManager(config)
         ai_manager = AIManager(config)
+        world_manager.attach_managers(ai_manager, faction_manager)
         
         # Configuration des événements
         event_manager.subscribe("npc_spawn", world_manager.handle_npc_spawn)
-        event_manager.subscribe("npc_action", ai_manager.handle_npc_action)
+        event_manager.subscribe("npc_despawn", world_manager.handle_npc_despawn)
+        
+        # Événements fréquents livrés par lot une fois par tick (dernière position par PNJ)
+        event_manager.subscribe_batch("npc_move", world_manager.handle_npc_moves, key="id")
+        event_manager.subscribe_batch("npc_action", ai_manager.handle_npc_actions)
+        
+        # Files bornées pour les écouteurs asynchrones (dialogues, LLM...)
+        if config.get("events.async", False):
+            event_manager.start()
+            
+        # File en mémoire partagée alimentée par le jeu (plugin, scripts)
+        event_ring = None
+        if config.get("events.ring.enabled", False):
+            event_ring = EventRing(config.get("events.ring.name", "ena_events"), config.get("events.ring.capacity", 4096))
         
         logger.info("ENA initialisé avec succès")
         
-        # Variables pour le timing
-        last_time = time.time()
+        # Ordonnanceur à pas fixe : chaque gestionnaire à sa propre fréquence
+        scheduler = TickScheduler(config.get("performance.max_catch_up_ticks", 5))
+        scheduler.add_task("world", world_manager.update, config.get("world.update_rate", 0.2))
+        scheduler.add_task("ai", ai_manager.update, config.get("ai.update_rate", 0.1))
+        
+        for name, manager, rate_key in (
+            ("quests", quest_manager, "quests.quest_update_rate"),
+            ("factions", faction_manager, "factions.relation_update_rate")
+        ):
+            # Les gestionnaires sans mise à jour périodique ne sont pas planifiés
+            if hasattr(manager, "update"):
+                scheduler.add_task(name, manager.update, config.get(rate_key, 1.0))
         
         # Boucle principale
         while True:
             try:
-                # Calcul du delta time
-                current_time = time.time()
-                delta_time = current_time - last_time
-                last_time = current_time
-                
-                # Mise à jour des gestionnaires
-                world_manager.update(delta_time)
-                ai_manager.update(delta_time)
+                # Exécution des pas dus puis sommeil jusqu'à la prochaine échéance
+                if event_ring is not None:
+                    event_ring.drain(event_manager)
+                scheduler.run_pending()
+                event_manager.flush()
+                scheduler.sleep_until_next()
                 
             except KeyboardInterrupt:
                 logger.info("Arrêt d'ENA...")
@@ -72,8 +95,11 @@ def main():
                 logger.error(f"Erreur dans la boucle principale: {str(e)}")
                 continue
                 
-            # Petite pause pour éviter de surcharger le CPU
-            time.sleep(0.01)
+        # Arrêt des processus de calcul et libération de la mémoire partagée
+        event_manager.stop()
+        if event_ring is not None:
+            event_ring.close()
+        ai_manager.shutdown()
                 
     except Exception as e:
         logger.error(f"Erreur fatale: {str(e)}")
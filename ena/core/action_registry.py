@@ -0,0 +1,200 @@
+"""
+Registre des actions de PNJ, exécutées par lots
+"""
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+
+class ActionBatch:
+    """PNJ ayant choisi la même action pendant le tick.
+
+    Les accesseurs de champs vectoriels (position, rotation) fonctionnent
+    avec les deux backends d'état : lecture et écriture directe dans le
+    store colonnaire, ou dans les dictionnaires d'état sinon.
+    """
+
+    def __init__(self, manager: Any, action: str, npc_ids: List[str],
+                 slots: np.ndarray, delta_time: np.ndarray):
+        self.manager = manager
+        self.action = action
+        self.npc_ids = npc_ids
+        self.slots = slots
+        self.delta_time = delta_time
+
+    def __len__(self) -> int:
+        return len(self.npc_ids)
+
+    def states(self) -> List[Dict[str, Any]]:
+        """États des PNJ du lot."""
+        return [self.manager.states[npc_id] for npc_id in self.npc_ids]
+
+    def read(self, field: str) -> np.ndarray:
+        """Champ vectoriel (lignes × 3) des PNJ du lot, sous forme de copie."""
+        if self.manager.columnar:
+            return getattr(self.manager.store, field)[self.slots]
+        return np.array(
+            [self.manager.states[npc_id][field] for npc_id in self.npc_ids],
+            dtype=np.float64
+        ).reshape(len(self.npc_ids), -1)
+
+    def write(self, field: str, values: np.ndarray, rows: Optional[np.ndarray] = None) -> None:
+        """Écrit un champ vectoriel pour tout le lot ou pour certaines lignes."""
+        if rows is None:
+            rows = np.arange(len(self.npc_ids))
+        elif rows.dtype == bool:
+            rows = np.flatnonzero(rows)
+
+        if self.manager.columnar:
+            getattr(self.manager.store, field)[self.slots[rows]] = values[rows]
+        else:
+            for row in rows:
+                state = self.manager.states[self.npc_ids[row]]
+                if isinstance(state.get(field), list):
+                    # Le type de l'état est conservé
+                    state[field] = values[row].tolist()
+                else:
+                    state[field] = np.array(values[row])
+
+    def random(self, stream: str, width: int) -> np.ndarray:
+        """Tirages uniformes du tick, une ligne par PNJ (flux propre à chaque PNJ)."""
+        return self.manager.rng.uniform(stream, self.manager.rng_keys[self.slots], width)
+
+    def normal(self, stream: str, width: int) -> np.ndarray:
+        """Tirages normaux centrés réduits du tick, une ligne par PNJ."""
+        return self.manager.rng.normal(stream, self.manager.rng_keys[self.slots], width)
+
+ActionHandler = Callable[[ActionBatch], None]
+# Effet cumulé de n ticks d'une action (avance rapide), n donné par PNJ
+SummaryHandler = Callable[[ActionBatch, np.ndarray], None]
+
+class ActionRegistry:
+    """Association nom d'action -> gestionnaire recevant un lot de PNJ."""
+
+    def __init__(self, handlers: Optional[Dict[str, ActionHandler]] = None,
+                 summaries: Optional[Dict[str, SummaryHandler]] = None):
+        self.handlers: Dict[str, ActionHandler] = dict(handlers or {})
+        self.summaries: Dict[str, SummaryHandler] = dict(summaries or {})
+
+    def __contains__(self, action: str) -> bool:
+        return action in self.handlers
+
+    def register(self, names: Iterable[str], handler: ActionHandler) -> None:
+        """Associe un gestionnaire à un ou plusieurs noms d'action."""
+        if isinstance(names, str):
+            names = (names,)
+        for name in names:
+            self.handlers[name] = handler
+
+    def register_summary(self, names: Iterable[str], handler: SummaryHandler) -> None:
+        """Associe à une action le calcul de l'effet cumulé de plusieurs ticks."""
+        if isinstance(names, str):
+            names = (names,)
+        for name in names:
+            self.summaries[name] = handler
+
+    def unregister(self, name: str) -> None:
+        """Retire un gestionnaire."""
+        self.handlers.pop(name, None)
+        self.summaries.pop(name, None)
+
+    def action(self, *names: str) -> Callable[[ActionHandler], ActionHandler]:
+        """Décorateur enregistrant un gestionnaire sous un ou plusieurs noms."""
+        def decorator(handler: ActionHandler) -> ActionHandler:
+            self.register(names, handler)
+            return handler
+        return decorator
+
+    def summary(self, *names: str) -> Callable[[SummaryHandler], SummaryHandler]:
+        """Décorateur enregistrant l'effet cumulé d'une ou plusieurs actions."""
+        def decorator(handler: SummaryHandler) -> SummaryHandler:
+            self.register_summary(names, handler)
+            return handler
+        return decorator
+
+    def get(self, name: str) -> Optional[ActionHandler]:
+        """Gestionnaire d'une action (None si l'action n'a pas d'effet)."""
+        return self.handlers.get(name)
+
+    def get_summary(self, name: str) -> Optional[SummaryHandler]:
+        """Effet cumulé d'une action (None si l'action est ignorée en avance rapide)."""
+        return self.summaries.get(name)
+
+    def copy(self) -> "ActionRegistry":
+        """Copie indépendante (chaque AIManager peut ajouter ses actions)."""
+        return ActionRegistry(self.handlers, self.summaries)
+
+class ActionPlan:
+    """Actions à exécuter pendant un tick, regroupées par nom d'action."""
+
+    def __init__(self):
+        # Ordre de première apparition conservé : action -> (PNJ, emplacements, delta_time)
+        self.entries: Dict[str, Tuple[List[str], List[int], List[float]]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(npc_ids) for npc_ids, _, _ in self.entries.values())
+
+    def add(self, action: str, npc_id: str, slot: int, delta_time: float) -> None:
+        """Ajoute une action pour un PNJ."""
+        entry = self.entries.get(action)
+        if entry is None:
+            entry = ([], [], [])
+            self.entries[action] = entry
+        entry[0].append(npc_id)
+        entry[1].append(slot)
+        entry[2].append(delta_time)
+
+    def batches(self, manager: Any) -> Iterable[ActionBatch]:
+        """Lots à transmettre aux gestionnaires."""
+        for action, (npc_ids, slots, delta_times) in self.entries.items():
+            yield ActionBatch(
+                manager,
+                action,
+                npc_ids,
+                np.asarray(slots, dtype=np.intp),
+                np.asarray(delta_times, dtype=np.float64)
+            )
+
+# Actions intégrées ; register_action permet d'en ajouter sans modifier AIManager
+DEFAULT_ACTIONS = ActionRegistry()
+
+def register_action(*names: str) -> Callable[[ActionHandler], ActionHandler]:
+    """Décorateur ajoutant une action au registre par défaut."""
+    return DEFAULT_ACTIONS.action(*names)
+
+def register_summary(*names: str) -> Callable[[SummaryHandler], SummaryHandler]:
+    """Décorateur ajoutant l'effet cumulé d'une action au registre par défaut."""
+    return DEFAULT_ACTIONS.summary(*names)
+
+@register_action("look_around")
+def look_around(batch: ActionBatch) -> None:
+    """Rotation aléatoire, tirée du flux de chaque PNJ pour ce tick."""
+    draws = batch.random("ai.look_around", 1)
+    rotation = batch.read("rotation")
+    rotation[:, 1] += (draws[:, 0] * 60.0 - 30.0) * batch.delta_time
+    batch.write("rotation", rotation)
+
+@register_action("walk_random", "random_walk")
+def random_walk(batch: ActionBatch) -> None:
+    """Déplacement aléatoire à vitesse constante."""
+    direction = batch.random("ai.random_walk", 3) * 2.0 - 1.0
+    norm = np.linalg.norm(direction, axis=1)
+    moving = norm > 0
+    position = batch.read("position")
+    step = direction[moving] / norm[moving, None] * 2 * batch.delta_time[moving, None]
+    position[moving] += step
+    batch.write("position", position, moving)
+
+@register_summary("look_around")
+def look_around_summary(batch: ActionBatch, ticks: np.ndarray) -> None:
+    """n rotations uniformes de ±30 × dt : gaussienne d'écart-type 60 dt √(n / 12)."""
+    draws = batch.normal("ai.look_around", 1)
+    rotation = batch.read("rotation")
+    rotation[:, 1] += draws[:, 0] * 60.0 * batch.delta_time * np.sqrt(ticks / 12.0)
+    batch.write("rotation", rotation)
+
+@register_summary("walk_random", "random_walk")
+def random_walk_summary(batch: ActionBatch, ticks: np.ndarray) -> None:
+    """n pas de longueur 2 dt en direction aléatoire : gaussienne de variance n (2 dt)² / 3 par axe."""
+    draws = batch.normal("ai.random_walk", 3)
+    position = batch.read("position")
+    position += draws * (2 * batch.delta_time * np.sqrt(ticks / 3.0))[:, None]
+    batch.write("position", position)
@@ -1,7 +1,15 @@
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Sequence, Set
 import numpy as np
 from ..utils.logger import Logger
 from ..utils.config import Config
+from .npc_store import NPCStateStore, NPCStateView, EmotionView, EMOTIONS
+from .behavior_scorer import BehaviorScorer, state_signature
+from .dirty_tracker import DirtyTracker
+from .action_registry import ActionPlan, ActionBatch, ActionHandler, SummaryHandler, DEFAULT_ACTIONS
+from .lod_scheduler import LODScheduler
+from .parallel_tick import ParallelTickExecutor
+from ..utils.random_streams import SimulationRNG, entity_key
+from ..utils.shared_arrays import SharedArrays
 import time
 
 class AIManager:
@@ -16,43 +24,173 @@ class AIManager:
         self.memory = {}
         self.emotions = {}
         
+        # Emplacements des PNJ et backend colonnaire optionnel
+        self.columnar = config.get("ai.state_backend", "dict") == "columnar"
+        capacity = config.get("ai.max_npcs", 1000)
+        
+        # Tick parallèle : état colonnaire en mémoire partagée entre processus
+        self.parallel = None
+        allocator = None
+        if self.columnar and config.get("ai.parallel_tick", False):
+            allocator = SharedArrays()
+        self.store = NPCStateStore(capacity, allocator)
+        self.scorer = BehaviorScorer(self.store.capacity, allocator)
+        if allocator is not None:
+            workers = 1
+            if config.get("performance.threading.enabled", True):
+                workers = config.get("performance.threading.max_threads", 4)
+            self.parallel = ParallelTickExecutor(
+                allocator,
+                self.store.capacity,
+                workers,
+                config.get("ai.parallel_min_npcs", 2000)
+            )
+        self.rng = SimulationRNG(config.get("simulation.seed"))
+        # Clé aléatoire de chaque emplacement, dérivée de l'identifiant du PNJ
+        self.rng_keys = np.zeros(self.store.capacity, dtype=np.uint64)
+        
+        # Niveaux de détail : fréquence de mise à jour selon la distance
+        self.lod_enabled = config.get("ai.lod.enabled", True)
+        self.lod = LODScheduler(self.store.capacity, config.get("ai.lod.tiers"))
+        
+        # Réévaluation incrémentale : seuls les PNJ modifiés sont re-notés
+        self.incremental = config.get("ai.incremental_selection", True)
+        self.dirty = DirtyTracker(self.store.capacity, len(EMOTIONS), config.get("ai.emotion_epsilon", 0.05))
+        
+        # Gestionnaires d'actions, appelés une fois par action et par tick
+        self.actions = DEFAULT_ACTIONS.copy()
+        
     def register_npc(self, npc_id: str, npc_data: Dict[str, Any]) -> bool:
         """Enregistre un nouveau PNJ."""
+        allocated = False
         try:
+            if npc_id not in self.store and len(self.store) >= self.store.capacity and not self.columnar:
+                # Backend dict : ai.max_npcs n'est qu'une taille initiale
+                self._ensure_capacity(2 * self.store.capacity)
+            allocated = npc_id not in self.store
+            slot = self.store.allocate(npc_id)
+            self.rng_keys[slot] = entity_key(npc_id)
             self.npcs[npc_id] = npc_data
-            self.states[npc_id] = self._initialize_state(npc_data)
             self.behaviors[npc_id] = self._initialize_behaviors(npc_data)
             self.memory[npc_id] = []
-            self.emotions[npc_id] = {
-                "joy": 0.0,
-                "trust": 0.0,
-                "fear": 0.0,
-                "surprise": 0.0,
-                "sadness": 0.0,
-                "disgust": 0.0,
-                "anger": 0.0,
-                "anticipation": 0.0
-            }
+            self.scorer.set_behaviors(slot, self.behaviors[npc_id])
+            self.lod.reset(slot)
+            self.lod.important[slot] = bool(npc_data.get("important", npc_data.get("role") == "quest_giver"))
+            self.dirty.mark(slot)
+            
+            if self.columnar:
+                # L'état numérique est stocké dans les tableaux du store
+                state = NPCStateView(self.store, slot)
+                state.update(self._initialize_state(npc_data))
+                self.states[npc_id] = state
+                self.emotions[npc_id] = EmotionView(self.store, slot)
+            else:
+                self.states[npc_id] = self._initialize_state(npc_data)
+                self.emotions[npc_id] = {
+                    "joy": 0.0,
+                    "trust": 0.0,
+                    "fear": 0.0,
+                    "surprise": 0.0,
+                    "sadness": 0.0,
+                    "disgust": 0.0,
+                    "anger": 0.0,
+                    "anticipation": 0.0
+                }
             return True
         except Exception as e:
             self.logger.error(f"Erreur lors de l'enregistrement du PNJ {npc_id}: {str(e)}")
+            if allocated:
+                # Pas de PNJ à moitié enregistré : l'emplacement est rendu
+                for registry in (self.npcs, self.states, self.behaviors, self.memory, self.emotions):
+                    registry.pop(npc_id, None)
+                self.scorer.clear(self.store.release(npc_id))
+            return False
+            
+    def _ensure_capacity(self, capacity: int) -> None:
+        """Agrandit le store et les tableaux indexés par emplacement."""
+        self.store.ensure_capacity(capacity)
+        if capacity > len(self.rng_keys):
+            self.rng_keys = np.concatenate([self.rng_keys, np.zeros(capacity - len(self.rng_keys), dtype=np.uint64)])
+        self.scorer.ensure_capacity(capacity)
+        self.lod.ensure_capacity(capacity)
+        self.dirty.ensure_capacity(capacity)
+        
+    def unregister_npc(self, npc_id: str) -> bool:
+        """Retire un PNJ et libère son emplacement."""
+        if npc_id not in self.npcs:
             return False
             
+        for registry in (self.npcs, self.states, self.behaviors, self.memory, self.emotions):
+            registry.pop(npc_id, None)
+        slot = self.store.release(npc_id)
+        self.scorer.clear(slot)
+        return True
+        
+    def set_npc_importance(self, npc_id: str, important: bool) -> None:
+        """Marque un PNJ comme important (toujours mis à jour à pleine fréquence)."""
+        if npc_id in self.npcs:
+            self.lod.important[self.store.slot(npc_id)] = important
+            
+    def set_observers(self, positions: List[List[float]]) -> None:
+        """Définit les positions des observateurs utilisées par le LOD."""
+        self.lod.set_observers(positions)
+        
+    def set_npc_behaviors(self, npc_id: str, behaviors: Dict[str, Any]) -> None:
+        """Remplace les comportements d'un PNJ."""
+        if npc_id in self.npcs:
+            self.behaviors[npc_id] = behaviors
+            self.scorer.set_behaviors(self.store.slot(npc_id), behaviors)
+            self.dirty.mark(self.store.slot(npc_id))
+            
+    def register_action(self, name: str, handler: ActionHandler) -> None:
+        """Ajoute (ou remplace) le gestionnaire d'une action pour ce gestionnaire d'IA."""
+        self.actions.register(name, handler)
+        
+    def register_summary(self, name: str, handler: SummaryHandler) -> None:
+        """Ajoute l'effet cumulé d'une action, utilisé par fast_forward"""
+        self.actions.register_summary(name, handler)
+        
+    def add_experience(self, npc_ids: Sequence[str], amounts: np.ndarray) -> np.ndarray:
+        """Ajoute de l'expérience à plusieurs PNJ en une opération ; retourne les PNJ connus"""
+        known = np.array([npc_id in self.npcs for npc_id in npc_ids], dtype=bool)
+        amounts = np.asarray(amounts, dtype=np.float64)
+        if self.columnar:
+            slots = np.array([self.store.slots[npc_id] for npc_id in np.asarray(npc_ids, dtype=object)[known]], dtype=np.intp)
+            np.add.at(self.store.experience, slots, amounts[known])
+        else:
+            for npc_id, amount in zip(np.asarray(npc_ids, dtype=object)[known], amounts[known]):
+                state = self.states[npc_id]
+                state["experience"] = state.get("experience", 0.0) + float(amount)
+        return known
+        
+    def add_items(self, items: Dict[str, Dict[str, float]]) -> Set[str]:
+        """Ajoute des objets aux inventaires de plusieurs PNJ ; retourne les PNJ connus"""
+        found = set()
+        for npc_id, npc_items in items.items():
+            if npc_id not in self.npcs:
+                continue
+            inventory = self.states[npc_id]["inventory"]
+            for item, amount in npc_items.items():
+                inventory[item] = inventory.get(item, 0) + amount
+            found.add(npc_id)
+        return found
+        
+    def mark_npc_dirty(self, npc_id: str) -> None:
+        """Force la réévaluation du comportement d'un PNJ (nouvelle perception, menace...)."""
+        if npc_id in self.npcs:
+            self.dirty.mark(self.store.slot(npc_id))
+            
     def update_npc(self, npc_id: str, delta_time: float):
         """Met à jour l'état d'un PNJ."""
         if npc_id not in self.npcs:
             return
             
         try:
-            # Mise à jour de l'état
-            current_state = self.states[npc_id]
-            behaviors = self.behaviors[npc_id]
-            
             # Calcul des priorités de comportement
             priorities = self._calculate_behavior_priorities(npc_id)
             
             # Sélection du comportement
-            selected_behavior = self._select_behavior(priorities)
+            selected_behavior = max(priorities.items(), key=lambda x: x[1])[0] if priorities else None
             
             # Exécution du comportement
             if selected_behavior:
@@ -61,20 +199,23 @@ class AIManager:
         except Exception as e:
             self.logger.error(f"Erreur lors de la mise à jour du PNJ {npc_id}: {str(e)}")
             
-    def get_npc_state(self, npc_id: str) -> Dict[str, Any]:
-        """Récupère l'état actuel d'un PNJ."""
-        return self.states.get(npc_id, {})
-        
     def set_npc_state(self, npc_id: str, state: Dict[str, Any]):
         """Définit l'état d'un PNJ."""
         if npc_id in self.npcs:
-            self.states[npc_id] = state
+            if self.columnar:
+                view = NPCStateView(self.store, self.store.slot(npc_id))
+                view.update(state)
+                self.states[npc_id] = view
+            else:
+                self.states[npc_id] = state
+            self.dirty.mark(self.store.slot(npc_id))
             
     def _initialize_state(self, npc_data: Dict[str, Any]) -> Dict[str, Any]:
         """Initialise l'état d'un PNJ."""
         return {
             "health": npc_data.get("max_health", 100),
             "stamina": npc_data.get("max_stamina", 100),
+            "experience": npc_data.get("experience", 0.0),
             "position": npc_data.get("spawn_position", [0, 0, 0]),
             "rotation": npc_data.get("spawn_rotation", [0, 0, 0]),
             "inventory": npc_data.get("initial_inventory", {}),
@@ -143,28 +284,22 @@ class AIManager:
         return behaviors
         
     def _calculate_behavior_priorities(self, npc_id: str) -> Dict[str, float]:
-        """Calcule les priorités des comportements."""
+        """Calcule les priorités des comportements (via le BehaviorScorer)."""
         state = self.states[npc_id]
         behaviors = self.behaviors[npc_id]
-        priorities = {}
-        
-        for behavior_name, behavior_data in behaviors.items():
-            base_weight = behavior_data["weight"]
+        if not behaviors:
+            return {}
             
-            # Facteurs d'état
-            state_multiplier = self._calculate_state_multiplier(state, behavior_name)
-            
-            # Facteurs environnementaux
-            env_multiplier = self._calculate_environment_multiplier(state, behavior_name)
-            
-            # Facteurs émotionnels
-            emotion_multiplier = self._calculate_emotion_multiplier(state, behavior_name)
-            
-            # Priorité finale
-            priority = base_weight * state_multiplier * env_multiplier * emotion_multiplier
-            priorities[behavior_name] = priority
-            
-        return priorities
+        # Poids de base × facteurs d'état, environnementaux et émotionnels
+        emotions = state.get("emotions", {})
+        priorities = self.scorer.score_context(
+            np.array([self.store.slot(npc_id)], dtype=np.intp),
+            np.array([state["health"]], dtype=np.float64),
+            np.array(["threat_nearby" in state]),
+            np.array([emotions.get("fear", 0.0)], dtype=np.float64),
+            np.array([emotions.get("anger", 0.0)], dtype=np.float64)
+        )[0]
+        return {name: float(priorities[self.scorer.index[name]]) for name in behaviors}
         
     def _calculate_state_multiplier(self, state: Dict[str, Any], behavior: str) -> float:
         """Calcule le multiplicateur basé sur l'état."""
@@ -207,52 +342,6 @@ class AIManager:
             
         return multiplier
         
-    def _select_behavior(self, priorities: Dict[str, float]) -> str:
-        """Sélectionne le comportement avec la plus haute priorité."""
-        if not priorities:
-            return None
-            
-        return max(priorities.items(), key=lambda x: x[1])[0]
-        
-    def _execute_behavior(self, npc_id: str, behavior: str, delta_time: float):
-        """Exécute le comportement sélectionné."""
-        if behavior not in self.behaviors[npc_id]:
-            return
-            
-        behavior_data = self.behaviors[npc_id][behavior]
-        actions = behavior_data["actions"]
-        
-        for action in actions:
-            try:
-                self._execute_action(npc_id, action, delta_time)
-            except Exception as e:
-                self.logger.error(f"Erreur lors de l'exécution de l'action {action} pour le PNJ {npc_id}: {str(e)}")
-                
-    def _execute_action(self, npc_id: str, action: str, delta_time: float):
-        """Exécute une action spécifique."""
-        state = self.states[npc_id]
-        
-        if action == "wait":
-            # Mise à jour du temps d'attente
-            pass
-            
-        elif action == "look_around":
-            # Rotation aléatoire
-            rotation = state["rotation"]
-            rotation[1] += np.random.uniform(-30, 30) * delta_time
-            state["rotation"] = rotation
-            
-        elif action == "random_walk":
-            # Déplacement aléatoire
-            position = state["position"]
-            direction = np.random.uniform(-1, 1, 3)
-            direction /= np.linalg.norm(direction)
-            position += direction * 2 * delta_time
-            state["position"] = position
-            
-        # Mise à jour de l'état
-        self.states[npc_id] = state
-        
     def handle_npc_action(self, event: Any) -> None:
         """Gère une action de PNJ"""
         try:
@@ -269,43 +358,246 @@ class AIManager:
                 return
                 
             # Exécuter l'action
-            self._execute_action(npc_id, action_type, action_data)
+            self._execute_action(npc_id, action_type, action_data.get("delta_time", 0.0))
             
         except Exception as e:
             self.logger.error(f"Erreur lors du traitement de l'action: {str(e)}")
             
+    def handle_npc_actions(self, events: List[Any]) -> None:
+        """Gère un lot d'actions de PNJ (livraison par lot du gestionnaire d'événements)
+        
+        Les actions sont regroupées par nom et exécutées par lots ; les
+        actions répétées d'un même PNJ passent dans des plans successifs, dans
+        leur ordre d'émission.
+        """
+        try:
+            plans: List[ActionPlan] = []
+            rounds: Dict[str, int] = {}
+            for event in events:
+                npc_id = event.data.get("npc_id")
+                action_type = event.data.get("action_type")
+                if not npc_id or not action_type:
+                    self.logger.error("Données d'action invalides")
+                    continue
+                if npc_id not in self.npcs:
+                    self.logger.error(f"PNJ non trouvé: {npc_id}")
+                    continue
+                    
+                index = rounds.get(npc_id, 0)
+                rounds[npc_id] = index + 1
+                if index == len(plans):
+                    plans.append(ActionPlan())
+                plans[index].add(action_type, npc_id, self.store.slot(npc_id), event.data.get("delta_time", 0.0))
+                
+            for plan in plans:
+                self._run_actions(plan)
+                
+        except Exception as e:
+            self.logger.error(f"Erreur lors du traitement des actions: {str(e)}")
+            
     def update(self, delta_time: float) -> None:
         """Met à jour l'état de l'IA"""
         try:
-            for npc_id in self.npcs:
-                self._update_npc(npc_id, delta_time)
+            self.rng.begin_tick()
+            
+            if self.columnar:
+                self._update_columnar(delta_time)
+            elif self.lod_enabled and len(self.lod.observers):
+                # Seuls les PNJ dus ce tick sont mis à jour
+                npc_ids = list(self.npcs)
+                slots = np.array([self.store.slot(npc_id) for npc_id in npc_ids], dtype=np.intp)
+                positions = np.array([self.states[npc_id]["position"] for npc_id in npc_ids], dtype=np.float64)
+                due, elapsed, ticks = self.lod.schedule(slots, positions.reshape(-1, 3), delta_time)
+                plan = ActionPlan()
+                for slot, npc_delta, npc_ticks in zip(due, elapsed, ticks):
+                    self._update_npc(self.store.ids[slot], float(npc_delta), int(npc_ticks), plan)
+                self._run_actions(plan)
+            else:
+                plan = ActionPlan()
+                for npc_id in self.npcs:
+                    self._update_npc(npc_id, delta_time, plan=plan)
+                self._run_actions(plan)
         except Exception as e:
             self.logger.error(f"Erreur lors de la mise à jour de l'IA: {str(e)}")
             
-    def _update_npc(self, npc_id: str, delta_time: float) -> None:
+    def fast_forward(self, seconds: float) -> Dict[str, Any]:
+        """Résume statistiquement plusieurs heures d'activité des PNJ.
+        
+        Au lieu de simuler chaque tick : régénération en une fois, sélection
+        d'un comportement par PNJ, puis effet cumulé des actions de ce
+        comportement (gestionnaires enregistrés avec register_summary).
+        Retourne le nombre de ticks résumés et la répartition des comportements.
+        """
+        try:
+            tick = self.config.get("ai.update_rate", 0.1)
+            ticks = max(1, int(round(seconds / tick)))
+            self.rng.begin_tick()
+            
+            npc_ids = list(self.npcs)
+            if self.columnar:
+                slots = self.store.active_slots()
+                self.store.regenerate(0.1 * ticks, 0.2 * ticks, slots=slots)
+                choices = self._select_behaviors_cached(slots)
+                behaviors = [self.scorer.names[choice] if choice >= 0 else None for choice in choices]
+                npc_ids = [self.store.ids[slot] for slot in slots]
+            else:
+                behaviors = []
+                for npc_id in npc_ids:
+                    state = self.states[npc_id]
+                    state["health"] = min(100, state["health"] + 0.1 * ticks)
+                    state["stamina"] = min(100, state["stamina"] + 0.2 * ticks)
+                    behaviors.append(self._select_behavior_cached(npc_id))
+                    
+            plan = ActionPlan()
+            counts: Dict[str, int] = {}
+            for npc_id, behavior in zip(npc_ids, behaviors):
+                if not behavior:
+                    continue
+                counts[behavior] = counts.get(behavior, 0) + 1
+                self._execute_behavior(npc_id, behavior, tick, plan)
+                
+            for batch in plan.batches(self):
+                summary = self.actions.get_summary(batch.action)
+                if summary is not None:
+                    summary(batch, np.full(len(batch), float(ticks)))
+                    
+            return {"npcs": len(npc_ids), "ticks": ticks, "behaviors": counts}
+            
+        except Exception as e:
+            self.logger.error(f"Erreur lors de l'avance rapide de l'IA: {str(e)}")
+            return {}
+            
+    def _update_columnar(self, delta_time: float) -> None:
+        """Met à jour tous les PNJ à partir du store colonnaire"""
+        slots = self.store.active_slots()
+        
+        if self.lod_enabled:
+            slots, elapsed, ticks = self.lod.schedule(slots, self.store.position[slots], delta_time)
+        else:
+            elapsed = np.full(len(slots), delta_time)
+            ticks = None
+        
+        if self.parallel is not None and self.parallel.should_run(len(slots)):
+            # Régénération et sélection réparties entre les processus
+            if ticks is None:
+                ticks = np.ones(len(slots))
+            choices = self.parallel.tick(slots, ticks, self.scorer, 0.1, 0.2)
+            # Les choix calculés par les processus alimentent le cache
+            self.dirty.collect(slots, self._state_signatures(slots), self.store.emotions[slots])
+            self.dirty.choice[slots] = choices
+        else:
+            if ticks is not None:
+                # Régénération rattrapant les ticks sautés
+                self.store.regenerate(0.1 * ticks, 0.2 * ticks, slots=slots)
+            else:
+                # Régénération naturelle de tous les PNJ en une opération
+                self.store.regenerate(0.1, 0.2)
+            
+            # Sélection des comportements des PNJ modifiés en un argmax
+            choices = self._select_behaviors_cached(slots)
+        self._mark_engaged(slots, choices)
+        
+        # Actions regroupées : un appel de gestionnaire par action
+        plan = ActionPlan()
+        for slot, choice, npc_delta in zip(slots, choices, elapsed):
+            if choice < 0:
+                continue
+            npc_id = self.store.ids[slot]
+            try:
+                self._execute_behavior(npc_id, self.scorer.names[choice], float(npc_delta), plan)
+            except Exception as e:
+                self.logger.error(f"Erreur lors de la mise à jour du PNJ {npc_id}: {str(e)}")
+        self._run_actions(plan)
+                
+    def shutdown(self) -> None:
+        """Arrête les processus de calcul et libère la mémoire partagée"""
+        try:
+            if self.parallel is not None:
+                self.parallel.shutdown()
+            self.store.allocator.close()
+        except Exception as e:
+            self.logger.error(f"Erreur lors de l'arrêt de l'IA: {str(e)}")
+            
+    def _mark_engaged(self, slots: np.ndarray, choices: np.ndarray) -> None:
+        """Les PNJ en combat ou en fuite restent au palier LOD le plus fin"""
+        columns = [self.scorer.index[name] for name in ("combat", "flee") if name in self.scorer.index]
+        self.lod.engaged[slots] = np.isin(choices, columns)
+                
+    def _select_behaviors_batch(self, slots: np.ndarray) -> np.ndarray:
+        """Sélectionne le comportement de plusieurs PNJ (indices de colonnes du scorer)"""
+        store = self.store
+        return self.scorer.select(
+            slots,
+            store.health[slots],
+            store.stamina[slots],
+            store.has_target[slots]
+        )
+            
+    def _select_behaviors_cached(self, slots: np.ndarray) -> np.ndarray:
+        """Sélection par lot limitée aux PNJ dont les entrées ont changé"""
+        if not self.incremental:
+            return self._select_behaviors_batch(slots)
+            
+        changed = self.dirty.collect(slots, self._state_signatures(slots), self.store.emotions[slots])
+        if changed.any():
+            stale = slots[changed]
+            self.dirty.choice[stale] = self._select_behaviors_batch(stale)
+        return self.dirty.choice[slots]
+        
+    def _state_signatures(self, slots: np.ndarray) -> np.ndarray:
+        """Signatures d'état des emplacements (backend colonnaire)"""
+        store = self.store
+        return state_signature(store.health[slots], store.stamina[slots], store.has_target[slots])
+        
+    def _select_behavior_cached(self, npc_id: str) -> Optional[str]:
+        """Sélection d'un PNJ, réutilisant le choix précédent si rien n'a changé"""
+        if not self.incremental:
+            return self._select_behavior(npc_id)
+            
+        slot = self.store.slot(npc_id)
+        state = self.states[npc_id]
+        emotions = self.emotions[npc_id]
+        signature = state_signature(state["health"], state["stamina"], bool(state.get("target")))
+        emotion_row = np.array([emotions.get(name, 0.0) for name in EMOTIONS], dtype=np.float64)
+        
+        if self.dirty.is_dirty(slot, signature, emotion_row):
+            behavior = self._select_behavior(npc_id)
+            if behavior and behavior not in self.scorer.index:
+                # Comportement ajouté hors de set_npc_behaviors : pas de cache
+                self.dirty.mark(slot)
+            else:
+                self.dirty.choice[slot] = self.scorer.index[behavior] if behavior else -1
+            return behavior
+            
+        choice = self.dirty.choice[slot]
+        return self.scorer.names[choice] if choice >= 0 else None
+        
+    def _update_npc(self, npc_id: str, delta_time: float, ticks: int = 1,
+                    plan: Optional[ActionPlan] = None) -> None:
         """Met à jour un PNJ"""
         try:
             # Mettre à jour l'état
-            self._update_state(npc_id, delta_time)
+            self._update_state(npc_id, delta_time, ticks)
             
-            # Sélectionner le meilleur comportement
-            behavior = self._select_behavior(npc_id)
+            # Sélectionner le meilleur comportement (réévalué seulement si nécessaire)
+            behavior = self._select_behavior_cached(npc_id)
+            self.lod.engaged[self.store.slot(npc_id)] = behavior in ("combat", "flee")
             
             if behavior:
                 # Exécuter le comportement
-                self._execute_behavior(npc_id, behavior, delta_time)
+                self._execute_behavior(npc_id, behavior, delta_time, plan)
                 
         except Exception as e:
             self.logger.error(f"Erreur lors de la mise à jour du PNJ {npc_id}: {str(e)}")
             
-    def _update_state(self, npc_id: str, delta_time: float) -> None:
+    def _update_state(self, npc_id: str, delta_time: float, ticks: int = 1) -> None:
         """Met à jour l'état d'un PNJ"""
         try:
             state = self.states[npc_id]
             
-            # Régénération naturelle
-            state["health"] = min(100, state["health"] + 0.1)
-            state["stamina"] = min(100, state["stamina"] + 0.2)
+            # Régénération naturelle (ticks: nombre de ticks depuis la dernière mise à jour)
+            state["health"] = min(100, state["health"] + 0.1 * ticks)
+            state["stamina"] = min(100, state["stamina"] + 0.2 * ticks)
             
             # TODO: Mettre à jour d'autres aspects de l'état
             
@@ -320,8 +612,8 @@ class AIManager:
             
             # Calculer les priorités
             priorities = {}
-            for behavior, base_priority in behaviors.items():
-                priority = self._calculate_priority(state, behavior, base_priority)
+            for behavior, behavior_data in behaviors.items():
+                priority = self._calculate_priority(state, behavior, behavior_data["weight"])
                 priorities[behavior] = priority
                 
             # Sélectionner le comportement avec la plus haute priorité
@@ -351,54 +643,57 @@ class AIManager:
             self.logger.error(f"Erreur lors du calcul de la priorité: {str(e)}")
             return 0.0
             
-    def _execute_behavior(self, npc_id: str, behavior: str, delta_time: float) -> None:
-        """Exécute un comportement"""
+    # Actions par défaut des comportements sans liste d'actions
+    DEFAULT_BEHAVIOR_ACTIONS = {
+        "idle": ["stand", "look_around"],
+        "wander": ["walk_random"],
+        "interact": ["face_target", "talk"],
+        "combat": ["equip_weapon", "attack"],
+        "flee": ["run_from_target"]
+    }
+    
+    def _execute_behavior(self, npc_id: str, behavior: str, delta_time: float,
+                          plan: Optional[ActionPlan] = None) -> None:
+        """Exécute un comportement (ou ajoute ses actions au plan du tick)"""
         try:
-            state = self.states[npc_id]
-            
-            # Actions par comportement
-            actions = {
-                "idle": ["stand", "look_around"],
-                "wander": ["walk_random"],
-                "interact": ["face_target", "talk"],
-                "combat": ["equip_weapon", "attack"],
-                "flee": ["run_from_target"]
-            }
-            
-            # Exécuter les actions
-            for action in actions.get(behavior, []):
-                self._execute_action(npc_id, action, delta_time)
+            behavior_data = self.behaviors[npc_id].get(behavior) or {}
+            actions = behavior_data.get("actions") or self.DEFAULT_BEHAVIOR_ACTIONS.get(behavior, [])
+            
+            immediate = plan is None
+            if immediate:
+                plan = ActionPlan()
+            slot = self.store.slot(npc_id)
+            for action in actions:
+                plan.add(action, npc_id, slot, delta_time)
+            if immediate:
+                self._run_actions(plan)
                 
         except Exception as e:
             self.logger.error(f"Erreur lors de l'exécution du comportement: {str(e)}")
             
     def _execute_action(self, npc_id: str, action: str, delta_time: float) -> None:
-        """Exécute une action"""
-        try:
-            state = self.states[npc_id]
-            
-            # Mettre à jour l'état en fonction de l'action
-            if action == "walk_random":
-                # TODO: Implémenter le déplacement aléatoire
-                pass
-            elif action == "face_target":
-                # TODO: Implémenter l'orientation vers la cible
-                pass
-            elif action == "talk":
-                # TODO: Implémenter le dialogue
-                pass
-            elif action == "attack":
-                # TODO: Implémenter l'attaque
-                pass
-            elif action == "run_from_target":
-                # TODO: Implémenter la fuite
-                pass
+        """Exécute une action pour un seul PNJ"""
+        plan = ActionPlan()
+        plan.add(action, npc_id, self.store.slot(npc_id), delta_time)
+        self._run_actions(plan)
+        
+    def _run_actions(self, plan: ActionPlan) -> None:
+        """Transmet chaque lot d'actions à son gestionnaire"""
+        for batch in plan.batches(self):
+            handler = self.actions.get(batch.action)
+            if handler is None:
+                # Action sans effet sur l'état
+                continue
+            try:
+                handler(batch)
+                self.logger.debug(f"Action {batch.action} exécutée pour {len(batch)} PNJ")
+            except Exception as e:
+                self.logger.error(f"Erreur lors de l'exécution de l'action {batch.action}: {str(e)}")
                 
-            self.logger.debug(f"Action exécutée pour le PNJ {npc_id}: {action}")
-            
-        except Exception as e:
-            self.logger.error(f"Erreur lors de l'exécution de l'action: {str(e)}")
-            
+    def _random_row(self, stream: str, npc_id: str, width: int) -> np.ndarray:
+        """Retourne les tirages du tick courant réservés à un PNJ"""
+        return self.rng.uniform(stream, self.rng_keys[[self.store.slot(npc_id)]], width)[0]
+        
     def get_npc_state(self, npc_id: str) -> Optional[Dict[str, Any]]:
         """Récupère l'état d'un PNJ"""
         try:
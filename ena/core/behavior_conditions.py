@@ -0,0 +1,244 @@
+"""
+Compilation des conditions de comportement en prédicats pour ENA
+"""
+from typing import Any, Callable, Dict, List, Optional, Sequence
+import math
+import operator
+import re
+import numpy as np
+
+ScalarPredicate = Callable[[Dict[str, Any]], bool]
+VectorPredicate = Callable[["StateColumns"], np.ndarray]
+
+_COMPARISON = re.compile(r"^\s*([A-Za-z_][\w.]*)\s*(<=|>=|==|!=|<|>)\s*(-?\d+(?:\.\d+)?)\s*$")
+_OPERATORS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne
+}
+
+def _field(state: Dict[str, Any], path: str) -> Any:
+    """Lit un champ, éventuellement imbriqué ("emotions.fear")."""
+    value: Any = state
+    for key in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+def _number(value: Any) -> float:
+    """Valeur numérique d'un champ (NaN si absent ou non numérique)."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+def target_distance(state: Dict[str, Any]) -> float:
+    """Distance à la cible : champ target_distance ou positions du PNJ et de la cible."""
+    distance = state.get("target_distance")
+    if distance is not None:
+        return _number(distance)
+
+    position = state.get("position")
+    target_position = state.get("target_position")
+    if position is None or target_position is None:
+        return math.nan
+    return math.dist(tuple(position)[:3], tuple(target_position)[:3])
+
+class StateColumns:
+    """Colonnes extraites d'une liste d'états de PNJ, calculées à la demande.
+
+    Chaque champ n'est lu qu'une fois par lot, quel que soit le nombre de
+    conditions qui l'utilisent.
+    """
+
+    def __init__(self, states: Sequence[Dict[str, Any]]):
+        self.states = states
+        self._numeric: Dict[str, np.ndarray] = {}
+        self._truthy: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.states)
+
+    def numeric(self, path: str, getter: Optional[Callable[[Dict[str, Any]], float]] = None) -> np.ndarray:
+        """Colonne numérique (NaN pour les valeurs absentes)."""
+        column = self._numeric.get(path)
+        if column is None:
+            if getter is None:
+                column = np.fromiter(
+                    (_number(_field(state, path)) for state in self.states),
+                    dtype=np.float64,
+                    count=len(self.states)
+                )
+            else:
+                column = np.fromiter(
+                    (getter(state) for state in self.states),
+                    dtype=np.float64,
+                    count=len(self.states)
+                )
+            self._numeric[path] = column
+        return column
+
+    def truthy(self, path: str) -> np.ndarray:
+        """Colonne booléenne : le champ est présent et vrai."""
+        column = self._truthy.get(path)
+        if column is None:
+            column = np.fromiter(
+                (bool(_field(state, path)) for state in self.states),
+                dtype=bool,
+                count=len(self.states)
+            )
+            self._truthy[path] = column
+        return column
+
+class CompiledCondition:
+    """Condition compilée : version scalaire et version vectorielle."""
+
+    def __init__(self, source: str, scalar: ScalarPredicate, vector: VectorPredicate):
+        self.source = source
+        self.check = scalar
+        self.evaluate = vector
+
+    def __repr__(self) -> str:
+        return f"CompiledCondition({self.source!r})"
+
+class ConditionCompiler:
+    """Transforme les noms de conditions en prédicats.
+
+    Syntaxe acceptée :
+    - un nom enregistré (no_target, near_target, hostile_target, low_health...) ;
+    - une comparaison "champ op nombre" (ex. "stamina >= 20", "emotions.fear > 0.5") ;
+    - "not <condition>" pour la négation ;
+    - tout autre nom : le champ correspondant de l'état doit être vrai.
+
+    Chaque condition distincte reçoit un bit, ce qui permet de résumer toutes
+    les conditions d'un lot de PNJ par un masque de bits par PNJ.
+    """
+
+    def __init__(self, near_distance: float = 5.0, low_health: float = 30.0):
+        self.registry: Dict[str, CompiledCondition] = {}
+        self.compiled: Dict[str, CompiledCondition] = {}
+        self.bits: Dict[str, int] = {}
+        # Incrémenté à chaque enregistrement : invalide les compilations extérieures
+        self.version = 0
+        self._register_defaults(near_distance, low_health)
+
+    def register(self, name: str, scalar: ScalarPredicate,
+                 vector: Optional[VectorPredicate] = None) -> None:
+        """Enregistre une condition nommée.
+
+        Sans version vectorielle, le prédicat scalaire est appliqué à chaque état.
+        """
+        if vector is None:
+            def vector(columns: StateColumns) -> np.ndarray:
+                return np.fromiter(
+                    (bool(scalar(state)) for state in columns.states),
+                    dtype=bool,
+                    count=len(columns)
+                )
+        self.registry[name] = CompiledCondition(name, scalar, vector)
+        # Les conditions déjà compilées peuvent dépendre de ce nom
+        self.compiled.clear()
+        self.version += 1
+
+    def compile(self, condition: str) -> CompiledCondition:
+        """Compile (avec cache) une condition."""
+        compiled = self.compiled.get(condition)
+        if compiled is None:
+            compiled = self._compile(condition.strip())
+            self.compiled[condition] = compiled
+        return compiled
+
+    def bit(self, condition: str) -> int:
+        """Indice de bit d'une condition (attribué à la première utilisation)."""
+        self.compile(condition)
+        bit = self.bits.get(condition)
+        if bit is None:
+            bit = len(self.bits)
+            self.bits[condition] = bit
+        return bit
+
+    def required_mask(self, conditions: Sequence[str]) -> np.ndarray:
+        """Masque des bits requis par une liste de conditions."""
+        mask = np.zeros(self.words, dtype=np.uint64)
+        for condition in conditions:
+            bit = self.bit(condition)
+            mask[bit // 64] |= np.uint64(1) << np.uint64(bit % 64)
+        return mask
+
+    @property
+    def words(self) -> int:
+        """Nombre de mots de 64 bits nécessaires aux masques."""
+        return max(1, (len(self.bits) + 63) // 64)
+
+    def bitmasks(self, columns: StateColumns) -> np.ndarray:
+        """Masques de bits (PNJ × mots) des conditions vraies pour chaque PNJ."""
+        masks = np.zeros((len(columns), self.words), dtype=np.uint64)
+        for condition, bit in self.bits.items():
+            satisfied = self.compile(condition).evaluate(columns)
+            masks[:, bit // 64] |= satisfied.astype(np.uint64) << np.uint64(bit % 64)
+        return masks
+
+    def _compile(self, condition: str) -> CompiledCondition:
+        """Analyse une condition."""
+        if not condition:
+            raise ValueError("Condition vide")
+
+        if condition.startswith("not "):
+            inner = self.compile(condition[4:])
+            return CompiledCondition(
+                condition,
+                lambda state: not inner.check(state),
+                lambda columns: ~inner.evaluate(columns)
+            )
+
+        registered = self.registry.get(condition)
+        if registered is not None:
+            return registered
+
+        match = _COMPARISON.match(condition)
+        if match:
+            path, symbol, literal = match.groups()
+            compare = _OPERATORS[symbol]
+            threshold = float(literal)
+            # Les comparaisons avec NaN (champ absent) sont fausses, sauf !=
+            return CompiledCondition(
+                condition,
+                lambda state: bool(compare(_number(_field(state, path)), threshold)),
+                lambda columns: compare(columns.numeric(path), threshold)
+            )
+
+        if not re.match(r"^[A-Za-z_][\w.]*$", condition):
+            raise ValueError(f"Condition invalide: {condition}")
+
+        return CompiledCondition(
+            condition,
+            lambda state: bool(_field(state, condition)),
+            lambda columns: columns.truthy(condition)
+        )
+
+    def _register_defaults(self, near_distance: float, low_health: float) -> None:
+        """Conditions utilisées par les comportements par défaut."""
+        self.register(
+            "no_target",
+            lambda state: not state.get("target"),
+            lambda columns: ~columns.truthy("target")
+        )
+        self.register(
+            "near_target",
+            lambda state: bool(state.get("target")) and target_distance(state) <= near_distance,
+            lambda columns: columns.truthy("target") & (columns.numeric("@target_distance", target_distance) <= near_distance)
+        )
+        self.register(
+            "hostile_target",
+            lambda state: bool(state.get("target")) and bool(state.get("target_hostile")),
+            lambda columns: columns.truthy("target") & columns.truthy("target_hostile")
+        )
+        self.register(
+            "low_health",
+            lambda state: _number(state.get("health")) < low_health,
+            lambda columns: columns.numeric("health") < low_health
+        )
@@ -1,15 +1,25 @@
 """
 Gestionnaire de comportements pour ENA
 """
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+import numpy as np
 from ..utils.logger import Logger
 from ..utils.config import Config
+from .behavior_conditions import ConditionCompiler, StateColumns, ScalarPredicate, VectorPredicate
 
 class BehaviorManager:
     def __init__(self, config: Config):
         self.logger = Logger("BehaviorManager")
         self.config = config
         self.behaviors: Dict[str, Dict[str, Any]] = {}
+        self.conditions = ConditionCompiler(
+            near_distance=config.get("ai.interaction_range", 5.0),
+            low_health=config.get("ai.low_health_threshold", 30.0)
+        )
+        # Conditions compilées et masque de bits requis par comportement
+        self._compiled: Dict[str, List[Any]] = {}
+        self._compiled_version = self.conditions.version
+        self._required: Dict[str, np.ndarray] = {}
         self._load_default_behaviors()
         
     def _load_default_behaviors(self):
@@ -42,12 +52,16 @@ class BehaviorManager:
             }
         }
         
+        for name, behavior in default_behaviors.items():
+            self._compile_behavior(name, behavior)
         self.behaviors.update(default_behaviors)
         self.logger.info("Comportements par défaut chargés")
         
     def add_behavior(self, name: str, behavior: Dict[str, Any]) -> None:
         """Ajoute un nouveau comportement"""
         try:
+            # Une condition invalide rejette le comportement
+            self._compile_behavior(name, behavior)
             if name in self.behaviors:
                 self.logger.warning(f"Le comportement {name} existe déjà et sera écrasé")
             self.behaviors[name] = behavior
@@ -55,6 +69,14 @@ class BehaviorManager:
         except Exception as e:
             self.logger.error(f"Erreur lors de l'ajout du comportement: {str(e)}")
             
+    def register_condition(self, name: str, scalar: ScalarPredicate,
+                           vector: Optional[VectorPredicate] = None) -> None:
+        """Enregistre une condition nommée, utilisable par les comportements existants"""
+        self.conditions.register(name, scalar, vector)
+        # Les comportements déjà compilés relisent leurs prédicats
+        self._compiled.clear()
+        self._compiled_version = self.conditions.version
+        
     def get_behavior(self, name: str) -> Optional[Dict[str, Any]]:
         """Récupère un comportement"""
         return self.behaviors.get(name)
@@ -63,6 +85,8 @@ class BehaviorManager:
         """Supprime un comportement"""
         if name in self.behaviors:
             del self.behaviors[name]
+            self._compiled.pop(name, None)
+            self._required.pop(name, None)
             self.logger.info(f"Comportement supprimé: {name}")
             
     def get_all_behaviors(self) -> List[str]:
@@ -76,9 +100,15 @@ class BehaviorManager:
             if not behavior:
                 return 0.0
                 
-            # Vérifier les conditions
-            for condition in behavior.get("conditions", []):
-                if not self._check_condition(npc_state, condition):
+            # Vérifier les conditions (arrêt à la première condition fausse)
+            if self._compiled_version != self.conditions.version:
+                # Condition enregistrée directement sur self.conditions
+                self._compiled.clear()
+                self._compiled_version = self.conditions.version
+            if behavior_name not in self._compiled:
+                self._compile_behavior(behavior_name, behavior)
+            for condition in self._compiled[behavior_name]:
+                if not condition.check(npc_state):
                     return 0.0
                     
             # Calculer la priorité finale
@@ -89,12 +119,63 @@ class BehaviorManager:
             self.logger.error(f"Erreur lors de l'évaluation du comportement: {str(e)}")
             return 0.0
             
+    def evaluate_behaviors(self, npc_states: Sequence[Dict[str, Any]],
+                           behavior_names: Optional[Sequence[str]] = None) -> Tuple[List[str], np.ndarray]:
+        """Évalue plusieurs comportements pour un lot de PNJ.
+        
+        Les conditions sont résumées par un masque de bits par PNJ ; un
+        comportement est admissible si tous ses bits requis sont présents.
+        Retourne les noms des comportements et la matrice PNJ × comportement
+        des priorités (0 si les conditions ne sont pas remplies).
+        """
+        names = [name for name in (behavior_names or self.behaviors) if name in self.behaviors]
+        priorities = np.zeros((len(npc_states), len(names)), dtype=np.float64)
+        try:
+            if not names or not npc_states:
+                return names, priorities
+                
+            columns = StateColumns(npc_states)
+            masks = self.conditions.bitmasks(columns)
+            for j, name in enumerate(names):
+                required = self._required_mask(name)
+                allowed = np.all((masks & required) == required, axis=1)
+                # La priorité n'est calculée que pour les PNJ admissibles
+                if allowed.any():
+                    base_priority = self.behaviors[name].get("priority", 1.0)
+                    priorities[allowed, j] = self._calculate_priorities(columns, allowed, base_priority)
+                    
+        except Exception as e:
+            self.logger.error(f"Erreur lors de l'évaluation des comportements: {str(e)}")
+            priorities[:] = 0.0
+        return names, priorities
+        
+    def _compile_behavior(self, name: str, behavior: Dict[str, Any]) -> None:
+        """Compile les conditions d'un comportement"""
+        conditions = behavior.get("conditions", [])
+        self._compiled[name] = [self.conditions.compile(condition) for condition in conditions]
+        self._required[name] = self.conditions.required_mask(conditions)
+        
+    def _required_mask(self, name: str) -> np.ndarray:
+        """Masque requis d'un comportement, élargi si de nouveaux bits sont apparus"""
+        if name not in self._required:
+            self._compile_behavior(name, self.behaviors[name])
+        required = self._required[name]
+        words = self.conditions.words
+        if len(required) < words:
+            required = np.concatenate([required, np.zeros(words - len(required), dtype=np.uint64)])
+            self._required[name] = required
+        return required
+        
     def _check_condition(self, npc_state: Dict[str, Any], condition: str) -> bool:
         """Vérifie une condition pour un PNJ"""
-        # TODO: Implémenter la vérification des conditions
-        return True
+        return self.conditions.compile(condition).check(npc_state)
         
     def _calculate_priority(self, npc_state: Dict[str, Any], base_priority: float) -> float:
         """Calcule la priorité finale d'un comportement"""
         # TODO: Implémenter le calcul de priorité
         return base_priority
+        
+    def _calculate_priorities(self, columns: StateColumns, allowed: np.ndarray,
+                              base_priority: float) -> np.ndarray:
+        """Version vectorielle de _calculate_priority pour les PNJ admissibles"""
+        return np.full(np.count_nonzero(allowed), base_priority, dtype=np.float64)
@@ -0,0 +1,193 @@
+"""
+Calcul vectorisé des priorités de comportement pour ENA
+"""
+from typing import Dict, Any, List, Mapping, Optional
+import numpy as np
+from ..utils.shared_arrays import LocalArrays
+
+# Comportements dont la priorité dépend de l'état du PNJ
+MODIFIED_BEHAVIORS = ("wander", "interact", "combat", "flee")
+
+def score_behaviors(weights: np.ndarray, health: np.ndarray, stamina: np.ndarray,
+                    has_target: np.ndarray, columns: Mapping[str, int]) -> np.ndarray:
+    """Applique les modificateurs d'état aux poids de base.
+
+    Les poids sont modifiés sur place : l'appelant passe une copie (résultat
+    d'une indexation par emplacements). Les modificateurs sont identiques à
+    AIManager._calculate_priority.
+    """
+    priorities = weights
+
+    column = columns.get("wander")
+    if column is not None:
+        priorities[:, column] *= np.where(stamina > 30, 1.0, 0.5)
+    column = columns.get("interact")
+    if column is not None:
+        priorities[:, column] *= np.where(has_target, 1.2, 0.8)
+    column = columns.get("combat")
+    if column is not None:
+        priorities[:, column] *= np.where(health > 50, 1.5, 0.5)
+    column = columns.get("flee")
+    if column is not None:
+        priorities[:, column] *= np.where(health < 30, 2.0, 0.1)
+
+    return priorities
+
+def score_context(weights: np.ndarray, health: np.ndarray, threat: np.ndarray,
+                  fear: np.ndarray, anger: np.ndarray, columns: Mapping[str, int]) -> np.ndarray:
+    """Applique les multiplicateurs d'état, d'environnement et d'émotion.
+
+    Identiques aux multiplicateurs scalaires d'AIManager (_calculate_state_,
+    _calculate_environment_ et _calculate_emotion_multiplier), utilisés par
+    update_npc : poids × état × environnement × émotion, dans cet ordre.
+    Les comportements absents (-inf) restent à -inf.
+    """
+    present = np.isfinite(weights)
+    health_ratio = (health / 100.0)[:, None]
+    state = np.ones_like(weights)
+    environment = np.ones_like(weights)
+    emotion = np.ones_like(weights)
+
+    column = columns.get("flee")
+    if column is not None:
+        state[:, column] = 2.0 - health_ratio[:, 0]
+        environment[:, column] = np.where(threat, 2.0, 1.0)
+        emotion[:, column] = 1.0 + fear
+    column = columns.get("combat")
+    if column is not None:
+        state[:, column] = health_ratio[:, 0]
+        emotion[:, column] = 1.0 + anger
+    column = columns.get("idle")
+    if column is not None:
+        environment[:, column] = np.where(threat, 0.5, 1.0)
+
+    priorities = np.where(present, weights, 0.0) * state * environment * emotion
+    priorities[~present] = -np.inf
+    return priorities
+
+def state_signature(health: Any, stamina: Any, has_target: Any) -> Any:
+    """Résumé des seuils utilisés par score_behaviors (scalaire ou tableau).
+
+    Deux états de même signature donnent les mêmes priorités : seul un
+    changement de signature peut modifier le comportement choisi.
+    """
+    return (
+        (stamina > 30) * 1
+        + (has_target != 0) * 2
+        + (health > 50) * 4
+        + (health < 30) * 8
+    )
+
+def select_behaviors(weights: np.ndarray, rank: np.ndarray, ordered: bool,
+                     health: np.ndarray, stamina: np.ndarray, has_target: np.ndarray,
+                     columns: Mapping[str, int]) -> np.ndarray:
+    """Indice de colonne gagnant par ligne (-1 si aucun comportement)."""
+    if weights.shape[1] == 0 or len(weights) == 0:
+        return np.full(len(weights), -1, dtype=np.intp)
+
+    priorities = score_behaviors(weights, health, stamina, has_target, columns)
+
+    if ordered:
+        choices = np.argmax(priorities, axis=1)
+    else:
+        # Égalités départagées selon l'ordre propre à chaque PNJ, comme max()
+        best = priorities.max(axis=1, keepdims=True)
+        ranks = np.where(priorities == best, rank, np.iinfo(np.int32).max)
+        choices = np.argmin(ranks, axis=1)
+
+    best = priorities[np.arange(len(weights)), choices]
+    return np.where(np.isneginf(best), -1, choices)
+
+class BehaviorScorer:
+    """Matrice de priorités PNJ × comportement.
+
+    Reproduit AIManager._calculate_priority par opérations vectorielles :
+    poids de base × modificateurs d'état, puis un seul argmax par tick.
+    score_context fournit les priorités contextuelles de update_npc.
+    """
+
+    def __init__(self, capacity: int, allocator: Optional[Any] = None):
+        self.capacity = int(capacity)
+        self.allocator = allocator or LocalArrays()
+        self.names: List[str] = []
+        self.index: Dict[str, int] = {}
+        # -inf pour les comportements que le PNJ ne possède pas
+        self.weights = self.allocator.full("weights", (self.capacity, 0), np.float64, -np.inf)
+        # Ordre d'insertion par PNJ, utilisé pour départager les égalités
+        self.rank = self.allocator.full("rank", (self.capacity, 0), np.int32, 0)
+        # Vrai tant que l'ordre de chaque PNJ suit l'ordre des colonnes
+        self.ordered = True
+
+    def ensure_capacity(self, capacity: int) -> None:
+        """Agrandit la matrice si nécessaire."""
+        if int(capacity) <= self.capacity:
+            return
+        columns = len(self.names)
+        weights = self.allocator.full("weights", (int(capacity), columns), np.float64, -np.inf)
+        weights[:self.capacity] = self.weights
+        rank = self.allocator.full("rank", (int(capacity), columns), np.int32, columns)
+        rank[:self.capacity] = self.rank
+        self.weights = weights
+        self.rank = rank
+        self.capacity = int(capacity)
+
+    def set_behaviors(self, slot: int, behaviors: Dict[str, Dict[str, Any]]) -> None:
+        """Définit les comportements d'un PNJ (dans l'ordre du dictionnaire)."""
+        for name in behaviors:
+            if name not in self.index:
+                self._add_column(name)
+
+        self.weights[slot] = -np.inf
+        self.rank[slot] = len(self.names)
+        previous = -1
+        for position, (name, data) in enumerate(behaviors.items()):
+            column = self.index[name]
+            self.weights[slot, column] = data["weight"]
+            self.rank[slot, column] = position
+            if column < previous:
+                self.ordered = False
+            previous = column
+
+    def clear(self, slot: int) -> None:
+        """Retire les comportements d'un PNJ."""
+        self.weights[slot] = -np.inf
+        self.rank[slot] = len(self.names)
+
+    def modifier_columns(self) -> Dict[str, int]:
+        """Colonnes des comportements soumis à un modificateur d'état."""
+        return {name: self.index[name] for name in MODIFIED_BEHAVIORS if name in self.index}
+
+    def score(self, slots: np.ndarray, health: np.ndarray, stamina: np.ndarray,
+              has_target: np.ndarray) -> np.ndarray:
+        """Calcule la matrice de priorités pour les emplacements donnés."""
+        return score_behaviors(self.weights[slots], health, stamina, has_target, self.index)
+
+    def score_context(self, slots: np.ndarray, health: np.ndarray, threat: np.ndarray,
+                      fear: np.ndarray, anger: np.ndarray) -> np.ndarray:
+        """Priorités du chemin update_npc pour les emplacements donnés."""
+        return score_context(self.weights[slots], health, threat, fear, anger, self.index)
+
+    def select(self, slots: np.ndarray, health: np.ndarray, stamina: np.ndarray,
+               has_target: np.ndarray) -> np.ndarray:
+        """Retourne l'indice de colonne gagnant par PNJ (-1 si aucun)."""
+        return select_behaviors(
+            self.weights[slots],
+            self.rank[slots],
+            self.ordered,
+            health,
+            stamina,
+            has_target,
+            self.index
+        )
+
+    def _add_column(self, name: str) -> None:
+        """Ajoute une colonne pour un nouveau comportement."""
+        self.index[name] = len(self.names)
+        self.names.append(name)
+        columns = len(self.names)
+        weights = self.allocator.full("weights", (self.capacity, columns), np.float64, -np.inf)
+        weights[:, :-1] = self.weights
+        rank = self.allocator.full("rank", (self.capacity, columns), np.int32, columns)
+        rank[:, :-1] = self.rank
+        self.weights = weights
+        self.rank = rank
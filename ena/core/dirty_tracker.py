@@ -0,0 +1,72 @@
+"""
+Suivi des PNJ dont le comportement doit être réévalué
+"""
+from typing import Any, Optional
+import numpy as np
+
+class DirtyTracker:
+    """Cache du comportement choisi par PNJ, avec drapeaux de modification.
+
+    Un PNJ n'est réévalué que si l'une de ses entrées a changé depuis le
+    dernier calcul : signature d'état (seuils de santé, d'endurance, cible),
+    émotion ayant varié de plus de epsilon, ou marquage explicite (nouvelle
+    perception, comportements modifiés...). Les autres réutilisent leur choix.
+    """
+
+    def __init__(self, capacity: int, emotion_count: int, emotion_epsilon: float = 0.05):
+        self.capacity = int(capacity)
+        self.emotion_epsilon = float(emotion_epsilon)
+        self.dirty = np.ones(self.capacity, dtype=bool)
+        self.signature = np.full(self.capacity, -1, dtype=np.int16)
+        self.emotions = np.zeros((self.capacity, emotion_count), dtype=np.float64)
+        self.choice = np.full(self.capacity, -1, dtype=np.intp)
+        self.reevaluated = 0
+        self.reused = 0
+
+    def ensure_capacity(self, capacity: int) -> None:
+        """Agrandit les tableaux si nécessaire (nouveaux emplacements à réévaluer)."""
+        extra = int(capacity) - self.capacity
+        if extra <= 0:
+            return
+        self.dirty = np.concatenate([self.dirty, np.ones(extra, dtype=bool)])
+        self.signature = np.concatenate([self.signature, np.full(extra, -1, dtype=np.int16)])
+        self.emotions = np.vstack([self.emotions, np.zeros((extra, self.emotions.shape[1]))])
+        self.choice = np.concatenate([self.choice, np.full(extra, -1, dtype=np.intp)])
+        self.capacity = int(capacity)
+
+    def mark(self, slots: Any) -> None:
+        """Force la réévaluation d'un ou plusieurs emplacements."""
+        self.dirty[slots] = True
+
+    def mark_all(self) -> None:
+        """Force la réévaluation de tous les PNJ."""
+        self.dirty[:] = True
+
+    def collect(self, slots: np.ndarray, signature: np.ndarray,
+                emotions: Optional[np.ndarray] = None) -> np.ndarray:
+        """Retourne le masque des emplacements à réévaluer et les marque propres."""
+        changed = self.dirty[slots] | (self.signature[slots] != signature)
+        if emotions is not None:
+            drift = np.abs(emotions - self.emotions[slots]).max(axis=1, initial=0.0)
+            changed |= drift > self.emotion_epsilon
+
+        stale = slots[changed]
+        self.signature[slots] = signature
+        if emotions is not None:
+            # L'instantané n'avance qu'à la réévaluation : les petites
+            # variations s'accumulent jusqu'à dépasser epsilon
+            self.emotions[stale] = emotions[changed]
+        self.dirty[slots] = False
+
+        self.reevaluated += len(stale)
+        self.reused += len(slots) - len(stale)
+        return changed
+
+    def is_dirty(self, slot: int, signature: int, emotions: Optional[np.ndarray] = None) -> bool:
+        """Version scalaire de collect pour un seul PNJ."""
+        return bool(self.collect(np.array([slot], dtype=np.intp), np.array([signature]),
+                                 None if emotions is None else emotions.reshape(1, -1))[0])
+
+    def get_stats(self) -> dict:
+        """Nombre de réévaluations et de choix réutilisés."""
+        return {"reevaluated": self.reevaluated, "reused": self.reused}
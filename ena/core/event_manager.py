@@ -1,18 +1,64 @@
 """
 Gestionnaire d'événements pour ENA
 """
-from typing import Dict, Any, List, Callable, Optional
+from typing import Dict, Any, List, Callable, Hashable, Optional, Tuple, Union
+import asyncio
+import threading
 from ..utils.logger import Logger
+from .event_queue import EventQueue, coalesce_events, coalesce_key
+from .event_router import SpatialRouter
 
 class Event:
     def __init__(self, event_type: str, data: Dict[str, Any]):
         self.type = event_type
         self.data = data
 
+class AsyncListener:
+    """Écouteur asynchrone et sa limite de concurrence"""
+    def __init__(self, callback: Callable[[Event], Any], concurrency: int = 1):
+        self.callback = callback
+        self.concurrency = max(1, int(concurrency))
+        self.is_coroutine = asyncio.iscoroutinefunction(callback)
+        # Créé dans la boucle asyncio au démarrage du mode asynchrone
+        self.semaphore: Optional[asyncio.Semaphore] = None
+
 class EventManager:
-    def __init__(self):
+    """Bus d'événements.
+
+    Les écouteurs synchrones (subscribe) sont appelés dans la pile de
+    l'émetteur et doivent rester rapides. Les écouteurs par lot
+    (subscribe_batch) reçoivent en une liste, à chaque flush, les événements
+    de leur type émis depuis le précédent. Les écouteurs spatiaux
+    (subscribe_spatial) ne reçoivent que les événements localisés dans leur
+    région ou à portée de leur disque. Les écouteurs asynchrones
+    (subscribe_async) reçoivent les événements via une file bornée par type,
+    vidée par une tâche asyncio : un écouteur lent ne ralentit plus le tick,
+    seule sa file se remplit, selon la politique de débordement du type.
+    """
+    def __init__(self, config: Optional[Any] = None):
         self.logger = Logger("EventManager")
         self.listeners: Dict[str, List[Callable[[Event], None]]] = {}
+        self.async_listeners: Dict[str, List[AsyncListener]] = {}
+        self.batch_listeners: Dict[str, List[Tuple[Callable[[List[Event]], None], Any]]] = {}
+        self._pending: Dict[str, List[Event]] = {}
+        self.queues: Dict[str, EventQueue] = {}
+        
+        get = config.get if config is not None else (lambda key, default=None: default)
+        self.router = SpatialRouter(get("events.spatial_cell_size", 50.0))
+        self.region_locator: Optional[Callable[[Any], Optional[str]]] = None
+        self.queue_size = get("events.queue_size", 1000)
+        self.overflow_policy = get("events.overflow_policy", "drop_oldest")
+        self.block_timeout = get("events.block_timeout", 1.0)
+        self.listener_concurrency = get("events.listener_concurrency", 1)
+        
+        # État du mode asynchrone
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self._loop_thread_id: Optional[int] = None
+        self._workers: Dict[str, asyncio.Task] = {}
+        self._wakeups: Dict[str, asyncio.Event] = {}
+        self._inflight: set = set()
+        self._dispatching = 0
         
     def subscribe(self, event_type: str, callback: Callable[[Event], None]) -> None:
         """Ajoute un écouteur d'événements"""
@@ -27,9 +73,19 @@ class EventManager:
     def unsubscribe(self, event_type: str, callback: Callable[[Event], None]) -> None:
         """Retire un écouteur d'événements"""
         try:
-            if event_type in self.listeners:
+            if callback in self.listeners.get(event_type, []):
                 self.listeners[event_type].remove(callback)
                 self.logger.debug(f"Écouteur retiré pour l'événement: {event_type}")
+            listeners = self.async_listeners.get(event_type, [])
+            for listener in [l for l in listeners if l.callback == callback]:
+                listeners.remove(listener)
+                self.logger.debug(f"Écouteur asynchrone retiré pour l'événement: {event_type}")
+            batch = self.batch_listeners.get(event_type, [])
+            for entry in [entry for entry in batch if entry[0] == callback]:
+                batch.remove(entry)
+                self.logger.debug(f"Écouteur par lot retiré pour l'événement: {event_type}")
+            if self.router.remove_callback(event_type, callback):
+                self.logger.debug(f"Écouteur spatial retiré pour l'événement: {event_type}")
         except Exception as e:
             self.logger.error(f"Erreur lors du retrait de l'écouteur: {str(e)}")
             
@@ -42,6 +98,16 @@ class EventManager:
                         callback(event)
                     except Exception as e:
                         self.logger.error(f"Erreur dans l'écouteur: {str(e)}")
+            if self.router.count(event.type):
+                for subscription in self.router.route(event, self.region_locator):
+                    try:
+                        subscription.callback(event)
+                    except Exception as e:
+                        self.logger.error(f"Erreur dans l'écouteur spatial: {str(e)}")
+            if self.batch_listeners.get(event.type):
+                self._pending.setdefault(event.type, []).append(event)
+            if self.async_listeners.get(event.type):
+                self._enqueue(event)
         except Exception as e:
             self.logger.error(f"Erreur lors de l'émission de l'événement: {str(e)}")
             
@@ -56,13 +122,335 @@ class EventManager:
             if event_type:
                 if event_type in self.listeners:
                     self.listeners[event_type].clear()
-                    self.logger.debug(f"Écouteurs effacés pour l'événement: {event_type}")
+                if event_type in self.async_listeners:
+                    self.async_listeners[event_type].clear()
+                if event_type in self.batch_listeners:
+                    self.batch_listeners[event_type].clear()
+                self._pending.pop(event_type, None)
+                self.router.clear(event_type)
+                self.logger.debug(f"Écouteurs effacés pour l'événement: {event_type}")
             else:
                 self.listeners.clear()
+                for listeners in self.async_listeners.values():
+                    listeners.clear()
+                self.batch_listeners.clear()
+                self._pending.clear()
+                self.router.clear()
                 self.logger.debug("Tous les écouteurs ont été effacés")
         except Exception as e:
             self.logger.error(f"Erreur lors de l'effacement des écouteurs: {str(e)}")
             
     def get_listener_count(self, event_type: str) -> int:
         """Retourne le nombre d'écouteurs pour un type d'événement"""
-        return len(self.listeners.get(event_type, []))
+        return (
+            len(self.listeners.get(event_type, []))
+            + len(self.async_listeners.get(event_type, []))
+            + len(self.batch_listeners.get(event_type, []))
+            + self.router.count(event_type)
+        )
+        
+    # Abonnements spatiaux
+    
+    def subscribe_spatial(self, event_type: str, callback: Callable[[Event], None],
+                          region_id: Optional[str] = None, center: Optional[Any] = None,
+                          radius: Optional[float] = None, follow: Optional[str] = None) -> Optional[int]:
+        """Ajoute un écouteur limité à une région ou à un disque ; retourne son identifiant.
+        
+        Soit region_id, soit radius (autour de center, ou de la position de
+        l'entité follow, mise à jour par move_entities). L'événement est
+        localisé par event.data["region_id"] et/ou event.data["position"],
+        avec une portée optionnelle event.data["radius"].
+        """
+        try:
+            subscription_id = self.router.add(event_type, callback, region_id, center, radius, follow)
+            self.logger.debug(f"Écouteur spatial ajouté pour l'événement: {event_type}")
+            return subscription_id
+        except Exception as e:
+            self.logger.error(f"Erreur lors de l'ajout de l'écouteur spatial: {str(e)}")
+            return None
+            
+    def unsubscribe_spatial(self, subscription_id: int) -> bool:
+        """Retire un écouteur spatial par son identifiant"""
+        return self.router.remove(subscription_id)
+        
+    def move_entities(self, positions: Dict[str, Any]) -> None:
+        """Déplace les écouteurs spatiaux qui suivent ces entités"""
+        try:
+            self.router.move_entities(positions)
+        except Exception as e:
+            self.logger.error(f"Erreur lors du déplacement des écouteurs spatiaux: {str(e)}")
+            
+    def forget_entity(self, entity_id: str) -> None:
+        """Suspend les écouteurs spatiaux qui suivent une entité disparue"""
+        self.router.forget_entity(entity_id)
+        
+    def set_region_locator(self, locator: Optional[Callable[[Any], Optional[str]]]) -> None:
+        """Fonction position -> région, pour router vers les abonnements à une région
+        les événements qui n'ont qu'une position"""
+        self.region_locator = locator
+        
+    # Livraison par lot
+    
+    def subscribe_batch(self, event_type: str, callback: Callable[[List[Event]], None],
+                        key: Union[None, str, Callable[[Event], Hashable]] = None) -> None:
+        """Ajoute un écouteur recevant les événements d'un type en une liste par flush.
+        
+        key (nom de champ de event.data ou fonction) fusionne les événements
+        de même clé : seul le dernier est livré, à la place du premier ; par
+        exemple key="id" pour ne garder que la dernière position de chaque PNJ.
+        """
+        try:
+            self.batch_listeners.setdefault(event_type, []).append((callback, key))
+            self.logger.debug(f"Écouteur par lot ajouté pour l'événement: {event_type}")
+        except Exception as e:
+            self.logger.error(f"Erreur lors de l'ajout de l'écouteur par lot: {str(e)}")
+            
+    def flush(self) -> int:
+        """Livre aux écouteurs par lot les événements émis depuis le dernier flush.
+        
+        Appelé une fois par tick ; retourne le nombre d'événements en attente
+        livrés. Les écouteurs de même clé partagent la même liste fusionnée.
+        """
+        pending, self._pending = self._pending, {}
+        count = 0
+        for event_type, events in pending.items():
+            count += len(events)
+            batches: Dict[Any, List[Event]] = {}
+            for callback, key in list(self.batch_listeners.get(event_type, [])):
+                try:
+                    batch = batches.get(key)
+                    if batch is None:
+                        batch = batches[key] = coalesce_events(events, coalesce_key(key))
+                    callback(batch)
+                except Exception as e:
+                    self.logger.error(f"Erreur dans l'écouteur par lot: {str(e)}")
+        return count
+        
+    def get_pending_count(self, event_type: Optional[str] = None) -> int:
+        """Nombre d'événements en attente du prochain flush"""
+        if event_type is not None:
+            return len(self._pending.get(event_type, []))
+        return sum(len(events) for events in self._pending.values())
+        
+    # Mode asynchrone
+    
+    def subscribe_async(self, event_type: str, callback: Callable[[Event], Any],
+                        concurrency: Optional[int] = None) -> None:
+        """Ajoute un écouteur servi par la file du type d'événement.
+        
+        callback peut être une coroutine ou une fonction ; une fonction est
+        exécutée dans le pool de threads de la boucle. concurrency borne le
+        nombre d'appels simultanés de cet écouteur.
+        """
+        try:
+            listener = AsyncListener(callback, concurrency or self.listener_concurrency)
+            self.async_listeners.setdefault(event_type, []).append(listener)
+            self._queue(event_type)
+            if self.loop is not None:
+                self.loop.call_soon_threadsafe(self._start_worker, event_type)
+            self.logger.debug(f"Écouteur asynchrone ajouté pour l'événement: {event_type}")
+        except Exception as e:
+            self.logger.error(f"Erreur lors de l'ajout de l'écouteur asynchrone: {str(e)}")
+            
+    def configure_queue(self, event_type: str, maxsize: Optional[int] = None,
+                        policy: Optional[str] = None,
+                        key: Union[None, str, Callable[[Event], Hashable]] = None) -> EventQueue:
+        """Règle la file d'un type d'événement.
+        
+        policy: "drop_oldest", "coalesce" ou "block" ; key (nom de champ de
+        event.data ou fonction) sert à la fusion, par exemple "npc_id" pour ne
+        garder que la dernière position de chaque PNJ. Les événements en
+        attente sont conservés.
+        """
+        previous = self.queues.get(event_type)
+        queue = EventQueue(
+            maxsize if maxsize is not None else (previous.maxsize if previous is not None else self.queue_size),
+            policy or (previous.policy if previous is not None else self.overflow_policy),
+            key
+        )
+        if previous is not None:
+            queue.dropped, queue.coalesced, queue.blocked = previous.dropped, previous.coalesced, previous.blocked
+            while True:
+                event = previous.get()
+                if event is None:
+                    break
+                queue.put(event, block=False)
+        self.queues[event_type] = queue
+        return queue
+        
+    def get_queue_stats(self, event_type: str) -> Dict[str, int]:
+        """Compteurs de la file d'un type d'événement (attente, pertes, fusions)."""
+        queue = self.queues.get(event_type)
+        return queue.stats() if queue is not None else {"pending": 0, "dropped": 0, "coalesced": 0, "blocked": 0}
+        
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> asyncio.AbstractEventLoop:
+        """Démarre le mode asynchrone ; retourne la boucle utilisée.
+        
+        Appelé depuis une coroutine, le bus utilise la boucle en cours ;
+        sinon il crée sa propre boucle dans un thread dédié.
+        """
+        if self.loop is not None:
+            return self.loop
+        if loop is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+        if loop is None:
+            loop = asyncio.new_event_loop()
+            self._loop_thread = threading.Thread(target=loop.run_forever, name="ena-events", daemon=True)
+            self._loop_thread.start()
+            self._loop_thread_id = self._loop_thread.ident
+        else:
+            self._loop_thread_id = threading.get_ident()
+        self.loop = loop
+        for event_type in list(self.async_listeners):
+            loop.call_soon_threadsafe(self._start_worker, event_type)
+        self.logger.info("Mode asynchrone des événements démarré")
+        return loop
+        
+    async def emit_async(self, event: Event) -> bool:
+        """Émet un événement depuis la boucle asyncio.
+        
+        Sous la politique block, attend sans bloquer la boucle qu'une place
+        se libère (au plus block_timeout secondes). Retourne False si
+        l'événement a été perdu.
+        """
+        queue = self.queues.get(event.type)
+        if queue is not None and queue.policy == "block" and self.async_listeners.get(event.type):
+            deadline = asyncio.get_running_loop().time() + self.block_timeout
+            while len(queue) >= queue.maxsize:
+                if asyncio.get_running_loop().time() >= deadline:
+                    queue.dropped += 1
+                    return False
+                await asyncio.sleep(0.001)
+        self.emit(event)
+        return True
+        
+    async def join(self) -> None:
+        """Attend que toutes les files soient vides et les écouteurs terminés."""
+        while self._dispatching or self._inflight or any(len(queue) for queue in self.queues.values()):
+            await asyncio.sleep(0.001)
+            
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Attend (hors de la boucle) la fin du traitement des files."""
+        if self.loop is None:
+            return True
+        try:
+            asyncio.run_coroutine_threadsafe(self.join(), self.loop).result(timeout)
+            return True
+        except Exception as e:
+            self.logger.error(f"Erreur lors de l'attente des files d'événements: {str(e)}")
+            return False
+            
+    async def close(self, drain: bool = True) -> None:
+        """Arrête les tâches du mode asynchrone (depuis la boucle)."""
+        if drain:
+            await self.join()
+        for task in list(self._workers.values()) + list(self._inflight):
+            task.cancel()
+        await asyncio.gather(*self._workers.values(), *self._inflight, return_exceptions=True)
+        self._workers.clear()
+        self._wakeups.clear()
+        self._inflight.clear()
+        self._dispatching = 0
+        for listeners in self.async_listeners.values():
+            for listener in listeners:
+                listener.semaphore = None
+        self.loop = None
+        self._loop_thread_id = None
+        
+    def stop(self, drain: bool = True, timeout: Optional[float] = 5.0) -> None:
+        """Arrête le mode asynchrone démarré hors d'une boucle."""
+        if self.loop is None:
+            return
+        loop = self.loop
+        try:
+            asyncio.run_coroutine_threadsafe(self.close(drain), loop).result(timeout)
+        except Exception as e:
+            self.logger.error(f"Erreur lors de l'arrêt du mode asynchrone: {str(e)}")
+        if self._loop_thread is not None:
+            loop.call_soon_threadsafe(loop.stop)
+            self._loop_thread.join(timeout)
+            loop.close()
+            self._loop_thread = None
+        self.loop = None
+        self.logger.info("Mode asynchrone des événements arrêté")
+        
+    def _queue(self, event_type: str) -> EventQueue:
+        """File d'un type d'événement, créée avec les réglages par défaut."""
+        queue = self.queues.get(event_type)
+        if queue is None:
+            queue = self.queues[event_type] = EventQueue(self.queue_size, self.overflow_policy)
+        return queue
+        
+    def _enqueue(self, event: Event) -> None:
+        """Place un événement dans la file de son type et réveille sa tâche."""
+        queue = self._queue(event.type)
+        # L'attente n'a de sens que si la boucle tourne dans un autre thread
+        can_block = self.loop is not None and threading.get_ident() != self._loop_thread_id
+        queue.put(event, block=can_block, timeout=self.block_timeout)
+        
+        loop = self.loop
+        if loop is not None:
+            wakeup = self._wakeups.get(event.type)
+            if wakeup is None or threading.get_ident() != self._loop_thread_id:
+                loop.call_soon_threadsafe(self._wake, event.type)
+            else:
+                wakeup.set()
+                
+    def _wake(self, event_type: str) -> None:
+        """Réveille la tâche d'un type (dans la boucle)."""
+        if event_type not in self._workers:
+            self._start_worker(event_type)
+        self._wakeups[event_type].set()
+        
+    def _start_worker(self, event_type: str) -> None:
+        """Crée la tâche qui vide la file d'un type (dans la boucle)."""
+        if self.loop is None or event_type in self._workers:
+            return
+        self._queue(event_type)
+        self._wakeups[event_type] = asyncio.Event()
+        self._wakeups[event_type].set()
+        self._workers[event_type] = self.loop.create_task(self._drain(event_type))
+        
+    async def _drain(self, event_type: str) -> None:
+        """Distribue les événements d'une file à ses écouteurs asynchrones.
+        
+        Un écouteur à sa limite de concurrence suspend la distribution : la
+        file se remplit et sa politique de débordement s'applique.
+        """
+        wakeup = self._wakeups[event_type]
+        while True:
+            queue = self.queues[event_type]
+            event = queue.get()
+            if event is None:
+                wakeup.clear()
+                if not len(queue):
+                    await wakeup.wait()
+                continue
+            self._dispatching += 1
+            try:
+                for listener in list(self.async_listeners.get(event_type, [])):
+                    if listener.semaphore is None:
+                        listener.semaphore = asyncio.Semaphore(listener.concurrency)
+                    await listener.semaphore.acquire()
+                    task = asyncio.ensure_future(self._deliver(listener, event))
+                    self._inflight.add(task)
+                    task.add_done_callback(self._inflight.discard)
+            finally:
+                self._dispatching -= 1
+                
+    async def _deliver(self, listener: AsyncListener, event: Event) -> None:
+        """Appelle un écouteur asynchrone puis libère sa place."""
+        try:
+            if listener.is_coroutine:
+                await listener.callback(event)
+            else:
+                result = await asyncio.get_running_loop().run_in_executor(None, listener.callback, event)
+                if asyncio.iscoroutine(result):
+                    await result
+        except Exception as e:
+            self.logger.error(f"Erreur dans l'écouteur asynchrone: {str(e)}")
+        finally:
+            listener.semaphore.release()
@@ -0,0 +1,114 @@
+"""
+Files d'événements bornées et fusion d'événements pour ENA
+"""
+from typing import Any, Callable, Dict, Hashable, List, Optional, Union
+from collections import OrderedDict
+import threading
+
+# Politiques appliquées quand une file pleine reçoit un nouvel événement
+OVERFLOW_POLICIES = ("drop_oldest", "coalesce", "block")
+
+def coalesce_key(key: Union[None, str, Callable[[Any], Hashable]]) -> Optional[Callable[[Any], Hashable]]:
+    """Fonction de clé de fusion : un nom de champ de event.data ou une fonction."""
+    if key is None or callable(key):
+        return key
+    return lambda event: event.data.get(key)
+
+def coalesce_events(events: List[Any], key: Optional[Callable[[Any], Hashable]]) -> List[Any]:
+    """Garde le dernier événement de chaque clé, à la place du premier.
+
+    Les événements sans clé (None) sont tous conservés.
+    """
+    if key is None:
+        return events
+    latest: Dict[Hashable, Any] = {}
+    for index, event in enumerate(events):
+        value = key(event)
+        latest[("seq", index) if value is None else ("key", value)] = event
+    return list(latest.values())
+
+class EventQueue:
+    """File bornée d'un type d'événement, partagée entre threads.
+
+    drop_oldest : une file pleine perd son plus ancien événement.
+    coalesce : un événement remplace, à sa place dans la file, l'événement en
+    attente de même clé (sans clé, seul le dernier est gardé) ; une nouvelle
+    clé sur une file pleine fait perdre le plus ancien.
+    block : l'émetteur attend qu'une place se libère, au plus timeout
+    secondes, puis l'événement est perdu.
+    """
+
+    def __init__(self, maxsize: int = 1000, policy: str = "drop_oldest",
+                 key: Union[None, str, Callable[[Any], Hashable]] = None):
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Politique de débordement inconnue: {policy}")
+        self.maxsize = max(1, int(maxsize))
+        self.policy = policy
+        self.key = coalesce_key(key)
+        self.dropped = 0
+        self.coalesced = 0
+        self.blocked = 0
+        self._items: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._sequence = 0
+        self._condition = threading.Condition()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def put(self, event: Any, block: bool = True, timeout: Optional[float] = None) -> bool:
+        """Ajoute un événement ; retourne False s'il a été perdu.
+
+        block=False interdit l'attente (émission depuis la boucle asyncio
+        elle-même) : la politique block se comporte alors comme drop_oldest.
+        """
+        with self._condition:
+            slot = None
+            if self.policy == "coalesce":
+                value = self.key(event) if self.key else None
+                if value is not None or self.key is None:
+                    slot = ("key", value)
+                    if slot in self._items:
+                        self._items[slot] = event
+                        self.coalesced += 1
+                        return True
+            if slot is None:
+                slot = ("seq", self._sequence)
+                self._sequence += 1
+
+            if len(self._items) >= self.maxsize:
+                if self.policy == "block" and block:
+                    self.blocked += 1
+                    if not self._condition.wait_for(lambda: len(self._items) < self.maxsize, timeout):
+                        self.dropped += 1
+                        return False
+                else:
+                    self._items.popitem(last=False)
+                    self.dropped += 1
+            self._items[slot] = event
+            return True
+
+    def get(self) -> Optional[Any]:
+        """Retire le plus ancien événement (None si la file est vide)."""
+        with self._condition:
+            if not self._items:
+                return None
+            _, event = self._items.popitem(last=False)
+            self._condition.notify_all()
+            return event
+
+    def clear(self) -> int:
+        """Vide la file ; retourne le nombre d'événements retirés."""
+        with self._condition:
+            count = len(self._items)
+            self._items.clear()
+            self._condition.notify_all()
+            return count
+
+    def stats(self) -> dict:
+        """Compteurs de la file."""
+        return {
+            "pending": len(self._items),
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "blocked": self.blocked
+        }
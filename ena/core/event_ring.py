@@ -0,0 +1,297 @@
+"""
+File circulaire d'événements en mémoire partagée (un producteur, un consommateur) pour ENA
+
+Disposition du segment (petit-boutiste) :
+
+    0    u32 magic ("ENAR")   u32 version   u32 capacity   u32 record_size
+    64   u64 head   (écrit par le producteur seul : prochain enregistrement)
+    72   u64 dropped (écrit par le producteur seul : enregistrements refusés)
+    128  u64 tail   (écrit par le consommateur seul : prochain à lire)
+    192  capacity enregistrements de 128 octets
+
+Enregistrement :
+
+    0   u16 type (code, voir EventCodec)   2  u16 flags   4  u32 sequence
+    8   f64 time   16  f32 position[3]   28  f32 radius
+    32  char entity[32]   64  char text[32] (UTF-8, complétés par des zéros)
+    96  f32 values[4]   112  16 octets réservés
+
+Le producteur écrit l'enregistrement à head % capacity puis publie head + 1 ;
+le consommateur lit jusqu'à head puis publie tail. Chaque compteur n'a
+qu'un écrivain et tient sur 8 octets alignés : aucun verrou n'est
+nécessaire (ordre des écritures garanti sur x86-64 ; un producteur sur une
+architecture à mémoire faible doit placer une barrière avant de publier head).
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from multiprocessing import shared_memory
+import numpy as np
+from ..utils.shared_arrays import open_segment
+from ..utils.spatial_index import to_point
+from .event_manager import Event
+
+RING_MAGIC = 0x52414E45  # "ENAR"
+RING_VERSION = 1
+HEADER_SIZE = 192
+HEAD, DROPPED, TAIL = 8, 9, 16  # indices u64 dans l'en-tête
+
+FLAG_POSITION = 1
+FLAG_RADIUS = 2
+FLAG_TIME = 4
+
+RECORD_DTYPE = np.dtype([
+    ("type", "<u2"),
+    ("flags", "<u2"),
+    ("sequence", "<u4"),
+    ("time", "<f8"),
+    ("position", "<f4", (3,)),
+    ("radius", "<f4"),
+    ("entity", "S32"),
+    ("text", "S32"),
+    ("values", "<f4", (4,)),
+    ("reserved", "V16")
+])
+assert RECORD_DTYPE.itemsize == 128
+
+# (type, code, champ de l'entité, champ du texte, champs des valeurs)
+DEFAULT_LAYOUTS = (
+    ("npc_spawn", 1, "id", "region_id", ()),
+    ("npc_move", 2, "id", None, ()),
+    ("npc_despawn", 3, "id", None, ()),
+    ("npc_action", 4, "npc_id", "action_type", ("delta_time",)),
+    ("player_enter_region", 5, "player_id", "region_id", ()),
+    ("player_leave_region", 6, "player_id", "region_id", ()),
+    ("explosion", 16, "id", "region_id", ("intensity",)),
+    ("gunshot", 17, "id", "region_id", ("intensity",)),
+    ("noise", 18, "id", "region_id", ("intensity",)),
+    ("crime", 19, "id", "region_id", ("severity",))
+)
+
+class EventCodec:
+    """Correspondance entre événements ENA et enregistrements binaires.
+
+    Chaque type a un code et précise quels champs de event.data vont dans
+    les colonnes entity, text et values ; position, radius et time ont
+    leurs propres colonnes.
+    """
+
+    def __init__(self, layouts: Sequence[Tuple[str, int, Optional[str], Optional[str], Sequence[str]]] = DEFAULT_LAYOUTS):
+        self.codes: Dict[str, int] = {}
+        self.layouts: Dict[int, Tuple[str, Optional[str], Optional[str], Tuple[str, ...]]] = {}
+        for layout in layouts:
+            self.register(*layout)
+
+    def register(self, event_type: str, code: int, entity: Optional[str] = "id",
+                 text: Optional[str] = None, values: Sequence[str] = ()) -> None:
+        """Déclare (ou remplace) la disposition d'un type d'événement."""
+        if not 0 < code < 65536:
+            raise ValueError(f"Code d'événement invalide: {code}")
+        if len(values) > 4:
+            raise ValueError("Un enregistrement porte au plus 4 valeurs")
+        previous = self.layouts.get(code)
+        if previous is not None and previous[0] != event_type:
+            raise ValueError(f"Code {code} déjà utilisé par {previous[0]}")
+        self.codes[event_type] = code
+        self.layouts[code] = (event_type, entity, text, tuple(values))
+
+    def encode(self, events: Sequence[Event], out: np.ndarray) -> None:
+        """Écrit des événements dans un tableau d'enregistrements de même longueur."""
+        count = len(events)
+        codes = np.zeros(count, dtype=np.uint16)
+        flags = np.zeros(count, dtype=np.uint16)
+        times = np.zeros(count)
+        positions = np.zeros((count, 3), dtype=np.float32)
+        radii = np.zeros(count, dtype=np.float32)
+        values = np.zeros((count, 4), dtype=np.float32)
+        entities: List[bytes] = []
+        texts: List[bytes] = []
+        for row, event in enumerate(events):
+            code = self.codes.get(event.type)
+            if code is None:
+                raise ValueError(f"Type d'événement sans code: {event.type}")
+            _, entity, text, names = self.layouts[code]
+            data = event.data
+            codes[row] = code
+            if data.get("position") is not None:
+                position = to_point(data["position"])
+                positions[row] = position
+                flags[row] |= FLAG_POSITION
+            if data.get("radius") is not None:
+                radii[row] = data["radius"]
+                flags[row] |= FLAG_RADIUS
+            if data.get("time") is not None:
+                times[row] = data["time"]
+                flags[row] |= FLAG_TIME
+            entities.append(_fixed_text(data.get(entity)) if entity is not None else b"")
+            texts.append(_fixed_text(data.get(text)) if text is not None else b"")
+            for index, name in enumerate(names):
+                values[row, index] = data.get(name, 0.0)
+
+        out["type"] = codes
+        out["flags"] = flags
+        out["sequence"] = 0
+        out["time"] = times
+        out["position"] = positions
+        out["radius"] = radii
+        out["entity"] = entities
+        out["text"] = texts
+        out["values"] = values
+        out["reserved"] = b""
+
+    def decode(self, records: np.ndarray) -> List[Event]:
+        """Reconstruit les événements d'un tableau d'enregistrements."""
+        events = []
+        columns = zip(
+            records["type"].tolist(), records["flags"].tolist(), records["time"].tolist(),
+            records["position"].tolist(), records["radius"].tolist(),
+            records["entity"].tolist(), records["text"].tolist(), records["values"].tolist()
+        )
+        for code, flags, time, position, radius, entity_id, text_value, values in columns:
+            layout = self.layouts.get(code)
+            if layout is None:
+                continue
+            event_type, entity, text, names = layout
+            data: Dict[str, Any] = {}
+            if entity is not None and entity_id:
+                data[entity] = entity_id.decode("utf-8")
+            if text is not None and text_value:
+                data[text] = text_value.decode("utf-8")
+            if flags & FLAG_POSITION:
+                data["position"] = position
+            if flags & FLAG_RADIUS:
+                data["radius"] = radius
+            if flags & FLAG_TIME:
+                data["time"] = time
+            for name, value in zip(names, values):
+                data[name] = value
+            events.append(Event(event_type, data))
+        return events
+
+def _fixed_text(value: Any) -> bytes:
+    """Texte UTF-8 d'au plus 32 octets (vide pour None)."""
+    if value is None:
+        return b""
+    encoded = str(value).encode("utf-8")
+    if len(encoded) > 32:
+        raise ValueError(f"Texte trop long pour un enregistrement (32 octets max): {value}")
+    return encoded
+
+class EventRing:
+    """File circulaire d'enregistrements d'événements dans un segment partagé.
+
+    Le processus d'ENA crée le segment et consomme ; le jeu (ou un
+    producteur Python de substitution) s'y attache par son nom et produit.
+    Une file pleine refuse les nouveaux enregistrements et les compte dans
+    dropped : le producteur n'attend jamais.
+    """
+
+    def __init__(self, name: Optional[str] = None, capacity: int = 4096, create: bool = True,
+                 codec: Optional[EventCodec] = None):
+        self.codec = codec or EventCodec()
+        if create:
+            # Capacité arrondie à une puissance de deux (index par masque)
+            capacity = 1 << max(0, int(capacity) - 1).bit_length()
+            self.block = shared_memory.SharedMemory(
+                name=name, create=True, size=HEADER_SIZE + capacity * RECORD_DTYPE.itemsize
+            )
+            header = np.ndarray(4, dtype="<u4", buffer=self.block.buf)
+            header[:] = (RING_MAGIC, RING_VERSION, capacity, RECORD_DTYPE.itemsize)
+        else:
+            # Le créateur reste seul responsable de la libération
+            self.block = open_segment(name)
+            header = np.ndarray(4, dtype="<u4", buffer=self.block.buf)
+            if header[0] != RING_MAGIC or header[1] != RING_VERSION or header[3] != RECORD_DTYPE.itemsize:
+                self.block.close()
+                raise ValueError(f"Segment {name} : en-tête de file d'événements invalide")
+            capacity = int(header[2])
+
+        self.owner = create
+        self.name = self.block.name
+        self.capacity = capacity
+        self._mask = capacity - 1
+        self._header = header
+        self._control = np.ndarray(HEADER_SIZE // 8, dtype="<u8", buffer=self.block.buf)
+        self.records = np.ndarray(capacity, dtype=RECORD_DTYPE, buffer=self.block.buf, offset=HEADER_SIZE)
+        if create:
+            self._control[[HEAD, DROPPED, TAIL]] = 0
+
+    @classmethod
+    def attach(cls, name: str, codec: Optional[EventCodec] = None) -> "EventRing":
+        """S'attache à une file existante (côté producteur)."""
+        return cls(name, create=False, codec=codec)
+
+    def __len__(self) -> int:
+        return int(self._control[HEAD] - self._control[TAIL])
+
+    @property
+    def dropped(self) -> int:
+        """Enregistrements refusés par une file pleine."""
+        return int(self._control[DROPPED])
+
+    def push(self, event: Event) -> bool:
+        """Produit un événement ; retourne False si la file est pleine."""
+        return self.push_many([event]) == 1
+
+    def push_many(self, events: Sequence[Event]) -> int:
+        """Produit des événements en une publication ; retourne le nombre accepté."""
+        control = self._control
+        head = int(control[HEAD])
+        free = self.capacity - (head - int(control[TAIL]))
+        count = min(len(events), free)
+        if count < len(events):
+            control[DROPPED] += len(events) - count
+        if count <= 0:
+            return 0
+
+        batch = np.empty(count, dtype=RECORD_DTYPE)
+        self.codec.encode(events[:count], batch)
+        batch["sequence"] = (np.arange(head, head + count) & 0xFFFFFFFF).astype(np.uint32)
+        self._copy_in(head, batch)
+        # Publication : le consommateur voit les enregistrements après cette écriture
+        control[HEAD] = head + count
+        return count
+
+    def pop(self, max_events: Optional[int] = None) -> List[Event]:
+        """Consomme les événements disponibles (au plus max_events)."""
+        control = self._control
+        tail = int(control[TAIL])
+        count = int(control[HEAD]) - tail
+        if max_events is not None:
+            count = min(count, int(max_events))
+        if count <= 0:
+            return []
+        records = self._copy_out(tail, count)
+        # Les emplacements lus sont rendus au producteur
+        control[TAIL] = tail + count
+        return self.codec.decode(records)
+
+    def drain(self, event_manager: Any, max_events: Optional[int] = None) -> int:
+        """Émet dans un EventManager les événements disponibles ; retourne leur nombre."""
+        events = self.pop(max_events)
+        if events:
+            event_manager.emit_all(events)
+        return len(events)
+
+    def close(self) -> None:
+        """Se détache du segment ; le créateur le détruit."""
+        self._header = self._control = self.records = None
+        self.block.close()
+        if self.owner:
+            try:
+                self.block.unlink()
+            except FileNotFoundError:
+                pass
+
+    def _copy_in(self, start: int, batch: np.ndarray) -> None:
+        """Copie des enregistrements à partir de la position start (avec retour au début)."""
+        first = start & self._mask
+        split = min(len(batch), self.capacity - first)
+        self.records[first:first + split] = batch[:split]
+        self.records[:len(batch) - split] = batch[split:]
+
+    def _copy_out(self, start: int, count: int) -> np.ndarray:
+        """Copie count enregistrements à partir de la position start."""
+        first = start & self._mask
+        split = min(count, self.capacity - first)
+        if split == count:
+            return self.records[first:first + count].copy()
+        return np.concatenate([self.records[first:], self.records[:count - split]])
@@ -0,0 +1,178 @@
+"""
+Routage spatial des événements pour ENA
+"""
+from typing import Any, Callable, Dict, List, Optional
+import math
+from ..utils.spatial_index import SpatialHash, Position, to_point
+
+class SpatialSubscription:
+    """Abonnement limité à une région ou à un disque (éventuellement mobile)"""
+    __slots__ = ("id", "event_type", "callback", "region_id", "center", "radius", "follow")
+
+    def __init__(self, subscription_id: int, event_type: str, callback: Callable[[Any], None],
+                 region_id: Optional[str] = None, center: Optional[Position] = None,
+                 radius: Optional[float] = None, follow: Optional[str] = None):
+        self.id = subscription_id
+        self.event_type = event_type
+        self.callback = callback
+        self.region_id = region_id
+        self.center = to_point(center) if center is not None else None
+        self.radius = radius
+        self.follow = follow
+
+class SpatialRouter:
+    """Abonnements spatiaux, indexés pour ne servir que les écouteurs concernés.
+
+    Un événement localisé porte un "region_id" et/ou une "position" (avec
+    éventuellement une portée "radius") dans ses données. Les abonnements à
+    une région sont rangés par région ; les abonnements à un disque sont
+    placés, par type d'événement, dans une table spatiale interrogée à la
+    portée de l'événement plus le plus grand rayon d'abonnement. Un disque
+    peut suivre une entité : son centre est alors déplacé avec elle.
+    """
+
+    def __init__(self, cell_size: float = 50.0):
+        self.cell_size = cell_size
+        self.subscriptions: Dict[int, SpatialSubscription] = {}
+        self.by_region: Dict[str, Dict[str, Dict[int, None]]] = {}
+        self.index: Dict[str, SpatialHash] = {}
+        self.max_radius: Dict[str, float] = {}
+        self.followers: Dict[str, Dict[int, None]] = {}
+        self.entity_positions: Dict[str, tuple] = {}
+        self.counts: Dict[str, int] = {}
+        self._next_id = 1
+
+    def __len__(self) -> int:
+        return len(self.subscriptions)
+
+    def count(self, event_type: str) -> int:
+        """Nombre d'abonnements spatiaux d'un type d'événement."""
+        return self.counts.get(event_type, 0)
+
+    def add(self, event_type: str, callback: Callable[[Any], None], region_id: Optional[str] = None,
+            center: Optional[Position] = None, radius: Optional[float] = None,
+            follow: Optional[str] = None) -> int:
+        """Ajoute un abonnement ; retourne son identifiant."""
+        if (region_id is None) == (radius is None):
+            raise ValueError("Un abonnement spatial demande soit une région, soit un rayon")
+        if radius is not None and radius < 0:
+            raise ValueError(f"Rayon d'abonnement négatif: {radius}")
+        if region_id is not None and (center is not None or follow is not None):
+            raise ValueError("Un abonnement à une région n'a ni centre ni entité suivie")
+
+        subscription = SpatialSubscription(self._next_id, event_type, callback, region_id, center, radius, follow)
+        self._next_id += 1
+        self.subscriptions[subscription.id] = subscription
+        self.counts[event_type] = self.counts.get(event_type, 0) + 1
+
+        if region_id is not None:
+            self.by_region.setdefault(event_type, {}).setdefault(region_id, {})[subscription.id] = None
+            return subscription.id
+
+        self.max_radius[event_type] = max(self.max_radius.get(event_type, 0.0), float(radius))
+        if follow is not None:
+            self.followers.setdefault(follow, {})[subscription.id] = None
+            if follow in self.entity_positions:
+                subscription.center = self.entity_positions[follow]
+        if subscription.center is not None:
+            self.index.setdefault(event_type, SpatialHash(self.cell_size)).insert(subscription.id, subscription.center)
+        return subscription.id
+
+    def remove(self, subscription_id: int) -> bool:
+        """Retire un abonnement."""
+        subscription = self.subscriptions.pop(subscription_id, None)
+        if subscription is None:
+            return False
+        event_type = subscription.event_type
+        self.counts[event_type] -= 1
+        if subscription.region_id is not None:
+            self.by_region[event_type][subscription.region_id].pop(subscription_id, None)
+            return True
+        index = self.index.get(event_type)
+        if index is not None and subscription_id in index:
+            index.remove(subscription_id)
+        if subscription.follow is not None:
+            self.followers[subscription.follow].pop(subscription_id, None)
+        if subscription.radius >= self.max_radius.get(event_type, 0.0):
+            # Le plus grand rayon ne fait qu'élargir la recherche : recalculé au retrait
+            self.max_radius[event_type] = max(
+                (other.radius for other in self.subscriptions.values()
+                 if other.event_type == event_type and other.radius is not None),
+                default=0.0
+            )
+        return True
+
+    def remove_callback(self, event_type: str, callback: Callable[[Any], None]) -> int:
+        """Retire les abonnements d'un écouteur ; retourne leur nombre."""
+        found = [
+            subscription.id for subscription in self.subscriptions.values()
+            if subscription.event_type == event_type and subscription.callback == callback
+        ]
+        for subscription_id in found:
+            self.remove(subscription_id)
+        return len(found)
+
+    def clear(self, event_type: Optional[str] = None) -> None:
+        """Retire les abonnements d'un type, ou tous."""
+        for subscription in list(self.subscriptions.values()):
+            if event_type is None or subscription.event_type == event_type:
+                self.remove(subscription.id)
+
+    def move_entities(self, positions: Dict[str, Position]) -> None:
+        """Déplace les abonnements qui suivent ces entités."""
+        for entity_id, position in positions.items():
+            followers = self.followers.get(entity_id)
+            if followers is None:
+                continue
+            point = to_point(position)
+            self.entity_positions[entity_id] = point
+            for subscription_id in followers:
+                subscription = self.subscriptions[subscription_id]
+                subscription.center = point
+                index = self.index.setdefault(subscription.event_type, SpatialHash(self.cell_size))
+                if subscription_id in index:
+                    index.move(subscription_id, point)
+                else:
+                    index.insert(subscription_id, point)
+
+    def forget_entity(self, entity_id: str) -> None:
+        """Oublie la position d'une entité ; ses abonnements ne reçoivent plus rien."""
+        self.entity_positions.pop(entity_id, None)
+        for subscription_id in self.followers.get(entity_id, ()):
+            subscription = self.subscriptions[subscription_id]
+            subscription.center = None
+            index = self.index.get(subscription.event_type)
+            if index is not None and subscription_id in index:
+                index.remove(subscription_id)
+
+    def route(self, event: Any, locate: Optional[Callable[[Position], Optional[str]]] = None) -> List[SpatialSubscription]:
+        """Abonnements concernés par un événement, dans leur ordre d'abonnement.
+
+        Un événement sans région ni position n'atteint aucun abonnement
+        spatial. locate déduit la région d'un événement qui n'a qu'une
+        position.
+        """
+        event_type = event.type
+        if not self.counts.get(event_type):
+            return []
+        data = event.data
+        region_id = data.get("region_id")
+        position = data.get("position")
+        matched: List[int] = []
+
+        if position is not None:
+            point = to_point(position)
+            if region_id is None and locate is not None and self.by_region.get(event_type):
+                region_id = locate(point)
+            index = self.index.get(event_type)
+            if index:
+                reach = float(data.get("radius", 0.0))
+                subscriptions = self.subscriptions
+                for subscription_id in index.candidates(point, reach + self.max_radius[event_type]):
+                    subscription = subscriptions[subscription_id]
+                    if math.dist(subscription.center, point) <= subscription.radius + reach:
+                        matched.append(subscription_id)
+
+        if region_id is not None:
+            matched.extend(self.by_region.get(event_type, {}).get(region_id, ()))
+        return [self.subscriptions[subscription_id] for subscription_id in sorted(set(matched))]
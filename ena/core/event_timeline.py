@@ -0,0 +1,112 @@
+"""
+Cycle de vie des événements du monde (échéancier à tas binaire)
+"""
+from typing import Any, Dict, List, Optional, Tuple
+from collections import OrderedDict
+import heapq
+import itertools
+import math
+
+def event_progress(event: Dict[str, Any], now: float) -> float:
+    """Progression d'un événement, calculée depuis son heure d'apparition."""
+    duration = event["state"]["duration"]
+    if duration <= 0:
+        return 1.0
+    return min(1.0, max(0.0, (now - event["time"]) / duration))
+
+def event_intensity(event: Dict[str, Any], now: float) -> float:
+    """Intensité courante : intensité nominale × exp(-decay_rate × âge).
+
+    L'âge est mesuré depuis la dernière modification de l'intensité
+    (intensity_time), ou depuis l'apparition de l'événement.
+    """
+    state = event["state"]
+    decay_rate = state.get("decay_rate", 0.0)
+    if not decay_rate:
+        return state["base_intensity"]
+    start = state.get("intensity_time", event["time"])
+    end = min(now, event["time"] + state["duration"])
+    return state["base_intensity"] * math.exp(-decay_rate * max(0.0, end - start))
+
+class EventTimeline:
+    """Événements actifs indexés par échéance, et archive bornée des terminés.
+
+    Chaque tick ne traite que les événements arrivés à échéance (tas binaire
+    trié par heure de fin) : le coût ne dépend plus de l'historique. La
+    progression et l'intensité sont calculées à la demande.
+    """
+
+    def __init__(self, archive_size: int = 1000):
+        self.active: Dict[str, Dict[str, Any]] = {}
+        self.archive: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.archive_size = max(0, int(archive_size))
+        self._heap: List[Tuple[float, int, str]] = []
+        self._sequence = itertools.count()
+        self._ids = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self.active)
+
+    def __contains__(self, event_id: str) -> bool:
+        return event_id in self.active
+
+    def next_id(self, event_type: str) -> str:
+        """Identifiant unique (compteur monotone, jamais réutilisé)."""
+        return f"{event_type}_{next(self._ids)}"
+
+    def add(self, event_id: str, event: Dict[str, Any]) -> None:
+        """Ajoute un événement actif, planifié à sa fin."""
+        self.active[event_id] = event
+        self.schedule(event_id, event["time"] + event["state"]["duration"])
+
+    def schedule(self, event_id: str, expires_at: float) -> None:
+        """(Re)planifie la fin d'un événement ; les anciennes entrées sont ignorées."""
+        event = self.active[event_id]
+        event["expires_at"] = expires_at
+        heapq.heappush(self._heap, (expires_at, next(self._sequence), event_id))
+
+    def next_expiry(self) -> Optional[float]:
+        """Prochaine échéance (None si aucun événement actif)."""
+        self._discard_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_expired(self, now: float) -> List[Tuple[str, Dict[str, Any]]]:
+        """Retire et retourne les événements terminés à l'instant now, par échéance."""
+        expired = []
+        while self._heap and self._heap[0][0] <= now:
+            expires_at, _, event_id = heapq.heappop(self._heap)
+            event = self.active.get(event_id)
+            if event is None or event.get("expires_at") != expires_at:
+                continue
+            del self.active[event_id]
+            expired.append((event_id, event))
+        return expired
+
+    def cancel(self, event_id: str) -> Optional[Dict[str, Any]]:
+        """Retire un événement actif sans attendre son échéance."""
+        # L'entrée du tas devient obsolète et sera ignorée
+        return self.active.pop(event_id, None)
+
+    def archive_event(self, event_id: str, event: Dict[str, Any]) -> None:
+        """Conserve un événement terminé, en oubliant les plus anciens."""
+        if self.archive_size == 0:
+            return
+        self.archive[event_id] = event
+        while len(self.archive) > self.archive_size:
+            self.archive.popitem(last=False)
+
+    def get(self, event_id: str) -> Optional[Dict[str, Any]]:
+        """Événement actif ou archivé."""
+        event = self.active.get(event_id)
+        if event is None:
+            event = self.archive.get(event_id)
+        return event
+
+    def _discard_stale(self) -> None:
+        """Retire du sommet du tas les entrées annulées ou replanifiées."""
+        while self._heap:
+            expires_at, _, event_id = self._heap[0]
+            event = self.active.get(event_id)
+            if event is not None and event.get("expires_at") == expires_at:
+                return
+            heapq.heappop(self._heap)
@@ -12,6 +12,8 @@ class Faction:
         self.description = data.get("description", "")
         self.relationships: Dict[str, float] = data.get("relationships", {})
         self.members: List[str] = []
+        # Réputation des PNJ (ou joueurs) auprès de la faction
+        self.reputation: Dict[str, float] = {}
 
 class FactionManager:
     def __init__(self, config: Config):
@@ -111,3 +113,23 @@ class FactionManager:
         """Récupère la liste des membres d'une faction"""
         faction = self.factions.get(faction_id)
         return faction.members if faction else []
+        
+    def get_reputation(self, faction_id: str, entity_id: str) -> float:
+        """Récupère la réputation d'un PNJ auprès d'une faction"""
+        faction = self.factions.get(faction_id)
+        return faction.reputation.get(entity_id, 0.0) if faction else 0.0
+        
+    def adjust_reputations(self, changes: List[Tuple[str, str, float]]) -> List[bool]:
+        """Modifie en un appel la réputation de plusieurs PNJ (PNJ, faction, variation).
+        
+        Retourne pour chaque variation si la faction existe.
+        """
+        applied = []
+        for entity_id, faction_id, amount in changes:
+            faction = self.factions.get(faction_id)
+            if faction is None:
+                applied.append(False)
+                continue
+            faction.reputation[entity_id] = faction.reputation.get(entity_id, 0.0) + amount
+            applied.append(True)
+        return applied
@@ -0,0 +1,110 @@
+"""
+Planificateur de niveaux de détail (LOD) pour les mises à jour des PNJ
+"""
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+
+# (distance maximale, intervalle en ticks) du plus proche au plus lointain
+DEFAULT_TIERS = [
+    [50.0, 1],
+    [150.0, 2],
+    [400.0, 4],
+    [1000.0, 8],
+    [None, 16]
+]
+
+class LODScheduler:
+    """Attribue à chaque PNJ un palier de fréquence de mise à jour.
+
+    Le palier dépend de la distance au plus proche observateur (joueur,
+    caméra...). Les PNJ importants ou engagés en combat restent au palier 0.
+    Un PNJ d'un palier inférieur n'est mis à jour que tous les N ticks, avec
+    le delta_time et le nombre de ticks accumulés depuis sa dernière mise à
+    jour. Sans observateur, tous les PNJ sont mis à jour à chaque tick.
+    """
+
+    def __init__(self, capacity: int, tiers: Optional[Sequence[Sequence[Any]]] = None):
+        tiers = tiers or DEFAULT_TIERS
+        self.thresholds = np.array(
+            [np.inf if distance is None else float(distance) for distance, _ in tiers[:-1]],
+            dtype=np.float64
+        )
+        self.intervals = np.array([max(1, int(interval)) for _, interval in tiers], dtype=np.int64)
+        self.capacity = 0
+        self.tier = np.zeros(0, dtype=np.int8)
+        self.important = np.zeros(0, dtype=bool)
+        self.engaged = np.zeros(0, dtype=bool)
+        self.elapsed = np.zeros(0, dtype=np.float64)
+        self.ticks = np.zeros(0, dtype=np.int64)
+        self.observers = np.zeros((0, 3), dtype=np.float64)
+        self.frame = 0
+        self.ensure_capacity(capacity)
+
+    def ensure_capacity(self, capacity: int) -> None:
+        """Agrandit les tableaux si nécessaire."""
+        extra = int(capacity) - self.capacity
+        if extra <= 0:
+            return
+
+        self.tier = np.concatenate([self.tier, np.zeros(extra, dtype=np.int8)])
+        self.important = np.concatenate([self.important, np.zeros(extra, dtype=bool)])
+        self.engaged = np.concatenate([self.engaged, np.zeros(extra, dtype=bool)])
+        self.elapsed = np.concatenate([self.elapsed, np.zeros(extra)])
+        self.ticks = np.concatenate([self.ticks, np.zeros(extra, dtype=np.int64)])
+        self.capacity = int(capacity)
+
+    def reset(self, slot: int) -> None:
+        """Réinitialise un emplacement (nouveau PNJ)."""
+        self.tier[slot] = 0
+        self.important[slot] = False
+        self.engaged[slot] = False
+        self.elapsed[slot] = 0.0
+        self.ticks[slot] = 0
+
+    def set_observers(self, positions: Iterable[Sequence[float]]) -> None:
+        """Définit les positions des observateurs (joueur, caméras...)."""
+        observers = np.asarray(list(positions), dtype=np.float64)
+        self.observers = observers.reshape(-1, 3) if observers.size else np.zeros((0, 3))
+
+    def assign_tiers(self, slots: np.ndarray, positions: np.ndarray) -> np.ndarray:
+        """Calcule le palier de chaque emplacement à partir de sa position."""
+        if len(self.observers) == 0 or len(slots) == 0:
+            tiers = np.zeros(len(slots), dtype=np.int8)
+        else:
+            offsets = positions[:, None, :] - self.observers[None, :, :]
+            distances = np.sqrt(np.min(np.einsum("nok,nok->no", offsets, offsets), axis=1))
+            tiers = np.searchsorted(self.thresholds, distances, side="right").astype(np.int8)
+
+        tiers[self.important[slots] | self.engaged[slots]] = 0
+        return tiers
+
+    def schedule(self, slots: np.ndarray, positions: np.ndarray,
+                 delta_time: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Retourne les emplacements à mettre à jour ce tick.
+
+        Résultat: (emplacements, delta_time accumulé, ticks accumulés).
+        """
+        slots = np.asarray(slots, dtype=np.intp)
+        self.elapsed[slots] += delta_time
+        self.ticks[slots] += 1
+
+        tiers = self.assign_tiers(slots, positions)
+        promoted = tiers < self.tier[slots]
+        self.tier[slots] = tiers
+
+        # Décalage par emplacement pour étaler la charge entre les ticks ;
+        # un PNJ promu est mis à jour immédiatement.
+        intervals = self.intervals[tiers]
+        due = ((self.frame + slots) % intervals == 0) | promoted
+        self.frame += 1
+
+        due_slots = slots[due]
+        elapsed = self.elapsed[due_slots].copy()
+        ticks = self.ticks[due_slots].copy()
+        self.elapsed[due_slots] = 0.0
+        self.ticks[due_slots] = 0
+        return due_slots, elapsed, ticks
+
+    def tier_counts(self, slots: np.ndarray) -> List[int]:
+        """Nombre de PNJ par palier (diagnostic)."""
+        return np.bincount(self.tier[slots], minlength=len(self.intervals)).tolist()
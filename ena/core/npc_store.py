@@ -0,0 +1,212 @@
+"""
+Stockage colonnaire de l'état des PNJ pour ENA
+"""
+from typing import Dict, Any, List, Optional, Iterator
+from collections.abc import MutableMapping
+import numpy as np
+from ..utils.shared_arrays import LocalArrays
+
+# Ordre des colonnes d'émotions (identique à AIManager.register_npc)
+EMOTIONS = (
+    "joy",
+    "trust",
+    "fear",
+    "surprise",
+    "sadness",
+    "disgust",
+    "anger",
+    "anticipation"
+)
+
+class NPCStateStore:
+    """Tableaux NumPy préalloués contenant l'état numérique des PNJ.
+
+    Chaque PNJ occupe un emplacement (slot) fixe pendant toute sa durée de vie,
+    ce qui permet de mettre à jour tous les PNJ par opérations vectorielles.
+    Les tableaux sont fournis par un allocateur (mémoire locale par défaut,
+    ou SharedArrays pour les mises à jour en parallèle).
+    """
+
+    SCALAR_FIELDS = ("health", "stamina", "experience")
+    VECTOR_FIELDS = ("position", "rotation")
+    # Champs conservés tels quels mais dont la présence est indexée en colonne
+    FLAG_FIELDS = {"target": "has_target"}
+
+    def __init__(self, capacity: int, allocator: Optional[Any] = None):
+        self.capacity = int(capacity)
+        self.allocator = allocator or LocalArrays()
+        full = self.allocator.full
+        self.health = full("health", (self.capacity,), np.float64, 0.0)
+        self.stamina = full("stamina", (self.capacity,), np.float64, 0.0)
+        self.experience = full("experience", (self.capacity,), np.float64, 0.0)
+        self.position = full("position", (self.capacity, 3), np.float64, 0.0)
+        self.rotation = full("rotation", (self.capacity, 3), np.float64, 0.0)
+        self.emotions = full("emotions", (self.capacity, len(EMOTIONS)), np.float64, 0.0)
+        self.has_target = full("has_target", (self.capacity,), bool, False)
+        self.active = full("active", (self.capacity,), bool, False)
+        self.ids: List[Optional[str]] = [None] * self.capacity
+        self.slots: Dict[str, int] = {}
+        # Pile des emplacements libres (le plus petit en haut)
+        self._free = list(range(self.capacity - 1, -1, -1))
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def ensure_capacity(self, capacity: int) -> None:
+        """Agrandit les tableaux si nécessaire (allocateur local uniquement)."""
+        extra = int(capacity) - self.capacity
+        if extra <= 0:
+            return
+
+        full = self.allocator.full
+        for field in self.SCALAR_FIELDS + self.VECTOR_FIELDS + ("emotions", "has_target", "active"):
+            previous = getattr(self, field)
+            array = full(field, (int(capacity),) + previous.shape[1:], previous.dtype, 0)
+            array[:self.capacity] = previous
+            setattr(self, field, array)
+        self.ids.extend([None] * extra)
+        # Les nouveaux emplacements passent sous les emplacements libres existants
+        self._free = list(range(int(capacity) - 1, self.capacity - 1, -1)) + self._free
+        self.capacity = int(capacity)
+
+    def __contains__(self, npc_id: str) -> bool:
+        return npc_id in self.slots
+
+    def allocate(self, npc_id: str) -> int:
+        """Réserve un emplacement pour un PNJ."""
+        if npc_id in self.slots:
+            return self.slots[npc_id]
+
+        if not self._free:
+            raise RuntimeError(f"Capacité maximale de PNJ atteinte ({self.capacity})")
+
+        slot = self._free.pop()
+        self.slots[npc_id] = slot
+        self.ids[slot] = npc_id
+        self.active[slot] = True
+        self._reset_slot(slot)
+        return slot
+
+    def release(self, npc_id: str) -> Optional[int]:
+        """Libère l'emplacement d'un PNJ."""
+        slot = self.slots.pop(npc_id, None)
+        if slot is None:
+            return None
+
+        self.ids[slot] = None
+        self.active[slot] = False
+        self._free.append(slot)
+        return slot
+
+    def slot(self, npc_id: str) -> Optional[int]:
+        """Retourne l'emplacement d'un PNJ."""
+        return self.slots.get(npc_id)
+
+    def active_slots(self) -> np.ndarray:
+        """Retourne les emplacements occupés, triés."""
+        return np.flatnonzero(self.active)
+
+    def regenerate(self, health_step: float, stamina_step: float, cap: float = 100.0,
+                   slots: Optional[np.ndarray] = None) -> None:
+        """Régénération naturelle de la santé et de l'endurance."""
+        if slots is None:
+            # Les emplacements libres sont réinitialisés à l'allocation,
+            # il est donc plus rapide de tout mettre à jour sans indexation.
+            np.add(self.health, health_step, out=self.health)
+            np.minimum(self.health, cap, out=self.health)
+            np.add(self.stamina, stamina_step, out=self.stamina)
+            np.minimum(self.stamina, cap, out=self.stamina)
+        else:
+            self.health[slots] = np.minimum(self.health[slots] + health_step, cap)
+            self.stamina[slots] = np.minimum(self.stamina[slots] + stamina_step, cap)
+
+    def _reset_slot(self, slot: int) -> None:
+        """Remet à zéro un emplacement."""
+        self.health[slot] = 0.0
+        self.stamina[slot] = 0.0
+        self.experience[slot] = 0.0
+        self.position[slot] = 0.0
+        self.rotation[slot] = 0.0
+        self.emotions[slot] = 0.0
+        self.has_target[slot] = False
+
+class NPCStateView(MutableMapping):
+    """Vue dictionnaire sur l'état d'un PNJ stocké en colonnes.
+
+    Les champs numériques sont lus et écrits directement dans le NPCStateStore,
+    les autres champs restent dans un dictionnaire classique.
+    """
+
+    def __init__(self, store: NPCStateStore, slot: int, extra: Optional[Dict[str, Any]] = None):
+        self._store = store
+        self._slot = slot
+        self._extra = extra if extra is not None else {}
+
+    @property
+    def slot(self) -> int:
+        return self._slot
+
+    def __getitem__(self, key: str) -> Any:
+        if key in NPCStateStore.SCALAR_FIELDS:
+            return float(getattr(self._store, key)[self._slot])
+        if key in NPCStateStore.VECTOR_FIELDS:
+            # Vue modifiable sur la ligne du tableau
+            return getattr(self._store, key)[self._slot]
+        return self._extra[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in NPCStateStore.SCALAR_FIELDS or key in NPCStateStore.VECTOR_FIELDS:
+            getattr(self._store, key)[self._slot] = value
+        else:
+            self._extra[key] = value
+            flag = NPCStateStore.FLAG_FIELDS.get(key)
+            if flag:
+                getattr(self._store, flag)[self._slot] = bool(value)
+
+    def __delitem__(self, key: str) -> None:
+        if key in NPCStateStore.SCALAR_FIELDS or key in NPCStateStore.VECTOR_FIELDS:
+            raise KeyError(f"Le champ colonnaire {key} ne peut pas être supprimé")
+        del self._extra[key]
+        flag = NPCStateStore.FLAG_FIELDS.get(key)
+        if flag:
+            getattr(self._store, flag)[self._slot] = False
+
+    def __iter__(self) -> Iterator[str]:
+        yield from NPCStateStore.SCALAR_FIELDS
+        yield from NPCStateStore.VECTOR_FIELDS
+        yield from self._extra
+
+    def __len__(self) -> int:
+        return len(NPCStateStore.SCALAR_FIELDS) + len(NPCStateStore.VECTOR_FIELDS) + len(self._extra)
+
+    def __repr__(self) -> str:
+        return f"NPCStateView(slot={self._slot}, {dict(self)!r})"
+
+class EmotionView(MutableMapping):
+    """Vue dictionnaire sur la ligne d'émotions d'un PNJ."""
+
+    _INDEX = {name: i for i, name in enumerate(EMOTIONS)}
+
+    def __init__(self, store: NPCStateStore, slot: int):
+        self._store = store
+        self._slot = slot
+
+    def __getitem__(self, key: str) -> float:
+        return float(self._store.emotions[self._slot, self._INDEX[key]])
+
+    def __setitem__(self, key: str, value: float) -> None:
+        if key not in self._INDEX:
+            raise KeyError(f"Émotion inconnue: {key}")
+        self._store.emotions[self._slot, self._INDEX[key]] = value
+
+    def __delitem__(self, key: str) -> None:
+        raise KeyError(f"L'émotion {key} ne peut pas être supprimée")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(EMOTIONS)
+
+    def __len__(self) -> int:
+        return len(EMOTIONS)
+
+    def __repr__(self) -> str:
+        return f"EmotionView(slot={self._slot}, {dict(self)!r})"
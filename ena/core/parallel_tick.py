@@ -0,0 +1,128 @@
+"""
+Mise à jour parallèle des PNJ sur un pool de processus
+"""
+from typing import Any, Dict, List, Optional, Tuple
+from multiprocessing import shared_memory
+import multiprocessing
+import numpy as np
+from ..utils.logger import Logger
+from ..utils.shared_arrays import ArrayDescriptor, SharedArrays, attach
+from .behavior_scorer import select_behaviors
+
+# Segments attachés par chaque processus de calcul : clé -> (nom, segment, tableau)
+_ATTACHED: Dict[str, Tuple[str, shared_memory.SharedMemory, np.ndarray]] = {}
+
+def _shared_array(key: str, descriptor: ArrayDescriptor) -> np.ndarray:
+    """Tableau partagé du processus courant, attaché une seule fois par segment."""
+    cached = _ATTACHED.get(key)
+    if cached is not None and cached[0] == descriptor[0] and cached[2].shape == tuple(descriptor[1]):
+        return cached[2]
+
+    if cached is not None:
+        # Segment remplacé (agrandissement) : détacher l'ancien
+        del _ATTACHED[key]
+        try:
+            cached[1].close()
+        except BufferError:
+            pass
+
+    block, array = attach(descriptor)
+    _ATTACHED[key] = (descriptor[0], block, array)
+    return array
+
+def _tick_shard(task: Dict[str, Any]) -> int:
+    """Régénère et sélectionne les comportements d'une tranche de PNJ.
+
+    Chaque tâche écrit dans sa propre plage du tableau de résultats, ce qui
+    rend la fusion indépendante de l'ordre d'exécution des processus.
+    """
+    arrays = {key: _shared_array(key, descriptor) for key, descriptor in task["arrays"].items()}
+    start, stop = task["range"]
+    slots = arrays["work_slots"][start:stop]
+    ticks = arrays["work_ticks"][start:stop]
+
+    health = arrays["health"]
+    stamina = arrays["stamina"]
+    health[slots] = np.minimum(health[slots] + task["health_step"] * ticks, task["cap"])
+    stamina[slots] = np.minimum(stamina[slots] + task["stamina_step"] * ticks, task["cap"])
+
+    arrays["work_choices"][start:stop] = select_behaviors(
+        arrays["weights"][slots],
+        arrays["rank"][slots],
+        task["ordered"],
+        health[slots],
+        stamina[slots],
+        arrays["has_target"][slots],
+        task["columns"]
+    )
+    return stop - start
+
+class ParallelTickExecutor:
+    """Répartit le tick colonnaire des PNJ entre plusieurs processus.
+
+    L'état des PNJ et les poids des comportements résident dans des segments
+    de mémoire partagée : seuls les descripteurs des segments et les bornes de
+    chaque tranche sont transmis aux processus à chaque tick.
+    """
+
+    STATE_KEYS = ("health", "stamina", "has_target", "weights", "rank")
+
+    def __init__(self, allocator: SharedArrays, capacity: int, workers: int = 4,
+                 min_npcs: int = 2000):
+        self.logger = Logger("ParallelTickExecutor")
+        self.allocator = allocator
+        self.workers = max(1, int(workers))
+        self.min_npcs = max(0, int(min_npcs))
+        self.work_slots = allocator.full("work_slots", (capacity,), np.intp, 0)
+        self.work_ticks = allocator.full("work_ticks", (capacity,), np.float64, 0.0)
+        self.work_choices = allocator.full("work_choices", (capacity,), np.intp, -1)
+        self._pool = None
+
+    def should_run(self, count: int) -> bool:
+        """Le parallélisme ne vaut la peine qu'au-delà d'un certain nombre de PNJ."""
+        return self.workers > 1 and count >= self.min_npcs
+
+    def tick(self, slots: np.ndarray, ticks: np.ndarray, scorer: Any,
+             health_step: float, stamina_step: float, cap: float = 100.0) -> np.ndarray:
+        """Régénère les PNJ et retourne le comportement choisi par emplacement."""
+        count = len(slots)
+        self.work_slots[:count] = slots
+        self.work_ticks[:count] = ticks
+
+        arrays = {key: self.allocator.descriptor(key) for key in self.STATE_KEYS}
+        for key in ("work_slots", "work_ticks", "work_choices"):
+            arrays[key] = self.allocator.descriptor(key)
+
+        tasks = [
+            {
+                "arrays": arrays,
+                "range": (start, stop),
+                "health_step": health_step,
+                "stamina_step": stamina_step,
+                "cap": cap,
+                "ordered": scorer.ordered,
+                "columns": scorer.modifier_columns()
+            }
+            for start, stop in self._shards(count)
+        ]
+        self._get_pool().map(_tick_shard, tasks)
+        return self.work_choices[:count].copy()
+
+    def shutdown(self) -> None:
+        """Arrête les processus de calcul."""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def _shards(self, count: int) -> List[Tuple[int, int]]:
+        """Bornes contiguës et disjointes de chaque tranche."""
+        bounds = np.linspace(0, count, self.workers + 1).astype(int)
+        return [(int(start), int(stop)) for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+
+    def _get_pool(self):
+        """Crée le pool à la première utilisation."""
+        if self._pool is None:
+            self._pool = multiprocessing.get_context().Pool(self.workers)
+            self.logger.info(f"Pool de {self.workers} processus démarré pour le tick de l'IA")
+        return self._pool
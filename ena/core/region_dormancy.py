@@ -0,0 +1,89 @@
+"""
+Mise en sommeil des régions inoccupées pour ENA
+"""
+from typing import Tuple
+import numpy as np
+
+class RegionDormancy:
+    """Suivi des régions endormies, par ligne du RegionStore.
+
+    Une région sans joueur ni événement actif, inactive depuis `delay`
+    secondes, s'endort : elle n'est plus avancée à chaque tick. Son heure
+    d'endormissement et la somme des carrés des pas de temps écoulés depuis
+    (pour agréger le bruit et retrouver le pas moyen) suffisent à la
+    rattraper d'un coup à son réveil.
+    """
+
+    def __init__(self, capacity: int, delay: float = 60.0, enabled: bool = True):
+        self.delay = delay
+        self.enabled = enabled
+        self.capacity = 0
+        self.asleep = np.zeros(0, dtype=bool)
+        self.slept_at = np.zeros(0)
+        self.slept_dt2 = np.zeros(0)
+        self.last_active = np.zeros(0)
+        self.players = np.zeros(0, dtype=np.int64)
+        self.events = np.zeros(0, dtype=np.int64)
+        # Somme des carrés des pas de temps depuis le début de la simulation
+        self.total_dt2 = 0.0
+        self.ensure_capacity(capacity)
+
+    def ensure_capacity(self, capacity: int) -> None:
+        """Agrandit les tableaux si nécessaire."""
+        extra = int(capacity) - self.capacity
+        if extra <= 0:
+            return
+        self.asleep = np.concatenate([self.asleep, np.zeros(extra, dtype=bool)])
+        for field in ("slept_at", "slept_dt2", "last_active"):
+            setattr(self, field, np.concatenate([getattr(self, field), np.zeros(extra)]))
+        self.players = np.concatenate([self.players, np.zeros(extra, dtype=np.int64)])
+        self.events = np.concatenate([self.events, np.zeros(extra, dtype=np.int64)])
+        self.capacity = int(capacity)
+
+    def reset(self, row: int, now: float) -> None:
+        """Région (ré)enregistrée : éveillée, sans joueur ni événement."""
+        self.ensure_capacity(row + 1)
+        self.asleep[row] = False
+        self.last_active[row] = now
+        self.players[row] = 0
+        self.events[row] = 0
+
+    def advance(self, delta_time: float, ticks: float = 1.0) -> None:
+        """Comptabilise delta_time secondes réparties en ticks pas égaux."""
+        self.total_dt2 += delta_time * delta_time / ticks
+
+    def touch(self, row: int, now: float) -> None:
+        """Repousse l'endormissement d'une région."""
+        self.last_active[row] = now
+
+    def awake_rows(self, count: int) -> np.ndarray:
+        """Lignes éveillées parmi 0..count-1."""
+        return np.flatnonzero(~self.asleep[:count])
+
+    def sleep_candidates(self, count: int, now: float) -> np.ndarray:
+        """Régions éveillées pouvant s'endormir à l'instant now."""
+        if not self.enabled:
+            return np.zeros(0, dtype=np.intp)
+        idle = (
+            ~self.asleep[:count]
+            & (self.players[:count] == 0)
+            & (self.events[:count] == 0)
+            & (now - self.last_active[:count] >= self.delay)
+        )
+        return np.flatnonzero(idle)
+
+    def put_to_sleep(self, rows: np.ndarray, now: float) -> None:
+        """Endort des régions à jour à l'instant now."""
+        self.asleep[rows] = True
+        self.slept_at[rows] = now
+        self.slept_dt2[rows] = self.total_dt2
+
+    def wake(self, rows: np.ndarray, now: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Réveille des régions ; retourne (lignes endormies, durée, somme des dt²)."""
+        rows = np.asarray(rows, dtype=np.intp)
+        rows = rows[self.asleep[rows]]
+        elapsed = now - self.slept_at[rows]
+        dt2 = np.maximum(self.total_dt2 - self.slept_dt2[rows], 0.0)
+        self.asleep[rows] = False
+        self.last_active[rows] = now
+        return rows, elapsed, dt2
@@ -0,0 +1,107 @@
+"""
+Graphe d'adjacence des régions (représentation creuse) pour ENA
+"""
+from typing import Optional, Set, Tuple
+import numpy as np
+
+class RegionGraph:
+    """Adjacence non orientée entre lignes de régions, au format CSR.
+
+    Les arêtes sont stockées triées par région source (indptr / indices),
+    ce qui permet les produits matrice creuse × vecteur (ou × matrice) en
+    une seule opération vectorielle, sans dépendance à scipy.
+    """
+
+    def __init__(self, nodes: int = 0):
+        self.nodes = int(nodes)
+        self.edges: Set[Tuple[int, int]] = set()
+        self._csr: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+
+    def __len__(self) -> int:
+        return len(self.edges)
+
+    def ensure_nodes(self, nodes: int) -> None:
+        """Agrandit le nombre de sommets si nécessaire."""
+        if nodes > self.nodes:
+            self.nodes = int(nodes)
+            self._csr = None
+
+    def connect(self, a: int, b: int) -> None:
+        """Relie deux régions (arête non orientée)."""
+        if a == b:
+            return
+        self.ensure_nodes(max(a, b) + 1)
+        edge = (min(a, b), max(a, b))
+        if edge not in self.edges:
+            self.edges.add(edge)
+            self._csr = None
+
+    def disconnect(self, a: int, b: int) -> None:
+        """Supprime une arête."""
+        edge = (min(a, b), max(a, b))
+        if edge in self.edges:
+            self.edges.discard(edge)
+            self._csr = None
+
+    def csr(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(indptr, indices, sources) des arêtes dans les deux sens, triées par source."""
+        if self._csr is None:
+            if self.edges:
+                pairs = np.array(sorted(self.edges), dtype=np.intp)
+                sources = np.concatenate([pairs[:, 0], pairs[:, 1]])
+                targets = np.concatenate([pairs[:, 1], pairs[:, 0]])
+                order = np.lexsort((targets, sources))
+                sources = sources[order]
+                targets = targets[order]
+            else:
+                sources = np.zeros(0, dtype=np.intp)
+                targets = np.zeros(0, dtype=np.intp)
+            counts = np.bincount(sources, minlength=self.nodes)
+            indptr = np.concatenate([[0], np.cumsum(counts)]).astype(np.intp)
+            self._csr = (indptr, targets, sources)
+        return self._csr
+
+    def degree(self) -> np.ndarray:
+        """Nombre de voisins de chaque région."""
+        indptr = self.csr()[0]
+        return np.diff(indptr)
+
+    def neighbors(self, row: int) -> np.ndarray:
+        """Voisins d'une région."""
+        indptr, indices, _ = self.csr()
+        if row >= self.nodes:
+            return indices[:0]
+        return indices[indptr[row]:indptr[row + 1]]
+
+    def multiply(self, values: np.ndarray) -> np.ndarray:
+        """Produit A @ values (somme sur les voisins), pour un vecteur ou une matrice."""
+        indptr, indices, sources = self.csr()
+        values = np.asarray(values, dtype=np.float64)
+        if values.ndim == 1:
+            return np.bincount(sources, weights=values[indices], minlength=self.nodes)
+
+        result = np.zeros((self.nodes,) + values.shape[1:])
+        if len(indices):
+            # Somme segmentée sur les lignes possédant au moins un voisin
+            starts = indptr[:-1]
+            nonempty = np.flatnonzero(np.diff(indptr) > 0)
+            result[nonempty] = np.add.reduceat(values[indices], starts[nonempty], axis=0)
+        return result
+
+    def neighbor_mean(self, values: np.ndarray) -> np.ndarray:
+        """Moyenne des valeurs des voisins (0 pour une région isolée)."""
+        total = self.multiply(values)
+        degree = self.degree().astype(np.float64)
+        degree = np.maximum(degree, 1.0)
+        return total / (degree if total.ndim == 1 else degree[:, None])
+
+    def random_neighbors(self, rows: np.ndarray, draws: np.ndarray) -> np.ndarray:
+        """Un voisin tiré pour chaque région (la région elle-même si isolée)."""
+        indptr, indices, _ = self.csr()
+        rows = np.asarray(rows, dtype=np.intp)
+        if len(indices) == 0:
+            return rows.copy()
+        degree = indptr[rows + 1] - indptr[rows]
+        offsets = np.minimum((draws * degree).astype(np.intp), np.maximum(degree - 1, 0))
+        picks = np.minimum(indptr[rows] + offsets, len(indices) - 1)
+        return np.where(degree > 0, indices[picks], rows)
@@ -0,0 +1,135 @@
+"""
+Index bidirectionnel PNJ <-> région pour ENA
+"""
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+
+class RegionMembership:
+    """Région de chaque PNJ et PNJ de chaque région, tenus à jour ensemble.
+
+    region_of donne la région d'un PNJ en O(1) ; members contient pour chaque
+    région un dictionnaire ordonné (ensemble) de ses PNJ, itérable sans
+    parcourir tous les PNJ. Les boîtes englobantes des régions, en
+    tableaux, permettent de retrouver la région de nombreuses positions en
+    une opération vectorielle.
+    """
+
+    def __init__(self, region_ids: List[str], capacity: int = 1):
+        # Identifiants des régions par ligne (partagés avec le RegionStore)
+        self.region_ids = region_ids
+        self.region_of: Dict[str, str] = {}
+        self.members: Dict[str, Dict[str, None]] = {}
+        self.capacity = 0
+        self.bounds_min = np.zeros((0, 3))
+        self.bounds_max = np.zeros((0, 3))
+        self.bounded = np.zeros(0, dtype=bool)
+        self.ensure_capacity(capacity)
+
+    def __len__(self) -> int:
+        return len(self.region_of)
+
+    def __contains__(self, npc_id: str) -> bool:
+        return npc_id in self.region_of
+
+    def ensure_capacity(self, capacity: int) -> None:
+        """Agrandit les tableaux de bornes si nécessaire."""
+        extra = int(capacity) - self.capacity
+        if extra <= 0:
+            return
+        self.bounds_min = np.vstack([self.bounds_min, np.full((extra, 3), np.inf)])
+        self.bounds_max = np.vstack([self.bounds_max, np.full((extra, 3), -np.inf)])
+        self.bounded = np.concatenate([self.bounded, np.zeros(extra, dtype=bool)])
+        self.capacity = int(capacity)
+
+    def add_region(self, region_id: str, row: int,
+                   bounds: Optional[Dict[str, Sequence[float]]] = None) -> Dict[str, None]:
+        """Déclare une région ; retourne l'ensemble (vivant) de ses PNJ.
+
+        bounds: {"min": [x, y, z], "max": [x, y, z]} ; les axes absents ne
+        sont pas bornés. Une région sans bornes n'est jamais déduite d'une
+        position, mais peut recevoir des PNJ explicitement.
+        """
+        if row >= self.capacity:
+            self.ensure_capacity(max(row + 1, 2 * self.capacity))
+        self.set_bounds(row, bounds)
+        return self.members.setdefault(region_id, {})
+
+    def set_bounds(self, row: int, bounds: Optional[Dict[str, Sequence[float]]]) -> None:
+        """Boîte englobante d'une région."""
+        if not bounds:
+            self.bounds_min[row] = np.inf
+            self.bounds_max[row] = -np.inf
+            self.bounded[row] = False
+            return
+        low = list(bounds.get("min", []))
+        high = list(bounds.get("max", []))
+        self.bounds_min[row] = (low + [-np.inf] * 3)[:3]
+        self.bounds_max[row] = (high + [np.inf] * 3)[:3]
+        self.bounded[row] = True
+
+    def place(self, npc_id: str, region_id: str) -> Tuple[Optional[str], bool]:
+        """Place un PNJ dans une région ; retourne (région précédente, changement)."""
+        previous = self.region_of.get(npc_id)
+        if previous == region_id:
+            return previous, False
+        if previous is not None:
+            self.members[previous].pop(npc_id, None)
+        self.region_of[npc_id] = region_id
+        self.members.setdefault(region_id, {})[npc_id] = None
+        return previous, True
+
+    def remove(self, npc_id: str) -> Optional[str]:
+        """Retire un PNJ de l'index ; retourne sa dernière région."""
+        region_id = self.region_of.pop(npc_id, None)
+        if region_id is not None:
+            self.members[region_id].pop(npc_id, None)
+        return region_id
+
+    def region(self, npc_id: str) -> Optional[str]:
+        """Région d'un PNJ."""
+        return self.region_of.get(npc_id)
+
+    def npcs(self, region_id: str) -> Iterator[str]:
+        """PNJ d'une région, dans leur ordre d'arrivée."""
+        return iter(self.members.get(region_id, ()))
+
+    def count(self, region_id: str) -> int:
+        """Nombre de PNJ d'une région."""
+        return len(self.members.get(region_id, ()))
+
+    def locate(self, positions: np.ndarray, current: Optional[np.ndarray] = None) -> np.ndarray:
+        """Ligne de la région contenant chaque position (-1 si aucune).
+
+        current: ligne actuelle de chaque position (-1 si inconnue) ; une
+        position encore dans sa région y reste, même si une autre région la
+        contient aussi. Sinon, la première région enregistrée l'emporte.
+        """
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+        rows = np.full(len(positions), -1, dtype=np.intp)
+        pending = np.ones(len(positions), dtype=bool)
+
+        if current is not None:
+            current = np.asarray(current, dtype=np.intp)
+            known = np.flatnonzero(current >= 0)
+            inside = self._inside(positions[known], current[known])
+            rows[known[inside]] = current[known[inside]]
+            pending[known[inside]] = False
+
+        candidates = np.flatnonzero(self.bounded[:len(self.region_ids)])
+        search = np.flatnonzero(pending)
+        if len(candidates) and len(search):
+            points = positions[search][:, None, :]
+            contained = (
+                (points >= self.bounds_min[candidates][None]) & (points <= self.bounds_max[candidates][None])
+            ).all(axis=2)
+            found = contained.any(axis=1)
+            rows[search[found]] = candidates[contained[found].argmax(axis=1)]
+        return rows
+
+    def _inside(self, positions: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """Chaque position est-elle dans la boîte de sa ligne ?"""
+        return (
+            self.bounded[rows]
+            & (positions >= self.bounds_min[rows]).all(axis=1)
+            & (positions <= self.bounds_max[rows]).all(axis=1)
+        )
@@ -0,0 +1,665 @@
+"""
+Stockage colonnaire de l'état des régions pour ENA
+"""
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from collections.abc import MutableMapping
+import numpy as np
+
+ENVIRONMENT_FIELDS = ("temperature", "humidity", "radiation", "toxicity")
+
+# Bornes de normalisation de l'environnement
+ENVIRONMENT_BOUNDS = {
+    "temperature": (-50.0, 50.0),
+    "humidity": (0.0, 1.0),
+    "radiation": (0.0, 100.0),
+    "toxicity": (0.0, 100.0)
+}
+
+class KeyedColumns:
+    """Matrice lignes × clés (ressources, factions...) à colonnes dynamiques.
+
+    Chaque ligne conserve l'ordre d'insertion de ses propres clés, comme un
+    dictionnaire ; les cellules absentes valent 0.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = 0
+        self.names: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.values = np.zeros((0, 0), dtype=np.float64)
+        self.present = np.zeros((0, 0), dtype=bool)
+        self.order: List[List[int]] = []
+        self._order_cache: Optional[np.ndarray] = None
+        # Incrémenté à chaque écriture, pour invalider les valeurs dérivées
+        self.version = 0
+        self.ensure_capacity(capacity)
+
+    def ensure_capacity(self, capacity: int) -> None:
+        """Agrandit le nombre de lignes si nécessaire."""
+        extra = int(capacity) - self.capacity
+        if extra <= 0:
+            return
+        columns = len(self.names)
+        self.values = np.vstack([self.values, np.zeros((extra, columns))])
+        self.present = np.vstack([self.present, np.zeros((extra, columns), dtype=bool)])
+        self.order.extend([] for _ in range(extra))
+        self.capacity = int(capacity)
+        self._order_cache = None
+
+    def column(self, key: str) -> int:
+        """Indice de colonne d'une clé (créée si nécessaire)."""
+        column = self.index.get(key)
+        if column is None:
+            column = len(self.names)
+            self.index[key] = column
+            self.names.append(key)
+            self.values = np.hstack([self.values, np.zeros((self.capacity, 1))])
+            self.present = np.hstack([self.present, np.zeros((self.capacity, 1), dtype=bool)])
+            self._order_cache = None
+        return column
+
+    def set(self, row: int, key: str, value: float) -> None:
+        column = self.column(key)
+        if not self.present[row, column]:
+            self.present[row, column] = True
+            self.order[row].append(column)
+            self._order_cache = None
+        self.values[row, column] = value
+        self.version += 1
+
+    def get(self, row: int, key: str) -> float:
+        column = self.index.get(key)
+        if column is None or not self.present[row, column]:
+            raise KeyError(key)
+        return float(self.values[row, column])
+
+    def remove(self, row: int, key: str) -> None:
+        column = self.index.get(key)
+        if column is None or not self.present[row, column]:
+            raise KeyError(key)
+        self.present[row, column] = False
+        self.values[row, column] = 0.0
+        self.order[row].remove(column)
+        self._order_cache = None
+        self.version += 1
+
+    def clear_row(self, row: int) -> None:
+        """Retire toutes les clés d'une ligne."""
+        self.values[row] = 0.0
+        self.present[row] = False
+        self.order[row] = []
+        self._order_cache = None
+        self.version += 1
+
+    def add_present(self, rows: np.ndarray, columns: np.ndarray) -> None:
+        """Marque des cellules comme présentes (ajoutées en fin d'ordre de leur ligne)."""
+        for row, column in zip(rows.tolist(), columns.tolist()):
+            if not self.present[row, column]:
+                self.present[row, column] = True
+                self.order[row].append(column)
+        self._order_cache = None
+        self.version += 1
+
+    def keys(self, row: int) -> List[str]:
+        """Clés d'une ligne, dans leur ordre d'insertion."""
+        return [self.names[column] for column in self.order[row]]
+
+    def order_matrix(self) -> np.ndarray:
+        """Colonnes de chaque ligne dans l'ordre d'insertion (-1 en complément)."""
+        if self._order_cache is None:
+            width = max((len(columns) for columns in self.order), default=0)
+            matrix = np.full((self.capacity, width), -1, dtype=np.intp)
+            for row, columns in enumerate(self.order):
+                matrix[row, :len(columns)] = columns
+            self._order_cache = matrix
+        return self._order_cache
+
+class RegionStore:
+    """Tableaux de l'état numérique des régions, mis à jour en un pas vectoriel.
+
+    Chaque région occupe une ligne fixe ; la même ligne sert de flux aléatoire
+    à la région dans SimulationRNG. Le contrôle des factions forme une matrice
+    régions × factions, diffusée le long du graphe d'adjacence des régions.
+    """
+
+    def __init__(self, capacity: int,
+                 contest_rate: float = 0.1,
+                 diffusion_rate: float = 0.0,
+                 border_contest: float = 1.0):
+        self.contest_rate = contest_rate
+        self.diffusion_rate = diffusion_rate
+        self.border_contest = border_contest
+        self.capacity = 0
+        self.temperature = np.zeros(0)
+        self.humidity = np.zeros(0)
+        self.radiation = np.zeros(0)
+        self.toxicity = np.zeros(0)
+        self.population = np.zeros(0)
+        self.danger = np.zeros(0)
+        self.time_of_day = np.zeros(0)
+        self.resources = KeyedColumns(0)
+        self.factions = KeyedColumns(0)
+        # Effets cumulés des événements actifs, par seconde et par champ
+        # d'environnement : somme des effets additifs, somme des logarithmes
+        # des facteurs multiplicatifs
+        self.effect_add = np.zeros((0, len(ENVIRONMENT_FIELDS)))
+        self.effect_log_factor = np.zeros((0, len(ENVIRONMENT_FIELDS)))
+        self.rows: Dict[str, int] = {}
+        self.ids: List[str] = []
+        # Faction dominante de chaque région (-1 si aucune), recalculée
+        # quand la matrice de contrôle a changé
+        self._dominant = np.zeros(0, dtype=np.intp)
+        self._dominant_share = np.zeros(0)
+        self._dominant_version = -1
+        self.ensure_capacity(max(1, int(capacity)))
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __contains__(self, region_id: str) -> bool:
+        return region_id in self.rows
+
+    def ensure_capacity(self, capacity: int) -> None:
+        """Agrandit les tableaux si nécessaire."""
+        extra = int(capacity) - self.capacity
+        if extra <= 0:
+            return
+        for field in ENVIRONMENT_FIELDS + ("population", "danger", "time_of_day"):
+            setattr(self, field, np.concatenate([getattr(self, field), np.zeros(extra)]))
+        self.resources.ensure_capacity(capacity)
+        self.factions.ensure_capacity(capacity)
+        padding = np.zeros((extra, len(ENVIRONMENT_FIELDS)))
+        self.effect_add = np.vstack([self.effect_add, padding])
+        self.effect_log_factor = np.vstack([self.effect_log_factor, padding])
+        self.capacity = int(capacity)
+        self._dominant_version = -1
+
+    def allocate(self, region_id: str) -> int:
+        """Ligne d'une région (réinitialisée si la région est réenregistrée)."""
+        row = self.rows.get(region_id)
+        if row is None:
+            row = len(self.ids)
+            if row >= self.capacity:
+                self.ensure_capacity(2 * self.capacity)
+            self.rows[region_id] = row
+            self.ids.append(region_id)
+
+        for field in ENVIRONMENT_FIELDS + ("population", "danger", "time_of_day"):
+            getattr(self, field)[row] = 0.0
+        self.resources.clear_row(row)
+        self.factions.clear_row(row)
+        self.effect_add[row] = 0.0
+        self.effect_log_factor[row] = 0.0
+        return row
+
+    def active_rows(self) -> np.ndarray:
+        """Lignes occupées, dans l'ordre d'enregistrement."""
+        return np.arange(len(self.ids))
+
+    def add_effect(self, row: int, additive: np.ndarray, log_factor: np.ndarray,
+                   scale: float = 1.0) -> None:
+        """Ajoute (scale > 0) ou retire (scale < 0) la contribution d'un événement."""
+        self.effect_add[row] += scale * additive
+        self.effect_log_factor[row] += scale * log_factor
+
+    def dominant_faction(self, row: int) -> Tuple[Optional[str], float]:
+        """(faction dominante, part du contrôle) d'une région."""
+        if self._dominant_version != self.factions.version:
+            self._refresh_dominant()
+        column = self._dominant[row]
+        if column < 0:
+            return None, 0.0
+        return self.factions.names[column], float(self._dominant_share[row])
+
+    def _refresh_dominant(self) -> None:
+        """Recalcule la faction dominante de toutes les régions."""
+        control = np.where(self.factions.present, self.factions.values, -np.inf)
+        if control.shape[1] == 0:
+            self._dominant = np.full(self.capacity, -1, dtype=np.intp)
+            self._dominant_share = np.zeros(self.capacity)
+        else:
+            dominant = control.argmax(axis=1)
+            share = control[np.arange(self.capacity), dominant]
+            total = self.factions.values.sum(axis=1)
+            self._dominant = np.where(np.isfinite(share), dominant, -1)
+            self._dominant_share = np.where(
+                np.isfinite(share) & (total > 0), share / np.where(total > 0, total, 1.0), 0.0
+            )
+        self._dominant_version = self.factions.version
+
+    def step(self, rows: np.ndarray, delta_time: float, noise: np.ndarray,
+             graph: Optional[Any] = None) -> None:
+        """Avance toutes les régions d'un pas.
+
+        Même ordre que la mise à jour région par région : environnement,
+        population, ressources puis contrôle des factions (diffusé le long
+        de graph, un RegionGraph, s'il est fourni).
+        """
+        self._step_environment(rows, delta_time, noise)
+        population = self._step_population(rows, delta_time)
+        self._step_resources(rows, delta_time, population)
+        self._step_factions(rows, delta_time, graph)
+
+    def _step_environment(self, rows: np.ndarray, delta_time: float, noise: np.ndarray) -> None:
+        """Variations naturelles, effets des événements et normalisation."""
+        self.temperature[rows] += 0.1 * noise[:, 0] * delta_time
+        self.humidity[rows] += 0.05 * noise[:, 1] * delta_time
+
+        # Effets des événements : un produit et une somme par région,
+        # quel que soit le nombre d'événements
+        factors = np.exp(self.effect_log_factor[rows] * delta_time)
+        increments = self.effect_add[rows] * delta_time
+        for i, field in enumerate(ENVIRONMENT_FIELDS):
+            low, high = ENVIRONMENT_BOUNDS[field]
+            values = getattr(self, field)
+            values[rows] = np.clip(values[rows] * factors[:, i] + increments[:, i], low, high)
+
+    def _step_population(self, rows: np.ndarray, delta_time: float) -> np.ndarray:
+        """Croissance selon le danger et les ressources, arrondie à l'entier."""
+        danger_factor = 1.0 - (self.danger[rows] / 100.0)
+        resource_factor = np.minimum(1.0, self.resources.values[rows].sum(axis=1) / 100.0)
+
+        growth_rate = 0.001 * danger_factor * resource_factor
+        population = self.population[rows]
+        population = np.round(population + population * growth_rate * delta_time)
+        self.population[rows] = population
+        return population
+
+    def _step_resources(self, rows: np.ndarray, delta_time: float, population: np.ndarray) -> None:
+        """Consommation par la population et régénération sous le seuil de 100."""
+        amount = self.resources.values[rows] - (0.01 * population * delta_time)[:, None]
+        amount = np.where(amount < 100, amount + 0.05 * (1.0 - amount / 100.0) * delta_time, amount)
+        self.resources.values[rows] = np.where(self.resources.present[rows], np.maximum(0, amount), 0.0)
+
+    def _step_factions(self, rows: np.ndarray, delta_time: float,
+                       graph: Optional[Any] = None) -> None:
+        """Normalisation, diffusion vers les régions voisines et lutte d'influence.
+
+        Toutes les cellules sont mises à jour simultanément à partir des parts
+        du début du pas : la diffusion coûte un produit matrice creuse ×
+        matrice (régions × factions), la lutte est linéaire en factions.
+        """
+        shares, border = self._normalize_and_diffuse(rows, self.diffusion_rate * delta_time, graph)
+
+        # Chaque faction tend vers la part de ses rivales : c + k (autres - c)
+        rate = self.contest_rate * np.where(border, self.border_contest, 1.0)
+        row_sums = shares.sum(axis=1)
+        updated = shares + (rate * delta_time)[:, None] * (row_sums[:, None] - 2.0 * shares)
+        factions = self.factions
+        factions.values[rows] = np.where(factions.present[rows], np.maximum(updated, 0.0), 0.0)
+        factions.version += 1
+
+    def _normalize_and_diffuse(self, rows: np.ndarray, weight: Any,
+                               graph: Optional[Any]) -> Tuple[np.ndarray, np.ndarray]:
+        """Parts normalisées des lignes, rapprochées de la moyenne des voisins.
+
+        weight: poids de la moyenne des voisins (scalaire ou par ligne).
+        Retourne (parts, régions en frontière disputée).
+        """
+        factions = self.factions
+        control = factions.values
+        total = control[rows].sum(axis=1)
+        normalized = rows[total > 0]
+        control[normalized] /= total[total > 0][:, None]
+        shares = control[rows]
+
+        border = np.zeros(len(rows), dtype=bool)
+        if graph is None or not len(graph) or self.diffusion_rate <= 0 or not shares.shape[1]:
+            return shares, border
+
+        # Parts moyennes des voisins ; les régions isolées n'échangent rien
+        count = len(self.ids)
+        graph.ensure_nodes(count)
+        neighbor_mean = graph.neighbor_mean(control[:count])[rows]
+        connected = graph.degree()[rows] > 0
+        neighbor_total = neighbor_mean.sum(axis=1)
+
+        # Frontière disputée : la faction dominante des voisins diffère de la locale
+        local_dominant = np.where(factions.present[rows], shares, -1.0).argmax(axis=1)
+        border = (
+            connected & (neighbor_total > 0) & (total > 0)
+            & (neighbor_mean.argmax(axis=1) != local_dominant)
+        )
+        weight = np.asarray(weight, dtype=np.float64)
+        if weight.ndim:
+            weight = weight[:, None]
+        shares = shares + weight * np.where(connected[:, None], neighbor_mean - shares, 0.0)
+
+        # Les factions arrivées par diffusion deviennent présentes
+        arriving = (shares > 0) & ~factions.present[rows]
+        if arriving.any():
+            arrival_rows, arrival_columns = np.nonzero(arriving)
+            factions.add_present(rows[arrival_rows], arrival_columns)
+        return shares, border
+
+    def advance(self, rows: np.ndarray, elapsed: np.ndarray, dt2: np.ndarray,
+                noise: np.ndarray, max_step: float = 60.0, graph: Optional[Any] = None) -> None:
+        """Avance des régions d'un grand pas, en forme close (régions endormies, saut de temps).
+
+        elapsed: durée à rattraper par région ; dt2: somme des carrés des pas
+        de temps correspondants (le pas moyen vaut dt2 / elapsed) ; noise:
+        tirages normaux (lignes × 2) agrégeant le bruit de l'environnement.
+        Les effets d'événements cumulés sont supposés constants sur la durée.
+        Population, ressources et factions sont intégrées par segments d'au
+        plus max_step secondes ; population et ressources changent de phase
+        dans un segment quand un stock s'épuise.
+        """
+        elapsed = np.asarray(elapsed, dtype=np.float64)
+        keep = elapsed > 0
+        rows, elapsed, dt2, noise = rows[keep], elapsed[keep], dt2[keep], noise[keep]
+        if len(rows) == 0:
+            return
+        tick = np.where(dt2 > 0, dt2 / elapsed, elapsed)
+        self._advance_environment(rows, elapsed, dt2, noise)
+
+        remaining = elapsed.copy()
+        while (remaining > 0).any():
+            step = np.minimum(remaining, max_step)
+            moving = step > 0
+            self._advance_population_resources(rows[moving], step[moving], tick[moving])
+            self._advance_factions(rows[moving], step[moving], tick[moving], graph)
+            remaining -= step
+
+    def _advance_environment(self, rows: np.ndarray, elapsed: np.ndarray, dt2: np.ndarray,
+                             noise: np.ndarray) -> None:
+        """Effets d'événements intégrés (dv/dt = L v + A) et marche aléatoire agrégée."""
+        log_factor = self.effect_log_factor[rows]
+        additive = self.effect_add[rows]
+        growth = np.exp(log_factor * elapsed[:, None])
+        safe_log = np.where(log_factor != 0, log_factor, 1.0)
+        gain = np.where(log_factor != 0, (growth - 1.0) / safe_log, elapsed[:, None])
+
+        # Somme de gaussiennes de variance (0.1 dt)² et (0.05 dt)² par tick
+        spread = np.sqrt(dt2)
+        walk = {"temperature": 0.1 * noise[:, 0] * spread, "humidity": 0.05 * noise[:, 1] * spread}
+        for i, field in enumerate(ENVIRONMENT_FIELDS):
+            low, high = ENVIRONMENT_BOUNDS[field]
+            values = getattr(self, field)
+            updated = values[rows] * growth[:, i] + additive[:, i] * gain[:, i] + walk.get(field, 0.0)
+            values[rows] = np.clip(updated, low, high)
+
+    def _advance_population_resources(self, rows: np.ndarray, step: np.ndarray,
+                                      tick: np.ndarray) -> None:
+        """Population et ressources sur un segment, par phases de régime constant.
+
+        Une phase s'arrête quand un stock passe sous 100 (début de la
+        régénération), qu'un stock s'épuise, ou que le total des ressources
+        passe sous 100 (la croissance ralentit). Chaque phase a une solution
+        exacte ; le nombre de phases est borné par deux par ressource.
+        """
+        remaining = np.asarray(step, dtype=np.float64).copy()
+        for _ in range(2 * self.resources.values.shape[1] + 4):
+            moving = remaining > 0
+            if not moving.any():
+                return
+            remaining[moving] -= self._advance_phase(rows[moving], remaining[moving], tick[moving])
+        moving = remaining > 0
+        if moving.any():
+            self._advance_phase(rows[moving], remaining[moving], tick[moving], split=False)
+
+    def _advance_phase(self, rows: np.ndarray, duration: np.ndarray, tick: np.ndarray,
+                       split: bool = True) -> np.ndarray:
+        """Avance une phase (au plus duration) ; retourne la durée avancée par ligne.
+
+        Total d'au moins 100 : croissance exponentielle au taux plein ; stocks
+        au-dessus de 100 consommés (∫ 0.01 p dt), stocks en dessous solution
+        de da/dt = 0.05 (1 - a / 100) - 0.01 p0 exp(g t). La phase s'arrête au
+        premier changement de régime, trouvé par dichotomie.
+        Total sous 100 : la population, qui croît alors de moins de 10 / p0
+        en relatif avant l'épuisement, est tenue constante ; chaque stock suit
+        a(t) = A + (a0 - A) exp(-λ t) jusqu'à 0 et la croissance intègre
+        exactement le total, tant que l'arrondi par tick ne l'annule pas.
+        """
+        present = self.resources.present[rows]
+        amount = np.where(present, self.resources.values[rows], 0.0)
+        population = self.population[rows]
+        rate = 0.001 * (1.0 - (self.danger[rows] / 100.0))
+        full = amount.sum(axis=1) >= 100
+        # L'arrondi par tick annule toute croissance inférieure à une demi-unité
+        growth_rate = np.where(full & (population * rate * tick >= 0.5), rate, 0.0)
+        high = present & (amount > 100)
+        live = present & (amount > 0)
+
+        def amounts(index: np.ndarray, t: np.ndarray) -> np.ndarray:
+            return _phase_amounts(amount[index], high[index], population[index], growth_rate[index], t)
+
+        def regime_change(index: np.ndarray, t: np.ndarray) -> np.ndarray:
+            values = amounts(index, t)
+            total = np.where(present[index], np.maximum(values, 0.0), 0.0).sum(axis=1)
+            crossed = (high[index] & (values <= 100)).any(axis=1) | (live[index] & (values <= 0)).any(axis=1)
+            return full[index] & (crossed | (total < 100))
+
+        elapsed = _first_time(regime_change, duration) if split else duration
+        values = amounts(np.arange(len(rows)), elapsed)
+        self.resources.values[rows] = np.where(present, np.maximum(0, values), 0.0)
+
+        growth = growth_rate * elapsed
+        low = ~full & (population * rate > 0)
+        if low.any():
+            growth[low] = rate[low] * self._depletion_integral(
+                amount[low], present[low], population[low], rate[low] * tick[low], elapsed[low]
+            ) / 100.0
+        self.population[rows] = np.round(population * np.exp(growth))
+        return elapsed
+
+    def _depletion_integral(self, amount: np.ndarray, present: np.ndarray, population: np.ndarray,
+                            tick_rate: np.ndarray, duration: np.ndarray) -> np.ndarray:
+        """∫ total des ressources dt, sous 100 et population constante.
+
+        L'intégration s'arrête quand l'arrondi par tick annule la croissance
+        (population × taux × total / 100 × tick < 0.5).
+        """
+        decay = 0.0005
+        target = 100.0 - 0.01 * population / decay
+        minimum = 50.0 / (population * tick_rate)
+
+        def stocks(index: np.ndarray, t: np.ndarray) -> np.ndarray:
+            values = target[index][:, None] + (amount[index] - target[index][:, None]) * np.exp(-decay * t)[:, None]
+            return np.where(present[index], np.maximum(values, 0.0), 0.0)
+
+        def below_minimum(index: np.ndarray, t: np.ndarray) -> np.ndarray:
+            return stocks(index, t).sum(axis=1) < minimum[index]
+
+        index = np.arange(len(amount))
+        start = np.zeros(len(amount))
+        horizon = np.where(below_minimum(index, start), 0.0, _first_time(below_minimum, duration))
+
+        # Instant d'épuisement de chaque stock (jamais si l'équilibre est positif)
+        exhausted = (target < 0)[:, None] & (amount > 0)
+        safe = np.where(exhausted, (amount - target[:, None]) / -np.where(target < 0, target, -1.0)[:, None], 1.0)
+        empty_at = np.where(exhausted, np.log(safe) / decay, np.where(amount > 0, np.inf, 0.0))
+        span = np.minimum(horizon[:, None], empty_at)
+        integral = target[:, None] * span + (amount - target[:, None]) * (1.0 - np.exp(-decay * span)) / decay
+        return np.where(present, integral, 0.0).sum(axis=1)
+
+    def _advance_factions(self, rows: np.ndarray, step: np.ndarray, tick: np.ndarray,
+                          graph: Optional[Any] = None) -> None:
+        """Diffusion puis lutte d'influence sur un segment de n ticks.
+
+        La diffusion relaxe vers la moyenne des voisins (1 - exp(-taux × durée)),
+        stable pour tout pas. Après normalisation, chaque tick de lutte applique
+        s <- a s + b à toutes les factions présentes, de point fixe 1 / F ;
+        n ticks donnent s_n = 1 / F + a^n (s_0 - 1 / F).
+        """
+        weight = 1.0 - np.exp(-self.diffusion_rate * step)
+        shares, border = self._normalize_and_diffuse(rows, weight, graph)
+        present = self.factions.present[rows]
+        total = shares.sum(axis=1)
+        active = total > 0
+        rows, step, tick, border = rows[active], step[active], tick[active], border[active]
+        present = present[active]
+        if len(rows) == 0:
+            return
+
+        shares = shares[active] / total[active][:, None]
+        count = present.sum(axis=1).astype(np.float64)
+        k = self.contest_rate * tick * np.where(border, self.border_contest, 1.0)
+        a = (1.0 - 2.0 * k) / (1.0 + k * (count - 2.0))
+        ticks = np.maximum(np.round(step / tick), 1.0)
+        fixed = 1.0 / count
+
+        # s_{n-1}, puis le dernier tick sans normalisation (comme le pas par tick)
+        previous = fixed[:, None] + (a ** (ticks - 1.0))[:, None] * (shares - fixed[:, None])
+        updated = previous + k[:, None] * (1.0 - 2.0 * previous)
+        self.factions.values[rows] = np.where(present, np.maximum(updated, 0.0), 0.0)
+        self.factions.version += 1
+
+def _phase_amounts(amount: np.ndarray, high: np.ndarray, population: np.ndarray,
+                   growth_rate: np.ndarray, t: np.ndarray) -> np.ndarray:
+    """Stocks après t secondes d'une phase (non bornés à 0).
+
+    Au-dessus de 100 : a - 0.01 ∫ p ; en dessous : solution de
+    da/dt = 0.05 (1 - a / 100) - 0.01 p0 exp(g t).
+    """
+    decay = 0.0005
+    growth = np.exp(growth_rate * t)
+    attenuation = np.exp(-decay * t)
+    safe_rate = np.where(growth_rate > 0, growth_rate, 1.0)
+    consumed = 0.01 * population * np.where(growth_rate > 0, (growth - 1.0) / safe_rate, t)
+    consumed_regen = 0.01 * population * (growth - attenuation) / (growth_rate + decay)
+    regenerating = 100.0 + (amount - 100.0) * attenuation[:, None] - consumed_regen[:, None]
+    return np.where(high, amount - consumed[:, None], regenerating)
+
+def _first_time(condition: Any, upper: np.ndarray, iterations: int = 48) -> np.ndarray:
+    """Premier instant de ]0, upper] où une condition persistante devient vraie.
+
+    condition(index, t) est évaluée pour un sous-ensemble de lignes ; les
+    lignes où elle reste fausse jusqu'à upper gardent upper.
+    """
+    upper = np.asarray(upper, dtype=np.float64)
+    result = upper.copy()
+    index = np.flatnonzero(condition(np.arange(len(upper)), upper))
+    if len(index):
+        low = np.zeros(len(index))
+        high = upper[index].copy()
+        for _ in range(iterations):
+            middle = 0.5 * (low + high)
+            reached = condition(index, middle)
+            high = np.where(reached, middle, high)
+            low = np.where(reached, low, middle)
+        result[index] = high
+    return result
+
+class KeyedRowView(MutableMapping):
+    """Vue dictionnaire sur une ligne d'une KeyedColumns."""
+
+    def __init__(self, columns: KeyedColumns, row: int):
+        self._columns = columns
+        self._row = row
+
+    def __getitem__(self, key: str) -> float:
+        return self._columns.get(self._row, key)
+
+    def __setitem__(self, key: str, value: float) -> None:
+        self._columns.set(self._row, key, value)
+
+    def __delitem__(self, key: str) -> None:
+        self._columns.remove(self._row, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._columns.keys(self._row))
+
+    def __len__(self) -> int:
+        return len(self._columns.order[self._row])
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+class EnvironmentView(MutableMapping):
+    """Vue dictionnaire sur les tableaux d'environnement d'une région."""
+
+    def __init__(self, store: RegionStore, row: int):
+        self._store = store
+        self._row = row
+
+    def __getitem__(self, key: str) -> float:
+        if key not in ENVIRONMENT_FIELDS:
+            raise KeyError(key)
+        return float(getattr(self._store, key)[self._row])
+
+    def __setitem__(self, key: str, value: float) -> None:
+        if key not in ENVIRONMENT_FIELDS:
+            raise KeyError(f"Champ d'environnement inconnu: {key}")
+        getattr(self._store, key)[self._row] = value
+
+    def __delitem__(self, key: str) -> None:
+        raise KeyError(f"Le champ d'environnement {key} ne peut pas être supprimé")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(ENVIRONMENT_FIELDS)
+
+    def __len__(self) -> int:
+        return len(ENVIRONMENT_FIELDS)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+class RegionStateView(MutableMapping):
+    """Vue dictionnaire sur l'état d'une région stocké en colonnes.
+
+    population, danger_level, environment, resources et faction_control sont
+    lus et écrits dans le RegionStore ; les autres champs restent dans un
+    dictionnaire classique.
+    """
+
+    COLUMNAR_FIELDS = ("population", "danger_level", "time_of_day", "environment", "resources", "faction_control")
+
+    def __init__(self, store: RegionStore, row: int, extra: Optional[Dict[str, Any]] = None):
+        self._store = store
+        self._row = row
+        self._extra = extra if extra is not None else {}
+
+    @property
+    def row(self) -> int:
+        return self._row
+
+    def __getitem__(self, key: str) -> Any:
+        store = self._store
+        if key == "population":
+            population = float(store.population[self._row])
+            return int(population) if population.is_integer() else population
+        if key == "danger_level":
+            return float(store.danger[self._row])
+        if key == "time_of_day":
+            return float(store.time_of_day[self._row])
+        if key == "environment":
+            return EnvironmentView(store, self._row)
+        if key == "resources":
+            return KeyedRowView(store.resources, self._row)
+        if key == "faction_control":
+            return KeyedRowView(store.factions, self._row)
+        return self._extra[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        store = self._store
+        if key == "population":
+            store.population[self._row] = value
+        elif key == "danger_level":
+            store.danger[self._row] = value
+        elif key == "time_of_day":
+            store.time_of_day[self._row] = value
+        elif key == "environment":
+            EnvironmentView(store, self._row).update(value)
+        elif key in ("resources", "faction_control"):
+            columns = store.resources if key == "resources" else store.factions
+            items = list(value.items())
+            columns.clear_row(self._row)
+            for name, amount in items:
+                columns.set(self._row, name, amount)
+        else:
+            self._extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key in self.COLUMNAR_FIELDS:
+            raise KeyError(f"Le champ colonnaire {key} ne peut pas être supprimé")
+        del self._extra[key]
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.COLUMNAR_FIELDS
+        yield from self._extra
+
+    def __len__(self) -> int:
+        return len(self.COLUMNAR_FIELDS) + len(self._extra)
+
+    def __repr__(self) -> str:
+        return f"RegionStateView(row={self._row}, {dict(self)!r})"
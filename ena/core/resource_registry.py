@@ -0,0 +1,182 @@
+"""
+Registre vectoriel des gisements de ressources du monde pour ENA
+"""
+from typing import Any, Dict, List, Optional, Tuple
+import math
+import numpy as np
+from ..utils.spatial_index import SpatialHash, Position, to_point
+
+# Courbes de régénération, toutes intégrées en forme close (exactes pour tout pas)
+REGENERATION_CURVES = ("none", "linear", "saturating", "logistic")
+
+class ResourceRegistry:
+    """Gisements (artefacts, plantes, caches...) stockés en tableaux.
+
+    Chaque gisement occupe une ligne : quantité, plafond, taux et courbe de
+    régénération. Un pas avance tous les gisements en quelques opérations
+    vectorielles. Une table spatiale par type ne contient que les gisements
+    disponibles (quantité > 0), ce qui rend la recherche du plus proche
+    indépendante du nombre de gisements épuisés.
+    """
+
+    def __init__(self, capacity: int = 64, cell_size: float = 50.0):
+        self.cell_size = cell_size
+        self.capacity = 0
+        self.amount = np.zeros(0)
+        self.max_amount = np.zeros(0)
+        self.rate = np.zeros(0)
+        self.curve = np.zeros(0, dtype=np.int8)
+        self.active = np.zeros(0, dtype=bool)
+        self.available = np.zeros(0, dtype=bool)
+        self.position = np.zeros((0, 3))
+        self.kinds: List[Optional[str]] = []
+        self.ids: List[Optional[str]] = []
+        self.rows: Dict[str, int] = {}
+        self.index: Dict[str, SpatialHash] = {}
+        self._free: List[int] = []
+        self.ensure_capacity(max(1, int(capacity)))
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __contains__(self, resource_id: str) -> bool:
+        return resource_id in self.rows
+
+    def ensure_capacity(self, capacity: int) -> None:
+        """Agrandit les tableaux si nécessaire."""
+        extra = int(capacity) - self.capacity
+        if extra <= 0:
+            return
+        for field in ("amount", "max_amount", "rate"):
+            setattr(self, field, np.concatenate([getattr(self, field), np.zeros(extra)]))
+        self.curve = np.concatenate([self.curve, np.zeros(extra, dtype=np.int8)])
+        self.active = np.concatenate([self.active, np.zeros(extra, dtype=bool)])
+        self.available = np.concatenate([self.available, np.zeros(extra, dtype=bool)])
+        self.position = np.vstack([self.position, np.zeros((extra, 3))])
+        self.kinds.extend([None] * extra)
+        self.ids.extend([None] * extra)
+        # Les lignes libres sont réutilisées de la plus petite à la plus grande
+        self._free = list(range(int(capacity) - 1, self.capacity - 1, -1)) + self._free
+        self.capacity = int(capacity)
+
+    def register(self, resource_id: str, kind: str, position: Position,
+                 amount: float = 0.0, max_amount: float = math.inf,
+                 rate: float = 0.0, curve: str = "linear") -> int:
+        """Enregistre (ou remplace) un gisement ; retourne sa ligne."""
+        if curve not in REGENERATION_CURVES:
+            raise ValueError(f"Courbe de régénération inconnue: {curve}")
+        if curve in ("saturating", "logistic") and not math.isfinite(max_amount):
+            raise ValueError(f"La courbe {curve} demande une quantité maximale finie")
+
+        if resource_id in self.rows:
+            self.unregister(resource_id)
+        if not self._free:
+            self.ensure_capacity(2 * self.capacity)
+        row = self._free.pop()
+
+        self.rows[resource_id] = row
+        self.ids[row] = resource_id
+        self.kinds[row] = kind
+        self.position[row] = to_point(position)
+        self.max_amount[row] = max_amount
+        self.amount[row] = min(max(0.0, amount), max_amount)
+        self.rate[row] = rate
+        self.curve[row] = REGENERATION_CURVES.index(curve)
+        self.active[row] = True
+        self.available[row] = False
+        self._sync_availability(np.array([row]))
+        return row
+
+    def unregister(self, resource_id: str) -> bool:
+        """Retire un gisement."""
+        row = self.rows.pop(resource_id, None)
+        if row is None:
+            return False
+        if self.available[row]:
+            self.index[self.kinds[row]].remove(resource_id)
+        self.active[row] = False
+        self.available[row] = False
+        self.amount[row] = 0.0
+        self.ids[row] = None
+        self.kinds[row] = None
+        self._free.append(row)
+        return True
+
+    def get(self, resource_id: str) -> Optional[Dict[str, Any]]:
+        """État d'un gisement."""
+        row = self.rows.get(resource_id)
+        if row is None:
+            return None
+        return {
+            "type": self.kinds[row],
+            "position": self.position[row].tolist(),
+            "amount": float(self.amount[row]),
+            "max_amount": float(self.max_amount[row]),
+            "regeneration_rate": float(self.rate[row]),
+            "curve": REGENERATION_CURVES[self.curve[row]]
+        }
+
+    def take(self, resource_id: str, amount: float) -> float:
+        """Prélève jusqu'à amount ; retourne la quantité obtenue."""
+        row = self.rows.get(resource_id)
+        if row is None or amount <= 0:
+            return 0.0
+        taken = min(float(self.amount[row]), amount)
+        self.amount[row] -= taken
+        self._sync_availability(np.array([row]))
+        return taken
+
+    def step(self, delta_time: float) -> None:
+        """Régénère tous les gisements d'un pas."""
+        active = self.active
+        amount = self.amount
+        cap = self.max_amount
+        rate = self.rate
+
+        linear = active & (self.curve == 1)
+        amount[linear] = np.minimum(amount[linear] + rate[linear] * delta_time, cap[linear])
+
+        # Approche exponentielle du plafond : a' = r (cap - a)
+        saturating = active & (self.curve == 2)
+        amount[saturating] = cap[saturating] - (cap[saturating] - amount[saturating]) * np.exp(-rate[saturating] * delta_time)
+
+        # Croissance logistique : a' = r a (1 - a / cap), un gisement vide reste vide
+        logistic = active & (self.curve == 3) & (amount > 0)
+        a, c = amount[logistic], cap[logistic]
+        amount[logistic] = c / (1.0 + (c / a - 1.0) * np.exp(-rate[logistic] * delta_time))
+
+        np.maximum(amount, 0.0, out=amount)
+        self._sync_availability(np.flatnonzero(active & ((amount > 0) != self.available)))
+
+    def nearest(self, kind: str, position: Position, min_amount: float = 0.0,
+                max_radius: Optional[float] = None) -> Optional[Tuple[str, float]]:
+        """Gisement disponible le plus proche d'un type : (identifiant, distance).
+
+        Seuls les gisements dont la quantité dépasse strictement min_amount
+        sont retenus.
+        """
+        index = self.index.get(kind)
+        if not index:
+            return None
+        k = 1
+        while True:
+            found = index.query_knn(position, k, max_radius)
+            for resource_id, distance in found:
+                if self.amount[self.rows[resource_id]] > min_amount:
+                    return resource_id, distance
+            if len(found) < k:
+                return None
+            k *= 4
+
+    def _sync_availability(self, rows: np.ndarray) -> None:
+        """Met à jour les tables spatiales des gisements dont la disponibilité a changé."""
+        for row in rows:
+            available = bool(self.amount[row] > 0)
+            if available == self.available[row]:
+                continue
+            self.available[row] = available
+            kind = self.kinds[row]
+            if available:
+                self.index.setdefault(kind, SpatialHash(self.cell_size)).insert(self.ids[row], self.position[row])
+            else:
+                self.index[kind].remove(self.ids[row])
@@ -0,0 +1,156 @@
+"""
+File des récompenses d'événements, appliquées par lots pour ENA
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from collections import deque
+import numpy as np
+
+REWARD_TYPES = ("experience", "resources", "reputation")
+
+def split_shares(amount: float, count: int) -> np.ndarray:
+    """Parts d'une récompense entre count PNJ, de somme exactement amount.
+
+    Une quantité entière reste entière : le reste de la division va aux
+    premiers PNJ. Une quantité réelle est divisée également.
+    """
+    if isinstance(amount, (int, np.integer)) or float(amount).is_integer():
+        base, remainder = divmod(int(amount), count)
+        shares = np.full(count, float(base))
+        shares[:remainder] += 1.0
+        return shares
+    return np.full(count, amount / count)
+
+class RewardPipeline:
+    """Récompenses en attente, appliquées en un seul passage en fin de tick.
+
+    Chaque attribution (PNJ, type, clé, quantité) est mise en file lors de la
+    fin d'un événement, puis les attributions sont regroupées par
+    destination : expérience dans le store des PNJ, objets dans les
+    inventaires, réputation auprès des factions. Un journal borné conserve
+    le détail de chaque attribution.
+    """
+
+    def __init__(self, audit_size: int = 10000):
+        self._sources: List[str] = []
+        self._npcs: List[str] = []
+        self._types: List[str] = []
+        self._keys: List[Optional[str]] = []
+        self._amounts: List[np.ndarray] = []
+        self.audit: deque = deque(maxlen=max(0, int(audit_size)))
+
+    def __len__(self) -> int:
+        return len(self._npcs)
+
+    def queue(self, source: str, rewards: Dict[str, Any], npc_ids: Sequence[str]) -> int:
+        """Met en file les récompenses d'un événement ; retourne le nombre d'attributions.
+
+        rewards: {"experience": 100, "resources": {"medkit": 3},
+        "reputation": {"duty": 10}} ; une réputation sans faction s'applique
+        à la faction de chaque PNJ.
+        """
+        npc_ids = list(npc_ids)
+        if not npc_ids:
+            return 0
+
+        grants = []
+        for reward_type, value in rewards.items():
+            if reward_type not in REWARD_TYPES:
+                raise ValueError(f"Type de récompense inconnu: {reward_type}")
+            if isinstance(value, dict):
+                grants.extend((reward_type, key, amount) for key, amount in value.items())
+            elif reward_type == "resources":
+                raise ValueError("Les ressources doivent être données par objet")
+            else:
+                grants.append((reward_type, None, value))
+
+        for reward_type, key, amount in grants:
+            self._sources.extend([source] * len(npc_ids))
+            self._npcs.extend(npc_ids)
+            self._types.extend([reward_type] * len(npc_ids))
+            self._keys.extend([key] * len(npc_ids))
+            self._amounts.append(split_shares(amount, len(npc_ids)))
+        return len(grants) * len(npc_ids)
+
+    def flush(self, ai_manager: Optional[Any] = None, faction_manager: Optional[Any] = None,
+              now: float = 0.0) -> Dict[str, int]:
+        """Applique toutes les attributions en attente ; retourne le nombre appliqué par type."""
+        if not self._npcs:
+            return {}
+
+        npcs = np.array(self._npcs, dtype=object)
+        types = np.array(self._types, dtype=object)
+        keys = list(self._keys)
+        amounts = np.concatenate(self._amounts)
+        sources = self._sources
+        self._sources, self._npcs, self._types, self._keys, self._amounts = [], [], [], [], []
+        applied = np.zeros(len(npcs), dtype=bool)
+
+        if ai_manager is not None:
+            # Expérience : une somme par PNJ, ajoutée au store en une opération
+            rows = np.flatnonzero(types == "experience")
+            if len(rows):
+                names, inverse = np.unique(npcs[rows], return_inverse=True)
+                totals = np.bincount(inverse, weights=amounts[rows], minlength=len(names))
+                found = ai_manager.add_experience(list(names), totals)
+                applied[rows] = found[inverse]
+
+            # Objets : un cumul par PNJ et par objet
+            rows = np.flatnonzero(types == "resources")
+            if len(rows):
+                items: Dict[str, Dict[str, float]] = {}
+                for row in rows:
+                    inventory = items.setdefault(npcs[row], {})
+                    inventory[keys[row]] = inventory.get(keys[row], 0.0) + amounts[row]
+                for inventory in items.values():
+                    for item, amount in inventory.items():
+                        if float(amount).is_integer():
+                            inventory[item] = int(amount)
+                found = ai_manager.add_items(items)
+                applied[rows] = [npcs[row] in found for row in rows]
+
+        rows = np.flatnonzero(types == "reputation")
+        if faction_manager is not None and len(rows):
+            # Réputation : la faction par défaut est celle du PNJ
+            changes: Dict[Tuple[str, str], float] = {}
+            targets = {}
+            for row in rows:
+                faction_id = keys[row]
+                if faction_id is None and ai_manager is not None and npcs[row] in ai_manager.states:
+                    faction_id = ai_manager.states[npcs[row]].get("faction")
+                if faction_id is None:
+                    continue
+                pair = (npcs[row], faction_id)
+                changes[pair] = changes.get(pair, 0.0) + amounts[row]
+                targets[row] = pair
+            found = faction_manager.adjust_reputations(
+                [(npc_id, faction_id, amount) for (npc_id, faction_id), amount in changes.items()]
+            )
+            accepted = {pair for pair, ok in zip(changes, found) if ok}
+            for row, pair in targets.items():
+                applied[row] = pair in accepted
+
+        for row in range(len(npcs)):
+            self.audit.append({
+                "time": now,
+                "source": sources[row],
+                "npc_id": npcs[row],
+                "type": types[row],
+                "key": keys[row],
+                "amount": float(amounts[row]),
+                "applied": bool(applied[row])
+            })
+
+        summary = {}
+        for reward_type in REWARD_TYPES:
+            count = int((applied & (types == reward_type)).sum())
+            if count:
+                summary[reward_type] = count
+        return summary
+
+    def history(self, npc_id: Optional[str] = None, source: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Attributions journalisées, filtrées par PNJ ou par événement."""
+        return [
+            entry for entry in self.audit
+            if (npc_id is None or entry["npc_id"] == npc_id)
+            and (source is None or entry["source"] == source)
+        ]
@@ -0,0 +1,145 @@
+"""
+Météo par fronts se déplaçant sur le graphe des régions
+"""
+from typing import Optional, Sequence, Tuple
+import math
+import numpy as np
+from .region_graph import RegionGraph
+
+WEATHER_TYPES = ("clear", "cloudy", "rain", "storm")
+
+def _binomial_counts(draws: np.ndarray, trials: int, probability: float, cap: int) -> np.ndarray:
+    """Nombre de succès sur trials essais de probabilité probability, plafonné à cap.
+
+    Inversion de la loi binomiale sur des tirages uniformes : le compte vaut
+    au moins j si draws < P(K >= j). Pour un seul essai, succès si draws < probability.
+    """
+    probability = min(max(float(probability), 0.0), 1.0)
+    if trials == 1:
+        return (draws < probability).astype(np.intp)
+    counts = np.zeros(len(draws), dtype=np.intp)
+    if probability == 0.0:
+        return counts
+    if probability == 1.0:
+        return np.full(len(draws), min(trials, cap), dtype=np.intp)
+    term = math.exp(trials * math.log1p(-probability))  # P(K = 0)
+    cumulative = 0.0
+    for j in range(1, min(trials, cap) + 1):
+        cumulative += term
+        counts += draws < 1.0 - cumulative
+        term *= (trials - j + 1) / j * probability / (1.0 - probability)
+    return counts
+
+class WeatherSystem:
+    """Fronts météo et chaîne de Markov par région.
+
+    Des fronts apparaissent dans les régions, se déplacent vers des régions
+    voisines et s'affaiblissent. Leur intensité, diffusée aux voisins, forme
+    un champ de pression qui fixe la météo cible de chaque région ; toutes les
+    régions avancent ensuite d'un pas de Markov vers leur cible (un cran à la
+    fois), en une seule opération vectorielle.
+
+    Un pas peut regrouper plusieurs ticks (avance rapide) : les probabilités
+    par tick sont alors composées sur le nombre de ticks (loi binomiale du
+    nombre de crans et de déplacements), au lieu d'être appliquées une fois
+    au segment entier.
+    """
+
+    def __init__(self, graph: RegionGraph, capacity: int,
+                 spawn_rate: float = 0.001,
+                 move_rate: float = 0.01,
+                 decay_rate: float = 0.002,
+                 change_rate: float = 0.05,
+                 spread: float = 0.5,
+                 thresholds: Optional[Sequence[float]] = None,
+                 min_strength: float = 0.05):
+        self.graph = graph
+        self.spawn_rate = spawn_rate
+        self.move_rate = move_rate
+        self.decay_rate = decay_rate
+        self.change_rate = change_rate
+        self.spread = spread
+        self.thresholds = np.asarray(thresholds or [0.2, 0.45, 0.7], dtype=np.float64)
+        self.min_strength = min_strength
+        self.capacity = 0
+        self.weather = np.zeros(0, dtype=np.int8)
+        self.pressure = np.zeros(0)
+        self.front_rows = np.zeros(0, dtype=np.intp)
+        self.front_strength = np.zeros(0)
+        self.ensure_capacity(capacity)
+
+    @property
+    def front_count(self) -> int:
+        return len(self.front_rows)
+
+    def ensure_capacity(self, capacity: int) -> None:
+        """Agrandit les tableaux si nécessaire."""
+        extra = int(capacity) - self.capacity
+        if extra <= 0:
+            return
+        self.weather = np.concatenate([self.weather, np.zeros(extra, dtype=np.int8)])
+        self.pressure = np.concatenate([self.pressure, np.zeros(extra)])
+        self.capacity = int(capacity)
+
+    def reset(self, row: int, weather: str = "clear") -> None:
+        """Réinitialise la météo d'une région."""
+        self.ensure_capacity(row + 1)
+        self.weather[row] = WEATHER_TYPES.index(weather) if weather in WEATHER_TYPES else 0
+        self.pressure[row] = 0.0
+
+    def step(self, count: int, delta_time: float, region_draws: np.ndarray,
+             front_draws: np.ndarray, ticks: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """Avance les fronts puis la météo des régions 0..count-1 de ticks ticks.
+
+        region_draws: tirages uniformes (count × 3, ou × 4 si ticks > 1) :
+            apparition, intensité, transition, tick d'apparition.
+        front_draws: tirages uniformes (fronts × (1 + k)) : nombre de
+            déplacements, puis choix du voisin pour chacun (au plus k).
+        Retourne (régions dont la météo a changé, météo précédente).
+        """
+        self.graph.ensure_nodes(count)
+        ticks = max(int(ticks), 1)
+        tick_time = delta_time / ticks
+
+        # Affaiblissement et déplacement des fronts existants
+        if self.front_count:
+            self.front_strength *= np.exp(-self.decay_rate * delta_time)
+            moves = _binomial_counts(front_draws[:, 0], ticks, self.move_rate * tick_time,
+                                     front_draws.shape[1] - 1)
+            for hop in range(1, int(moves.max()) + 1):
+                moving = moves >= hop
+                self.front_rows[moving] = self.graph.random_neighbors(
+                    self.front_rows[moving], front_draws[moving, hop]
+                )
+            alive = self.front_strength >= self.min_strength
+            self.front_rows = self.front_rows[alive]
+            self.front_strength = self.front_strength[alive]
+
+        # Nouveaux fronts (au plus un par région et par pas), affaiblis depuis leur tick d'apparition
+        spawn_probability = 1.0 - (1.0 - min(self.spawn_rate * tick_time, 1.0)) ** ticks
+        spawned = np.flatnonzero(region_draws[:, 0] < spawn_probability)
+        if len(spawned):
+            strength = 0.3 + 0.7 * region_draws[spawned, 1]
+            if ticks > 1:
+                age = np.floor(region_draws[spawned, 3] * ticks) * tick_time
+                strength *= np.exp(-self.decay_rate * age)
+            self.front_rows = np.concatenate([self.front_rows, spawned])
+            self.front_strength = np.concatenate([self.front_strength, strength])
+
+        # Champ de pression : fronts présents, diffusés aux régions voisines
+        local = np.bincount(self.front_rows, weights=self.front_strength, minlength=count)[:count]
+        field = local + self.spread * self.graph.neighbor_mean(local)[:count]
+        self.pressure[:count] = np.clip(field, 0.0, 1.0)
+
+        # Pas de Markov : un cran par tick vers la météo cible, avec une probabilité
+        # par seconde ; sur plusieurs ticks, nombre de crans binomial plafonné à l'écart
+        weather = self.weather[:count]
+        target = np.searchsorted(self.thresholds, self.pressure[:count], side="right")
+        gap = target - weather
+        notches = _binomial_counts(region_draws[:, 2], ticks, self.change_rate * tick_time,
+                                   len(WEATHER_TYPES) - 1)
+        notches = np.minimum(notches, np.abs(gap))
+        changed = np.flatnonzero(notches)
+        previous = weather[changed].copy()
+        weather[changed] += (np.sign(gap[changed]) * notches[changed]).astype(np.int8)
+        return changed, previous
@@ -1,30 +1,118 @@
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
+import math
 import numpy as np
 from ..utils.logger import Logger
 from ..utils.config import Config
+from ..utils.random_streams import SimulationRNG, entity_key
+from ..utils.spatial_index import to_point
+from .event_manager import Event
+from .region_store import RegionStore, RegionStateView, ENVIRONMENT_FIELDS
+from .event_timeline import EventTimeline, event_intensity, event_progress
+from .region_graph import RegionGraph
+from .region_dormancy import RegionDormancy
+from .region_membership import RegionMembership
+from .reward_pipeline import RewardPipeline
+from .resource_registry import ResourceRegistry
+from .weather import WeatherSystem, WEATHER_TYPES
 
 class WorldManager:
     """Gestionnaire du monde et de l'environnement."""
     
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, event_manager: Optional[Any] = None):
         self.config = config
         self.logger = Logger("WorldManager")
+        self.event_manager = event_manager
+        # Destinataires des récompenses (voir attach_managers)
+        self.ai_manager = None
+        self.faction_manager = None
         self.regions = {}
-        self.events = {}
-        self.resources = {}
+        
+        # Événements actifs (triés par échéance) et archive des terminés
+        self.event_timeline = EventTimeline(config.get("world.event_archive_size", 1000))
+        self.events = self.event_timeline.active
+        # Contribution appliquée par événement : (ligne, additif, log des facteurs, intensité)
+        self._event_effects: Dict[str, Tuple[int, np.ndarray, np.ndarray, float]] = {}
+        # Événements dont l'intensité décroît : contributions rafraîchies à chaque tick
+        self._decaying_events: Dict[str, None] = {}
+        # Gisements de ressources (positions, régénération), avancés en un pas vectoriel
+        self.resources = ResourceRegistry(
+            config.get("world.resource_capacity", 256),
+            config.get("world.resource_cell_size", 50.0)
+        )
         self.weather = {}
         self.time = 0.0
         self.npcs = {}
         
+        # Récompenses des événements terminés, appliquées en fin de tick
+        self.rewards = RewardPipeline(config.get("world.reward_audit_size", 10000))
+        
+        # Flux aléatoires : tirages propres à chaque région, dérivés de sa clé
+        self.rng = SimulationRNG(config.get("simulation.seed"))
+        self._region_keys = np.zeros(0, dtype=np.uint64)
+        self.region_capacity = config.get("world.max_regions", 100)
+        
+        # État numérique des régions en colonnes, avancé en un pas vectoriel
+        self.region_store = RegionStore(
+            self.region_capacity,
+            contest_rate=config.get("world.factions.contest_rate", 0.1),
+            diffusion_rate=config.get("world.factions.diffusion_rate", 0.02),
+            border_contest=config.get("world.factions.border_contest", 2.0)
+        )
+        self._region_rows = self.region_store.rows
+        
+        # Appartenance PNJ <-> région, déduite des positions et des bornes des régions
+        self.membership = RegionMembership(self.region_store.ids, self.region_store.capacity)
+        
+        # Régions inoccupées mises en sommeil, rattrapées à leur réveil
+        self.dormancy = RegionDormancy(
+            self.region_store.capacity,
+            delay=config.get("world.dormancy.delay", 60.0),
+            enabled=config.get("world.dormancy.enabled", True)
+        )
+        self.dormancy_max_step = config.get("world.dormancy.max_step", 60.0)
+        self.fast_forward_step = config.get("world.fast_forward_step", 300.0)
+        self.fast_forward_weather_step = config.get("world.fast_forward_weather_step", 100.0)
+        
+        # Adjacence des régions (déclarée par "neighbors") et fronts météo
+        self.region_graph = RegionGraph()
+        self._pending_neighbors: Dict[str, List[str]] = {}
+        self.weather_system = WeatherSystem(
+            self.region_graph,
+            self.region_store.capacity,
+            spawn_rate=config.get("world.weather_change_probability", 0.001),
+            move_rate=config.get("world.weather.front_move_rate", 0.01),
+            decay_rate=config.get("world.weather.front_decay_rate", 0.002),
+            change_rate=config.get("world.weather.transition_rate", 0.05),
+            spread=config.get("world.weather.spread", 0.5),
+            thresholds=config.get("world.weather.thresholds")
+        )
+        
+        # Routage des événements localisés vers les abonnements à une région
+        if self.event_manager is not None:
+            self.event_manager.set_region_locator(self.locate_region)
+        
     def register_region(self, region_id: str, region_data: Dict[str, Any]) -> bool:
         """Enregistre une nouvelle région."""
         try:
+            row = self.region_store.allocate(region_id)
+            if row >= len(self._region_keys):
+                self._region_keys = np.concatenate([
+                    self._region_keys,
+                    np.zeros(self.region_store.capacity - len(self._region_keys), dtype=np.uint64)
+                ])
+            self._region_keys[row] = entity_key(region_id)
+            state = RegionStateView(self.region_store, row)
+            state.update(self._initialize_region_state(region_data))
+            self.weather_system.reset(row, state["weather"])
+            self.dormancy.reset(row, self.time)
+            self._connect_neighbors(region_id, region_data.get("neighbors", []))
             self.regions[region_id] = {
                 "data": region_data,
-                "state": self._initialize_region_state(region_data),
-                "events": [],
+                "state": state,
+                "events": {},
                 "resources": {},
-                "npcs": []
+                # Ensemble ordonné des PNJ présents, tenu à jour par l'index
+                "npcs": self.membership.add_region(region_id, row, region_data.get("bounds"))
             }
             return True
         except Exception as e:
@@ -36,14 +124,11 @@ class WorldManager:
         try:
             # Mise à jour du temps
             self.time += delta_time
+            self.rng.begin_tick()
+            self.dormancy.advance(delta_time)
             
-            # Mise à jour des régions
-            for region_id, region in self.regions.items():
-                self._update_region(region_id, region, delta_time)
-                
-            # Mise à jour des PNJ
-            for npc_id, npc in self.npcs.items():
-                self._update_npc(npc_id, npc, delta_time)
+            # Mise à jour de toutes les régions en un pas vectoriel
+            self._update_regions(delta_time)
                 
             # Mise à jour des événements
             self._update_events(delta_time)
@@ -53,18 +138,229 @@ class WorldManager:
                 
             # Mise à jour de la météo
             self._update_weather(delta_time)
+            
+            # Récompenses du tick appliquées en un passage
+            self._apply_rewards()
                 
         except Exception as e:
             self.logger.error(f"Erreur lors de la mise à jour du monde: {str(e)}")
             
+    def attach_managers(self, ai_manager: Optional[Any] = None, faction_manager: Optional[Any] = None) -> None:
+        """Branche les gestionnaires recevant les récompenses des événements."""
+        self.ai_manager = ai_manager
+        self.faction_manager = faction_manager
+        
+    def get_reward_history(self, npc_id: Optional[str] = None, event_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Journal des récompenses attribuées, par PNJ ou par événement."""
+        return self.rewards.history(npc_id, event_id)
+            
+    def fast_forward(self, seconds: float, ai_manager: Optional[Any] = None) -> Dict[str, Any]:
+        """Avance le monde de plusieurs heures d'un coup (attente, sommeil, rattrapage du serveur).
+        
+        Les régions sont intégrées en forme close par segments d'au plus
+        world.fast_forward_step secondes, coupés aux échéances des événements.
+        Les PNJ d'ai_manager sont résumés statistiquement. Retourne un résumé,
+        également émis en événement "world_fast_forward".
+        """
+        try:
+            start = self.time
+            end = self.time + seconds
+            tick = self.config.get("world.update_rate", 0.2)
+            count = len(self.region_store)
+            rows = np.arange(count)
+            population = float(self.region_store.population[:count].sum())
+            dominant = [self.region_store.dominant_faction(row)[0] for row in rows]
+            
+            # Régions endormies rattrapées jusqu'à maintenant, puis avancées ensemble
+            self._wake_rows(rows)
+            expired = []
+            weather_changes = 0
+            weather_changed = np.zeros(count, dtype=bool)
+            steps = 0
+            while self.time < end:
+                target = min(end, self.time + self.fast_forward_step)
+                next_expiry = self.event_timeline.next_expiry()
+                if next_expiry is not None and self.time < next_expiry < target:
+                    target = next_expiry
+                step = target - self.time
+                self.rng.begin_tick()
+                
+                if count:
+                    # Intensité des événements décroissants prise au milieu du segment
+                    for event_id in list(self._decaying_events):
+                        self._apply_event_effects(event_id, self.events[event_id], self.time + step / 2)
+                    noise = self._random_block(self.rng.normal, "world.environment", 2, rows)
+                    self.region_store.advance(
+                        rows, np.full(count, step), np.full(count, step * tick), noise,
+                        self.fast_forward_step, self.region_graph
+                    )
+                    # Météo en sous-pas, chacun composé sur son nombre de ticks
+                    parts = max(1, int(np.ceil(step / self.fast_forward_weather_step)))
+                    for part in range(parts):
+                        if part:
+                            self.rng.begin_tick()
+                        changed, _ = self._step_weather(step / parts, max(1, int(round(step / parts / tick))))
+                        weather_changes += len(changed)
+                        weather_changed[changed] = True
+                    
+                self.time = target
+                self.dormancy.advance(step, step / tick)
+                expired.extend(self._update_events(step))
+                self._update_resources(step)
+                steps += 1
+                
+            self.dormancy.put_to_sleep(self.dormancy.sleep_candidates(count, self.time), self.time)
+            self._apply_rewards()
+            
+            # Météo des régions recopiée une seule fois, à la fin du saut
+            weather = self.weather_system.weather[:count]
+            for row in np.flatnonzero(weather_changed):
+                self.regions[self.region_store.ids[row]]["state"]["weather"] = WEATHER_TYPES[weather[row]]
+            digest = {
+                "start": start,
+                "end": self.time,
+                "steps": steps,
+                "population": {
+                    "before": population,
+                    "after": float(self.region_store.population[:count].sum())
+                },
+                "events_expired": expired,
+                "weather_changes": weather_changes,
+                "weather": {name: int((weather == i).sum()) for i, name in enumerate(WEATHER_TYPES)},
+                "faction_shifts": {
+                    self.region_store.ids[row]: (before, self.region_store.dominant_faction(row)[0])
+                    for row, before in zip(rows, dominant)
+                    if self.region_store.dominant_faction(row)[0] != before
+                }
+            }
+            if ai_manager is not None:
+                digest["npcs"] = ai_manager.fast_forward(seconds)
+            self._emit("world_fast_forward", digest)
+            return digest
+            
+        except Exception as e:
+            self.logger.error(f"Erreur lors de l'avance rapide du monde: {str(e)}")
+            return {}
+            
+    def connect_regions(self, region_a: str, region_b: str) -> bool:
+        """Déclare deux régions voisines."""
+        if region_a not in self._region_rows or region_b not in self._region_rows:
+            return False
+        self.region_graph.connect(self._region_rows[region_a], self._region_rows[region_b])
+        return True
+        
+    def get_neighbors(self, region_id: str) -> List[str]:
+        """Régions voisines d'une région."""
+        row = self._region_rows.get(region_id)
+        if row is None:
+            return []
+        return [self.region_store.ids[neighbor] for neighbor in self.region_graph.neighbors(row)]
+        
+    def _connect_neighbors(self, region_id: str, neighbors: List[str]) -> None:
+        """Relie une région à ses voisines déjà enregistrées (les autres à leur arrivée)."""
+        for neighbor in neighbors:
+            if not self.connect_regions(region_id, neighbor):
+                self._pending_neighbors.setdefault(neighbor, []).append(region_id)
+        for neighbor in self._pending_neighbors.pop(region_id, []):
+            self.connect_regions(region_id, neighbor)
+            
+    def register_resource(self, resource_id: str, resource_data: Dict[str, Any]) -> bool:
+        """Enregistre un gisement de ressource (artefact, plante, cache...).
+        
+        resource_data: type, position, amount, max_amount, regeneration_rate
+        et curve ("none", "linear", "saturating" ou "logistic").
+        """
+        try:
+            self.resources.register(
+                resource_id,
+                resource_data["type"],
+                resource_data.get("position", [0, 0, 0]),
+                resource_data.get("amount", 0.0),
+                resource_data.get("max_amount", float("inf")),
+                resource_data.get("regeneration_rate", self.config.get("world.resource_regeneration_rate", 0.1)),
+                resource_data.get("curve", "linear")
+            )
+            return True
+        except Exception as e:
+            self.logger.error(f"Erreur lors de l'enregistrement de la ressource {resource_id}: {str(e)}")
+            return False
+            
+    def harvest_resource(self, resource_id: str, amount: float) -> float:
+        """Prélève une quantité d'un gisement ; retourne la quantité obtenue."""
+        return self.resources.take(resource_id, amount)
+        
+    def find_nearest_resource(self, resource_type: str, position: Any, min_amount: float = 0.0,
+                              max_radius: Optional[float] = None) -> Optional[Tuple[str, float]]:
+        """Gisement le plus proche d'un type ayant plus de min_amount en stock : (identifiant, distance)."""
+        try:
+            return self.resources.nearest(resource_type, position, min_amount, max_radius)
+        except Exception as e:
+            self.logger.error(f"Erreur lors de la recherche de ressource: {str(e)}")
+            return None
+            
     def get_region_state(self, region_id: str) -> Dict[str, Any]:
-        """Récupère l'état d'une région."""
+        """Récupère l'état d'une région (rattrapée si elle était endormie)."""
+        self._wake_region(region_id)
         return self.regions.get(region_id, {}).get("state", {})
         
+    def get_dominant_faction(self, region_id: str) -> Tuple[Optional[str], float]:
+        """Faction dominante d'une région et sa part du contrôle."""
+        row = self._wake_region(region_id)
+        if row is None:
+            return None, 0.0
+        return self.region_store.dominant_faction(row)
+        
+    def enter_region(self, region_id: str) -> bool:
+        """Un joueur entre dans une région : elle reste éveillée tant qu'il y est."""
+        row = self._wake_region(region_id)
+        if row is None:
+            return False
+        self.dormancy.players[row] += 1
+        return True
+        
+    def leave_region(self, region_id: str) -> bool:
+        """Un joueur quitte une région."""
+        row = self._region_rows.get(region_id)
+        if row is None or self.dormancy.players[row] == 0:
+            return False
+        self.dormancy.players[row] -= 1
+        self.dormancy.touch(row, self.time)
+        return True
+        
+    def is_region_dormant(self, region_id: str) -> bool:
+        """Indique si une région est endormie."""
+        row = self._region_rows.get(region_id)
+        return row is not None and bool(self.dormancy.asleep[row])
+        
+    def _wake_region(self, region_id: str) -> Optional[int]:
+        """Réveille et rattrape une région ; retourne sa ligne"""
+        row = self._region_rows.get(region_id)
+        if row is not None:
+            if self.dormancy.asleep[row]:
+                self._wake_rows(np.array([row]))
+            self.dormancy.touch(row, self.time)
+        return row
+        
+    def _wake_rows(self, rows: np.ndarray) -> None:
+        """Rattrape en forme close des régions endormies"""
+        try:
+            rows, elapsed, dt2 = self.dormancy.wake(rows, self.time)
+            if len(rows) == 0:
+                return
+            noise = self._random_block(self.rng.normal, "world.dormancy", 2, rows)
+            self.region_store.advance(rows, elapsed, dt2, noise, self.dormancy_max_step, self.region_graph)
+        except Exception as e:
+            self.logger.error(f"Erreur lors du réveil des régions: {str(e)}")
+        
     def spawn_event(self, event_type: str, region_id: str, event_data: Dict[str, Any]) -> str:
         """Crée un nouvel événement dans une région."""
         try:
-            event_id = f"{event_type}_{len(self.events)}"
+            if region_id not in self.regions:
+                self.logger.error(f"Région non trouvée: {region_id}")
+                return None
+                
+            row = self._wake_region(region_id)
+            event_id = self.event_timeline.next_id(event_type)
             
             event = {
                 "type": event_type,
@@ -74,14 +370,45 @@ class WorldManager:
                 "time": self.time
             }
             
-            self.events[event_id] = event
-            self.regions[region_id]["events"].append(event_id)
+            self.event_timeline.add(event_id, event)
+            self.regions[region_id]["events"][event_id] = None
+            self.dormancy.events[row] += 1
+            self._apply_event_effects(event_id, event)
             
             return event_id
         except Exception as e:
             self.logger.error(f"Erreur lors de la création de l'événement: {str(e)}")
             return None
             
+    def get_event_state(self, event_id: str) -> Optional[Dict[str, Any]]:
+        """Récupère l'état d'un événement actif ou archivé (progression et intensité à jour)."""
+        event = self.event_timeline.get(event_id)
+        if event is None:
+            return None
+            
+        state = event["state"]
+        if state["active"]:
+            state["progress"] = event_progress(event, self.time)
+            state["intensity"] = event_intensity(event, self.time)
+        return state
+        
+    def set_event_intensity(self, event_id: str, intensity: float) -> bool:
+        """Modifie l'intensité d'un événement actif (la décroissance repart de maintenant)."""
+        try:
+            event = self.events.get(event_id)
+            if event is None:
+                return False
+                
+            state = event["state"]
+            state["base_intensity"] = intensity
+            state["intensity"] = intensity
+            state["intensity_time"] = self.time
+            self._apply_event_effects(event_id, event)
+            return True
+        except Exception as e:
+            self.logger.error(f"Erreur lors de la modification de l'intensité de l'événement: {str(e)}")
+            return False
+            
     def handle_npc_spawn(self, event: Any) -> None:
         """Gère l'apparition d'un PNJ"""
         try:
@@ -103,12 +430,108 @@ class WorldManager:
                 "rotation": npc_data.get("rotation", [0, 0, 0]),
                 "state": "idle"
             }
+            self._move_npc(npc_id, region_id)
+            self._track_npcs({npc_id: self.npcs[npc_id]["position"]})
             
             self.logger.info(f"PNJ apparu: {npc_id} dans la région {region_id}")
             
         except Exception as e:
             self.logger.error(f"Erreur lors de l'apparition du PNJ: {str(e)}")
             
+    def handle_npc_move(self, event: Any) -> None:
+        """Gère le déplacement d'un PNJ (changement de région selon sa position)"""
+        npc_id = event.data.get("id")
+        position = event.data.get("position")
+        if npc_id and position is not None:
+            self.update_npc_positions({npc_id: position})
+            
+    def handle_npc_moves(self, events: List[Any]) -> None:
+        """Gère un lot de déplacements (livraison par lot du gestionnaire d'événements)"""
+        positions = {}
+        for event in events:
+            npc_id = event.data.get("id")
+            position = event.data.get("position")
+            if npc_id and position is not None:
+                positions[npc_id] = position
+        if positions:
+            self.update_npc_positions(positions)
+            
+    def handle_npc_despawn(self, event: Any) -> None:
+        """Gère la disparition d'un PNJ"""
+        npc_id = event.data.get("id")
+        if npc_id:
+            self.remove_npc(npc_id)
+            
+    def remove_npc(self, npc_id: str) -> bool:
+        """Retire un PNJ du monde (il quitte sa région)."""
+        if self.npcs.pop(npc_id, None) is None:
+            return False
+        region_id = self.membership.remove(npc_id)
+        if region_id is not None:
+            self._emit("npc_left_region", {"npc_id": npc_id, "region_id": region_id, "to": None, "time": self.time})
+        if self.event_manager is not None:
+            self.event_manager.forget_entity(npc_id)
+        return True
+        
+    def update_npc_positions(self, positions: Dict[str, Any]) -> List[Tuple[str, Optional[str], str]]:
+        """Met à jour la position de PNJ et en déduit leurs changements de région.
+        
+        Un PNJ hors de toutes les régions bornées reste dans sa dernière région.
+        Retourne les transitions (PNJ, ancienne région, nouvelle région).
+        """
+        try:
+            npc_ids = [npc_id for npc_id in positions if npc_id in self.npcs]
+            if not npc_ids:
+                return []
+                
+            points = np.array([to_point(positions[npc_id]) for npc_id in npc_ids], dtype=np.float64)
+            current = np.array([
+                self._region_rows.get(self.membership.region(npc_id), -1) for npc_id in npc_ids
+            ], dtype=np.intp)
+            rows = self.membership.locate(points, current)
+            
+            transitions = []
+            for npc_id, point, row, old_row in zip(npc_ids, points, rows, current):
+                self.npcs[npc_id]["position"] = point.tolist()
+                if row < 0 or row == old_row:
+                    continue
+                region_id = self.region_store.ids[row]
+                previous = self._move_npc(npc_id, region_id)
+                transitions.append((npc_id, previous, region_id))
+            self._track_npcs(dict(zip(npc_ids, points)))
+            return transitions
+            
+        except Exception as e:
+            self.logger.error(f"Erreur lors de la mise à jour des positions des PNJ: {str(e)}")
+            return []
+            
+    def locate_region(self, position: Any) -> Optional[str]:
+        """Première région bornée contenant une position."""
+        row = self.membership.locate(np.array([to_point(position)]))[0]
+        return self.region_store.ids[row] if row >= 0 else None
+        
+    def get_npc_region(self, npc_id: str) -> Optional[str]:
+        """Région d'un PNJ."""
+        return self.membership.region(npc_id)
+        
+    def get_region_npcs(self, region_id: str) -> List[str]:
+        """PNJ présents dans une région, dans leur ordre d'arrivée."""
+        return list(self.membership.npcs(region_id))
+        
+    def _move_npc(self, npc_id: str, region_id: str) -> Optional[str]:
+        """Place un PNJ dans une région et émet les événements de sortie et d'entrée"""
+        previous, changed = self.membership.place(npc_id, region_id)
+        if changed:
+            self.npcs[npc_id]["region_id"] = region_id
+            if previous is not None:
+                self._emit("npc_left_region", {
+                    "npc_id": npc_id, "region_id": previous, "to": region_id, "time": self.time
+                })
+            self._emit("npc_entered_region", {
+                "npc_id": npc_id, "region_id": region_id, "from": previous, "time": self.time
+            })
+        return previous
+            
     def _initialize_region_state(self, region_data: Dict[str, Any]) -> Dict[str, Any]:
         """Initialise l'état d'une région."""
         return {
@@ -130,232 +553,235 @@ class WorldManager:
         
     def _initialize_event_state(self, event_data: Dict[str, Any]) -> Dict[str, Any]:
         """Initialise l'état d'un événement."""
+        intensity = event_data.get("initial_intensity", 1.0)
         return {
             "active": True,
             "progress": 0.0,
-            "intensity": event_data.get("initial_intensity", 1.0),
+            "intensity": intensity,
+            "base_intensity": intensity,
+            "decay_rate": event_data.get("decay_rate", 0.0),
             "duration": event_data.get("duration", 300.0),
             "affected_npcs": [],
+            # Sur demande, les PNJ présents dans la région se partagent les récompenses
+            "reward_region": bool(event_data.get("reward_region", False)),
             "effects": event_data.get("effects", {}),
             "rewards": event_data.get("rewards", {})
         }
         
-    def _update_region(self, region_id: str, region: Dict[str, Any], delta_time: float) -> None:
-        """Met à jour une région"""
+    def _update_regions(self, delta_time: float) -> None:
+        """Met à jour toutes les régions éveillées"""
         try:
-            state = region["state"]
-            
-            # Mise à jour de l'environnement
-            self._update_environment(state, delta_time)
-            
-            # Mise à jour de la population
-            self._update_population(state, delta_time)
+            rows = self.dormancy.awake_rows(len(self.region_store))
+            if len(rows) == 0:
+                return
+                
+            # Tirages normaux centrés réduits, une ligne par région
+            noise = self._random_block(self.rng.normal, "world.environment", 2, rows)
             
-            # Mise à jour des ressources
-            self._update_region_resources(state, delta_time)
+            # Seuls les événements à intensité décroissante modifient les cumuls
+            for event_id in list(self._decaying_events):
+                self._apply_event_effects(event_id, self.events[event_id])
+                
+            self.region_store.step(rows, delta_time, noise, self.region_graph)
             
-            # Mise à jour du contrôle des factions
-            self._update_faction_control(state, delta_time)
+            # Régions à jour et inoccupées depuis assez longtemps : mises en sommeil
+            self.dormancy.put_to_sleep(self.dormancy.sleep_candidates(len(self.region_store), self.time), self.time)
             
         except Exception as e:
-            self.logger.error(f"Erreur lors de la mise à jour de la région: {str(e)}")
+            self.logger.error(f"Erreur lors de la mise à jour des régions: {str(e)}")
             
-    def _update_npc(self, npc_id: str, npc: Dict[str, Any], delta_time: float) -> None:
-        """Met à jour un PNJ"""
+    def _compile_effects(self, effects: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+        """Effets par seconde d'un événement d'intensité 1.
+        
+        Un effet est soit un nombre (additif), soit un dictionnaire
+        {"type": "additive" | "multiplicative", "value": ...} ; un effet
+        multiplicatif est un facteur appliqué par seconde.
+        """
+        additive = np.zeros(len(ENVIRONMENT_FIELDS))
+        log_factor = np.zeros(len(ENVIRONMENT_FIELDS))
+        
+        for field, effect in effects.items():
+            if field not in ENVIRONMENT_FIELDS:
+                continue
+            column = ENVIRONMENT_FIELDS.index(field)
+            if isinstance(effect, dict):
+                effect_type = effect.get("type", "additive")
+                value = effect.get("value", 0.0)
+            else:
+                effect_type = "additive"
+                value = effect
+                
+            if effect_type == "additive":
+                additive[column] += value
+            elif effect_type == "multiplicative":
+                if value <= 0:
+                    raise ValueError(f"Facteur multiplicatif invalide pour {field}: {value}")
+                log_factor[column] += math.log(value)
+            else:
+                raise ValueError(f"Type d'effet inconnu: {effect_type}")
+                
+        return additive, log_factor
+        
+    def _apply_event_effects(self, event_id: str, event: Dict[str, Any],
+                             now: Optional[float] = None) -> None:
+        """Met à jour les cumuls d'effets de la région d'un événement (intensité à l'instant now)"""
         try:
-            # TODO: Implémenter la mise à jour des PNJ
-            pass
-        except Exception as e:
-            self.logger.error(f"Erreur lors de la mise à jour du PNJ: {str(e)}")
+            state = event["state"]
+            intensity = event_intensity(event, self.time if now is None else now)
+            previous = self._event_effects.get(event_id)
             
-    def _update_events(self, delta_time: float) -> None:
-        """Met à jour les événements"""
-        try:
-            # Mise à jour des événements actifs
-            completed_events = []
-            
-            for event_id, event in self.events.items():
-                if event["state"]["active"]:
-                    try:
-                        # Mise à jour de la progression
-                        progress = event["state"]["progress"]
-                        duration = event["state"]["duration"]
-                        
-                        progress += delta_time / duration
-                        event["state"]["progress"] = progress
-                        
-                        # Vérification de la fin de l'événement
-                        if progress >= 1.0:
-                            event["state"]["active"] = False
-                            completed_events.append(event_id)
-                            
-                        # Mise à jour de l'intensité
-                        intensity = event["state"]["intensity"]
-                        intensity *= (1.0 - progress)
-                        event["state"]["intensity"] = intensity
-                        
-                    except Exception as e:
-                        self.logger.error(f"Erreur lors de la mise à jour de l'événement: {str(e)}")
-                        
-            # Nettoyage des événements terminés
-            for event_id in completed_events:
-                self._cleanup_event(event_id)
+            if previous is None:
+                row = self._region_rows[event["region"]]
+                additive, log_factor = self._compile_effects(state["effects"])
+                if not additive.any() and not log_factor.any():
+                    return
+            else:
+                row, additive, log_factor, applied = previous
+                if intensity == applied:
+                    return
+                self.region_store.add_effect(row, additive, log_factor, -applied)
+                
+            self.region_store.add_effect(row, additive, log_factor, intensity)
+            self._event_effects[event_id] = (row, additive, log_factor, intensity)
+            if state.get("decay_rate"):
+                self._decaying_events[event_id] = None
                 
         except Exception as e:
-            self.logger.error(f"Erreur lors de la mise à jour des événements: {str(e)}")
+            self.logger.error(f"Erreur lors de l'application des effets de l'événement {event_id}: {str(e)}")
             
-    def _update_resources(self, delta_time: float) -> None:
-        """Met à jour les ressources"""
+    def _remove_event_effects(self, event_id: str, region_id: str) -> None:
+        """Retire la contribution d'un événement terminé"""
+        self._decaying_events.pop(event_id, None)
+        previous = self._event_effects.pop(event_id, None)
+        if previous is None:
+            return
+            
+        row, additive, log_factor, applied = previous
+        if region_id in self.regions and not self.regions[region_id]["events"]:
+            # Plus aucun événement : remise à zéro exacte (pas d'erreur d'arrondi résiduelle)
+            self.region_store.effect_add[row] = 0.0
+            self.region_store.effect_log_factor[row] = 0.0
+        else:
+            self.region_store.add_effect(row, additive, log_factor, -applied)
+            
+    def _update_events(self, delta_time: float) -> List[str]:
+        """Termine les événements arrivés à échéance ; retourne leurs identifiants"""
+        expired = []
         try:
-            # Mise à jour des ressources globales
-            for resource_id, resource in self.resources.items():
+            for event_id, event in self.event_timeline.pop_expired(self.time):
+                expired.append(event_id)
                 try:
-                    # Mise à jour de la quantité
-                    amount = resource["amount"]
-                    regen_rate = resource.get("regeneration_rate", 0.0)
+                    state = event["state"]
+                    state["active"] = False
+                    state["progress"] = 1.0
+                    state["intensity"] = event_intensity(event, event["expires_at"])
                     
-                    amount += regen_rate * delta_time
-                    resource["amount"] = max(0, min(amount, resource.get("max_amount", float("inf"))))
+                    self._cleanup_event(event_id, event)
+                    self.event_timeline.archive_event(event_id, event)
                     
                 except Exception as e:
-                    self.logger.error(f"Erreur lors de la mise à jour de la ressource: {str(e)}")
+                    self.logger.error(f"Erreur lors de la mise à jour de l'événement: {str(e)}")
                     
+        except Exception as e:
+            self.logger.error(f"Erreur lors de la mise à jour des événements: {str(e)}")
+        return expired
+            
+    def _update_resources(self, delta_time: float) -> None:
+        """Régénère tous les gisements de ressources"""
+        try:
+            self.resources.step(delta_time)
         except Exception as e:
             self.logger.error(f"Erreur lors de la mise à jour des ressources: {str(e)}")
             
     def _update_weather(self, delta_time: float) -> None:
         """Met à jour la météo"""
         try:
-            # Mise à jour des conditions météorologiques
-            for region_id, region in self.regions.items():
-                try:
-                    state = region["state"]
-                    current_weather = state["weather"]
-                    
-                    # Probabilité de changement météo
-                    if np.random.random() < 0.001 * delta_time:
-                        # Sélection du nouveau temps
-                        weather_types = ["clear", "cloudy", "rain", "storm"]
-                        weights = [0.4, 0.3, 0.2, 0.1]
-                        
-                        new_weather = np.random.choice(weather_types, p=weights)
-                        state["weather"] = new_weather
-                        
-                    # Mise à jour du temps de la journée
-                    state["time_of_day"] = (state["time_of_day"] + delta_time / 86400.0) % 1.0
-                    
-                except Exception as e:
-                    self.logger.error(f"Erreur lors de la mise à jour de la météo de la région: {str(e)}")
-                    
+            changed, previous = self._step_weather(delta_time)
+            
+            # Seules les régions dont la météo change sont modifiées
+            for row, old in zip(changed, previous):
+                region_id = self.region_store.ids[row]
+                state = self.regions[region_id]["state"]
+                state["weather"] = WEATHER_TYPES[self.weather_system.weather[row]]
+                self._emit("weather_changed", {
+                    "region_id": region_id,
+                    "previous": WEATHER_TYPES[old],
+                    "weather": state["weather"],
+                    "pressure": float(self.weather_system.pressure[row]),
+                    "time": self.time
+                })
+                
         except Exception as e:
             self.logger.error(f"Erreur lors de la mise à jour de la météo: {str(e)}")
             
-    def _update_environment(self, state: Dict[str, Any], delta_time: float):
-        """Met à jour l'environnement d'une région."""
-        env = state["environment"]
+    def _step_weather(self, delta_time: float, ticks: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """Avance fronts, météo et heure du jour de ticks ticks ; retourne (lignes changées, météo précédente)"""
+        count = len(self.region_store)
+        if count == 0:
+            return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.int8)
+            
+        # Tirages du tick : une ligne par région, une par front (un voisin par déplacement, au plus 3)
+        region_draws = self._random_block(self.rng.uniform, "world.weather", 3 if ticks == 1 else 4, np.arange(count))
+        fronts = self.weather_system.front_count
+        front_draws = self.rng.uniform("world.weather_fronts", np.arange(fronts, dtype=np.uint64), 1 + min(ticks, 3))
+        changed, previous = self.weather_system.step(count, delta_time, region_draws, front_draws, ticks)
         
-        # Variations naturelles
-        env["temperature"] += np.random.normal(0, 0.1) * delta_time
-        env["humidity"] += np.random.normal(0, 0.05) * delta_time
+        # Mise à jour du temps de la journée
+        time_of_day = self.region_store.time_of_day
+        time_of_day[:count] = (time_of_day[:count] + delta_time / 86400.0) % 1.0
+        return changed, previous
         
-        # Application des effets des événements
-        for event_id in state["events"]:
-            if event_id in self.events:
-                event = self.events[event_id]
-                effects = event["state"]["effects"]
-                
-                if "temperature" in effects:
-                    env["temperature"] += effects["temperature"] * delta_time
-                if "radiation" in effects:
-                    env["radiation"] += effects["radiation"] * delta_time
-                    
-        # Normalisation des valeurs
-        env["temperature"] = np.clip(env["temperature"], -50, 50)
-        env["humidity"] = np.clip(env["humidity"], 0, 1)
-        env["radiation"] = np.clip(env["radiation"], 0, 100)
-        env["toxicity"] = np.clip(env["toxicity"], 0, 100)
-        
-    def _update_population(self, state: Dict[str, Any], delta_time: float):
-        """Met à jour la population d'une région."""
-        # Facteurs affectant la population
-        danger_factor = 1.0 - (state["danger_level"] / 100.0)
-        resource_factor = min(1.0, sum(state["resources"].values()) / 100.0)
-        
-        # Croissance/décroissance naturelle
-        growth_rate = 0.001 * danger_factor * resource_factor
-        state["population"] += state["population"] * growth_rate * delta_time
-        
-        # Arrondi à l'entier le plus proche
-        state["population"] = round(state["population"])
-        
-    def _update_region_resources(self, state: Dict[str, Any], delta_time: float):
-        """Met à jour les ressources d'une région."""
-        for resource, amount in state["resources"].items():
-            # Consommation naturelle
-            consumption_rate = 0.01 * state["population"]
-            amount -= consumption_rate * delta_time
-            
-            # Régénération naturelle
-            if amount < 100:
-                regen_rate = 0.05 * (1.0 - amount / 100.0)
-                amount += regen_rate * delta_time
-                
-            state["resources"][resource] = max(0, amount)
+    def _emit(self, event_type: str, data: Dict[str, Any]) -> None:
+        """Émet un événement si un gestionnaire d'événements est branché"""
+        if self.event_manager is not None:
+            self.event_manager.emit(Event(event_type, data))
+            
+    def _track_npcs(self, positions: Dict[str, Any]) -> None:
+        """Déplace les abonnements aux événements qui suivent ces PNJ"""
+        if self.event_manager is not None:
+            self.event_manager.move_entities(positions)
             
-    def _update_faction_control(self, state: Dict[str, Any], delta_time: float):
-        """Met à jour le contrôle des factions dans une région."""
-        total_control = sum(state["faction_control"].values())
+    def _random_block(self, draw, stream: str, width: int, rows: np.ndarray) -> np.ndarray:
+        """Tirages du tick courant pour des lignes de régions (une ligne par région)"""
+        return draw(stream, self._region_keys[rows], width)
         
-        if total_control > 0:
-            # Normalisation du contrôle
-            for faction in state["faction_control"]:
-                state["faction_control"][faction] /= total_control
-                
-            # Lutte d'influence
-            for faction, control in state["faction_control"].items():
-                # Influence des autres factions
-                other_factions = sum(c for f, c in state["faction_control"].items() if f != faction)
-                
-                # Changement de contrôle
-                change_rate = 0.1 * (other_factions - control)
-                state["faction_control"][faction] += change_rate * delta_time
-                
-    def _cleanup_event(self, event_id: str):
+    def _cleanup_event(self, event_id: str, event: Dict[str, Any]):
         """Nettoie un événement terminé."""
-        if event_id in self.events:
-            event = self.events[event_id]
-            region_id = event["region"]
+        region_id = event["region"]
+        
+        if region_id in self.regions:
+            # Retrait de l'événement de la région
+            self.regions[region_id]["events"].pop(event_id, None)
+            row = self._region_rows[region_id]
+            self.dormancy.events[row] = max(0, self.dormancy.events[row] - 1)
+            self.dormancy.touch(row, self.time)
+        self._remove_event_effects(event_id, region_id)
             
-            if region_id in self.regions:
-                # Retrait de l'événement de la région
-                self.regions[region_id]["events"].remove(event_id)
-                
-            # Distribution des récompenses
-            rewards = event["state"].get("rewards", {})
-            if rewards:
-                self._distribute_rewards(rewards, event["state"]["affected_npcs"])
-                
-    def _distribute_rewards(self, rewards: Dict[str, Any], affected_npcs: List[str]):
-        """Distribue les récompenses d'un événement."""
-        if not affected_npcs:
-            return
+        # Récompenses mises en file, appliquées en fin de tick
+        rewards = event["state"].get("rewards", {})
+        if rewards:
+            self._distribute_rewards(event_id, event, rewards)
             
-        # Distribution équitable entre les PNJ affectés
-        share = 1.0 / len(affected_npcs)
-        
-        for npc_id in affected_npcs:
-            try:
-                # Application des récompenses
-                for reward_type, amount in rewards.items():
-                    if reward_type == "experience":
-                        # TODO: Ajouter l'expérience au PNJ
-                        pass
-                    elif reward_type == "resources":
-                        # TODO: Ajouter les ressources au PNJ
-                        pass
-                    elif reward_type == "reputation":
-                        # TODO: Modifier la réputation du PNJ
-                        pass
-                        
-            except Exception as e:
-                self.logger.error(f"Erreur lors de la distribution des récompenses au PNJ: {str(e)}")
+    def _distribute_rewards(self, event_id: str, event: Dict[str, Any], rewards: Dict[str, Any]) -> None:
+        """Partage les récompenses d'un événement entre les PNJ affectés.
+        
+        Sans PNJ affectés, rien n'est attribué ; un événement créé avec
+        "reward_region": True récompense plutôt les PNJ présents dans sa région.
+        """
+        try:
+            state = event["state"]
+            affected_npcs = state["affected_npcs"]
+            if state.get("reward_region"):
+                affected_npcs = list(self.membership.npcs(event["region"]))
+            self.rewards.queue(event_id, rewards, affected_npcs)
+        except Exception as e:
+            self.logger.error(f"Erreur lors de la distribution des récompenses de l'événement {event_id}: {str(e)}")
+            
+    def _apply_rewards(self) -> None:
+        """Applique les récompenses en attente"""
+        try:
+            if len(self.rewards):
+                applied = self.rewards.flush(self.ai_manager, self.faction_manager, self.time)
+                self._emit("rewards_applied", {"time": self.time, "grants": applied})
+        except Exception as e:
+            self.logger.error(f"Erreur lors de l'application des récompenses: {str(e)}")
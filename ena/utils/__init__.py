@@ -7,11 +7,19 @@ from .logger import Logger
 from .data_manager import DataManager
 from .path_manager import PathManager
 from .resource_manager import ResourceManager
+from .random_streams import SimulationRNG
+from .tick_scheduler import TickScheduler
+from .spatial_index import SpatialHash
+from .shared_arrays import SharedArrays
 
 __all__ = [
     'Config',
     'Logger',
     'DataManager',
     'PathManager',
-    'ResourceManager'
+    'ResourceManager',
+    'SimulationRNG',
+    'TickScheduler',
+    'SpatialHash',
+    'SharedArrays'
 ]
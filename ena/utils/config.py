@@ -25,9 +25,17 @@ class Config:
                 "max_size": 10485760,  # 10 MB
                 "backup_count": 5
             },
+            "simulation": {
+                "seed": None
+            },
             "ai": {
                 "update_rate": 0.1,
                 "max_npcs": 1000,
+                "state_backend": "dict",
+                "parallel_tick": False,
+                "parallel_min_npcs": 2000,
+                "incremental_selection": True,
+                "emotion_epsilon": 0.05,
                 "behavior_weights": {
                     "idle": 1.0,
                     "wander": 0.8,
@@ -36,14 +44,62 @@ class Config:
                     "flee": 2.0
                 },
                 "perception_range": 50.0,
-                "memory_duration": 300.0
+                "interaction_range": 5.0,
+                "low_health_threshold": 30.0,
+                "memory_duration": 300.0,
+                "lod": {
+                    "enabled": True,
+                    "tiers": [
+                        [50.0, 1],
+                        [150.0, 2],
+                        [400.0, 4],
+                        [1000.0, 8],
+                        [None, 16]
+                    ]
+                }
+            },
+            "events": {
+                "async": False,
+                "queue_size": 1000,
+                "overflow_policy": "drop_oldest",
+                "block_timeout": 1.0,
+                "listener_concurrency": 1,
+                "spatial_cell_size": 50.0,
+                "ring": {
+                    "enabled": False,
+                    "name": "ena_events",
+                    "capacity": 4096
+                }
             },
             "world": {
                 "update_rate": 0.2,
                 "max_regions": 100,
                 "max_events": 50,
+                "event_archive_size": 1000,
+                "reward_audit_size": 10000,
                 "weather_change_probability": 0.001,
-                "resource_regeneration_rate": 0.1
+                "weather": {
+                    "front_move_rate": 0.01,
+                    "front_decay_rate": 0.002,
+                    "transition_rate": 0.05,
+                    "spread": 0.5,
+                    "thresholds": [0.2, 0.45, 0.7]
+                },
+                "factions": {
+                    "contest_rate": 0.1,
+                    "diffusion_rate": 0.02,
+                    "border_contest": 2.0
+                },
+                "dormancy": {
+                    "enabled": True,
+                    "delay": 60.0,
+                    "max_step": 60.0
+                },
+                "fast_forward_step": 300.0,
+                "fast_forward_weather_step": 100.0,
+                "resource_regeneration_rate": 0.1,
+                "resource_capacity": 256,
+                "resource_cell_size": 50.0
             },
             "quests": {
                 "max_active_quests": 10,
@@ -56,6 +112,7 @@ class Config:
                 "influence_decay_rate": 0.1
             },
             "performance": {
+                "max_catch_up_ticks": 5,
                 "threading": {
                     "enabled": True,
                     "max_threads": 4
@@ -0,0 +1,92 @@
+"""
+Flux aléatoires reproductibles pour la simulation ENA
+"""
+from typing import Dict, Iterable, Optional
+import hashlib
+import zlib
+import numpy as np
+
+_MASK = (1 << 64) - 1
+_GOLDEN = 0x9E3779B97F4A7C15
+
+def _mix(x: np.ndarray) -> np.ndarray:
+    """Finaliseur SplitMix64, appliqué élément par élément (uint64, modulo 2**64)."""
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+def _mix_int(x: int) -> int:
+    """Version entière (Python) de _mix."""
+    x &= _MASK
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK
+    return x ^ (x >> 31)
+
+def entity_key(entity_id: str) -> int:
+    """Clé 64 bits stable d'une entité (PNJ, région...), indépendante de la session."""
+    return int.from_bytes(hashlib.blake2b(str(entity_id).encode("utf-8"), digest_size=8).digest(), "little")
+
+class SimulationRNG:
+    """Tirages aléatoires reproductibles, initialisés par une graine.
+
+    Les tirages par entité sont calculés (et non consommés) à partir de
+    (graine, flux, clé de l'entité, tick, colonne) : le flux d'un PNJ ou
+    d'une région ne dépend ni des autres entités, ni de la taille des
+    tableaux, ni des ticks où le flux n'a pas été lu. Le calcul est
+    vectorisé sur les clés des entités.
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        self._root = np.random.SeedSequence(seed)
+        # Graine effective, à journaliser pour rejouer une session
+        self.seed = self._root.entropy
+        low, high = self._root.generate_state(2, np.uint64).tolist()
+        self._key = _mix_int(low ^ _mix_int(high))
+        self.tick = 0
+        self._generators: Dict[str, np.random.Generator] = {}
+        self._streams: Dict[str, int] = {}
+
+    def generator(self, name: str) -> np.random.Generator:
+        """Retourne un générateur séquentiel associé à un nom de flux."""
+        generator = self._generators.get(name)
+        if generator is None:
+            sequence = np.random.SeedSequence(
+                self._root.entropy,
+                spawn_key=(zlib.crc32(name.encode("utf-8")),)
+            )
+            generator = np.random.Generator(np.random.PCG64(sequence))
+            self._generators[name] = generator
+        return generator
+
+    @staticmethod
+    def entity_keys(entity_ids: Iterable[str]) -> np.ndarray:
+        """Clés (uint64) d'une suite d'entités, à conserver par emplacement."""
+        return np.array([entity_key(entity_id) for entity_id in entity_ids], dtype=np.uint64)
+
+    def begin_tick(self) -> None:
+        """Passe au tick suivant (nouveaux tirages pour toutes les entités)."""
+        self.tick += 1
+
+    def uniform(self, name: str, keys: np.ndarray, width: int = 1) -> np.ndarray:
+        """Tirages uniformes dans [0, 1) du tick courant, une ligne par clé d'entité."""
+        return self._uniform(f"uniform:{name}", keys, width)
+
+    def normal(self, name: str, keys: np.ndarray, width: int = 1) -> np.ndarray:
+        """Tirages normaux centrés réduits du tick courant, une ligne par clé (Box-Muller)."""
+        draws = self._uniform(f"normal:{name}", keys, 2 * width)
+        radius = np.sqrt(-2.0 * np.log1p(-draws[:, :width]))
+        return radius * np.cos(2.0 * np.pi * draws[:, width:])
+
+    def _uniform(self, stream: str, keys: np.ndarray, width: int) -> np.ndarray:
+        """Hachage de (graine, flux, clé, tick, colonne) ramené à [0, 1)."""
+        salt = self._streams.get(stream)
+        if salt is None:
+            salt = _mix_int(self._key ^ entity_key(stream))
+            self._streams[stream] = salt
+        counter = _mix_int(salt + self.tick * _GOLDEN)
+
+        keys = np.asarray(keys, dtype=np.uint64).reshape(-1, 1)
+        columns = (np.arange(1, width + 1, dtype=np.uint64) * np.uint64(_GOLDEN)).reshape(1, -1)
+        bits = _mix(_mix(keys ^ np.uint64(counter)) + columns)
+        # 53 bits de poids fort : flottant uniforme exact dans [0, 1)
+        return (bits >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))
@@ -0,0 +1,112 @@
+"""
+Allocateurs de tableaux NumPy (mémoire locale ou partagée entre processus)
+"""
+from typing import Any, Dict, List, Tuple
+from multiprocessing import resource_tracker, shared_memory
+import threading
+import numpy as np
+
+# Descripteur transmis aux processus : (nom du segment, forme, dtype)
+ArrayDescriptor = Tuple[str, Tuple[int, ...], str]
+
+_REGISTER_LOCK = threading.Lock()
+
+class LocalArrays:
+    """Allocateur par défaut : tableaux NumPy ordinaires."""
+
+    shared = False
+
+    def full(self, key: str, shape: Tuple[int, ...], dtype: Any, fill: Any) -> np.ndarray:
+        """Alloue un tableau rempli d'une valeur."""
+        return np.full(shape, fill, dtype=dtype)
+
+    def close(self) -> None:
+        """Rien à libérer pour des tableaux locaux."""
+
+class SharedArrays:
+    """Allocateur de tableaux dans des segments multiprocessing.shared_memory.
+
+    Les processus de calcul s'attachent aux segments par leur nom : aucune
+    donnée d'état n'est sérialisée d'un tick à l'autre.
+    """
+
+    shared = True
+
+    def __init__(self):
+        self.blocks: Dict[str, Tuple[shared_memory.SharedMemory, np.ndarray]] = {}
+        # Segments remplacés lors d'un agrandissement, fermés à la fin
+        self._retired: List[shared_memory.SharedMemory] = []
+        # Segments encore référencés par des vues NumPy après close()
+        self._exported: List[shared_memory.SharedMemory] = []
+
+    def full(self, key: str, shape: Tuple[int, ...], dtype: Any, fill: Any) -> np.ndarray:
+        """Alloue (ou remplace) le tableau partagé associé à une clé."""
+        dtype = np.dtype(dtype)
+        size = max(1, int(np.prod(shape)) * dtype.itemsize)
+        block = shared_memory.SharedMemory(create=True, size=size)
+        array = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        array.fill(fill)
+
+        previous = self.blocks.get(key)
+        if previous is not None:
+            # Plus aucun processus ne doit s'y attacher
+            previous[0].unlink()
+            self._retired.append(previous[0])
+        self.blocks[key] = (block, array)
+        return array
+
+    def descriptor(self, key: str) -> ArrayDescriptor:
+        """Descripteur permettant à un autre processus de s'attacher au tableau."""
+        block, array = self.blocks[key]
+        return (block.name, array.shape, array.dtype.str)
+
+    def descriptors(self) -> Dict[str, ArrayDescriptor]:
+        """Descripteurs de tous les tableaux courants."""
+        return {key: self.descriptor(key) for key in self.blocks}
+
+    def close(self) -> None:
+        """Libère tous les segments."""
+        for block, _ in self.blocks.values():
+            try:
+                block.unlink()
+            except FileNotFoundError:
+                pass
+        segments = [block for block, _ in self.blocks.values()] + self._retired
+        self.blocks.clear()
+        self._retired.clear()
+        for block in segments:
+            try:
+                block.close()
+            except BufferError:
+                # Des vues NumPy existent encore : le segment sera libéré avec elles
+                self._exported.append(block)
+
+def attach(descriptor: ArrayDescriptor) -> Tuple[shared_memory.SharedMemory, np.ndarray]:
+    """S'attache à un tableau partagé depuis un autre processus."""
+    name, shape, dtype = descriptor
+    block = open_segment(name)
+    return block, np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+
+def open_segment(name: str) -> shared_memory.SharedMemory:
+    """Ouvre un segment existant sans le confier au resource_tracker.
+
+    Le créateur reste seul responsable de la libération. Avant Python 3.13
+    (pas de track=False), l'ouverture enregistre le segment auprès du
+    resource_tracker du processus, qui le signale comme fuite et le supprime
+    à la sortie : l'enregistrement est donc neutralisé pendant l'ouverture.
+    Le désenregistrer après coup ne convient pas : un processus fils partage
+    le suivi de son parent, et retirerait l'entrée du créateur.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        pass
+    with _REGISTER_LOCK:
+        register = resource_tracker.register
+        resource_tracker.register = lambda resource, rtype: (
+            None if rtype == "shared_memory" else register(resource, rtype)
+        )
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
@@ -0,0 +1,189 @@
+"""
+Index spatial partagé (grille uniforme) pour ENA
+"""
+from typing import Any, Dict, Hashable, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+import heapq
+import math
+import numpy as np
+
+Position = Union[Sequence[float], Mapping[str, float]]
+Cell = Tuple[int, int, int]
+
+def to_point(position: Position) -> Tuple[float, float, float]:
+    """Convertit une position ({'x','y','z'} ou séquence) en tuple (x, y, z)."""
+    if isinstance(position, Mapping):
+        return (position.get('x', 0), position.get('y', 0), position.get('z', 0))
+    x, y, z = (tuple(position) + (0, 0, 0))[:3]
+    return (x, y, z)
+
+class SpatialHash:
+    """Table de hachage spatiale sur une grille uniforme de cellules cubiques.
+
+    Les mises à jour sont incrémentales (move ne touche les cellules que si
+    l'entité change de cellule). Les requêtes par rayon ne parcourent que les
+    cellules voisines. L'ordre des résultats est déterministe mais suit les
+    cellules : trier les clés si l'ordre d'origine compte.
+    """
+
+    def __init__(self, cell_size: float = 50.0):
+        if cell_size <= 0:
+            raise ValueError(f"Taille de cellule invalide: {cell_size}")
+        self.cell_size = float(cell_size)
+        self.cells: Dict[Cell, Dict[Hashable, None]] = {}
+        self.positions: Dict[Hashable, Tuple[float, float, float]] = {}
+        self._cell_of: Dict[Hashable, Cell] = {}
+
+    @classmethod
+    def from_points(cls, positions: Iterable[Position], cell_size: float = 50.0) -> "SpatialHash":
+        """Construit un index dont les clés sont les indices des positions."""
+        index = cls(cell_size)
+        for key, position in enumerate(positions):
+            index.insert(key, position)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.positions
+
+    def insert(self, key: Hashable, position: Position) -> None:
+        """Ajoute (ou déplace) une entité."""
+        if key in self.positions:
+            self.move(key, position)
+            return
+
+        point = to_point(position)
+        cell = self._cell(point)
+        self.positions[key] = point
+        self._cell_of[key] = cell
+        self.cells.setdefault(cell, {})[key] = None
+
+    def move(self, key: Hashable, position: Position) -> None:
+        """Met à jour la position d'une entité."""
+        if key not in self.positions:
+            self.insert(key, position)
+            return
+
+        point = to_point(position)
+        self.positions[key] = point
+        cell = self._cell(point)
+        old_cell = self._cell_of[key]
+        if cell != old_cell:
+            self._discard(old_cell, key)
+            self._cell_of[key] = cell
+            self.cells.setdefault(cell, {})[key] = None
+
+    def remove(self, key: Hashable) -> None:
+        """Retire une entité."""
+        if key in self.positions:
+            del self.positions[key]
+            self._discard(self._cell_of.pop(key), key)
+
+    def clear(self) -> None:
+        """Vide l'index."""
+        self.cells.clear()
+        self.positions.clear()
+        self._cell_of.clear()
+
+    def candidates(self, center: Position, radius: float) -> List[Hashable]:
+        """Entités des cellules recouvrant la sphère (sur-ensemble du résultat)."""
+        point = to_point(center)
+        low = self._cell((point[0] - radius, point[1] - radius, point[2] - radius))
+        high = self._cell((point[0] + radius, point[1] + radius, point[2] + radius))
+        span = (high[0] - low[0] + 1) * (high[1] - low[1] + 1) * (high[2] - low[2] + 1)
+
+        result = []
+        if span > len(self.cells):
+            # Grand rayon : parcourir les cellules occupées est moins coûteux
+            for cell, members in self.cells.items():
+                if all(low[i] <= cell[i] <= high[i] for i in range(3)):
+                    result.extend(members)
+        else:
+            for cx in range(low[0], high[0] + 1):
+                for cy in range(low[1], high[1] + 1):
+                    for cz in range(low[2], high[2] + 1):
+                        members = self.cells.get((cx, cy, cz))
+                        if members:
+                            result.extend(members)
+        return result
+
+    def query_radius(self, center: Position, radius: float) -> List[Hashable]:
+        """Entités à une distance <= radius du centre."""
+        point = to_point(center)
+        limit = radius * radius
+        positions = self.positions
+        result = []
+        for key in self.candidates(point, radius):
+            other = positions[key]
+            dx = other[0] - point[0]
+            dy = other[1] - point[1]
+            dz = other[2] - point[2]
+            if dx * dx + dy * dy + dz * dz <= limit:
+                result.append(key)
+        return result
+
+    def query_knn(self, center: Position, k: int,
+                  max_radius: Optional[float] = None) -> List[Tuple[Hashable, float]]:
+        """Les k entités les plus proches, triées par distance croissante."""
+        if k <= 0 or not self.positions:
+            return []
+
+        point = to_point(center)
+        radius = self.cell_size
+        while True:
+            search = radius if max_radius is None else min(radius, max_radius)
+            found = [
+                (math.dist(point, self.positions[key]), key)
+                for key in self.query_radius(point, search)
+            ]
+            exhausted = len(found) == len(self.positions)
+            if len(found) >= k or exhausted or (max_radius is not None and search >= max_radius):
+                nearest = heapq.nsmallest(k, found, key=lambda item: item[0])
+                return [(key, distance) for distance, key in nearest]
+            radius *= 2
+
+    def query_radius_batch(self, centers: Sequence[Position], radius: float) -> List[List[Hashable]]:
+        """Requêtes par rayon pour plusieurs centres.
+
+        Les centres d'une même cellule partagent l'ensemble des candidats et
+        leurs distances sont calculées en une seule opération vectorielle.
+        """
+        points = np.array([to_point(center) for center in centers], dtype=np.float64).reshape(-1, 3)
+        results: List[List[Hashable]] = [[] for _ in range(len(points))]
+        groups: Dict[Cell, List[int]] = {}
+        for i, point in enumerate(points):
+            groups.setdefault(self._cell(point), []).append(i)
+
+        limit = radius * radius
+        for cell, indices in groups.items():
+            # Les candidats de la cellule couvrent tous ses centres
+            cell_center = [(c + 0.5) * self.cell_size for c in cell]
+            reach = radius + self.cell_size * math.sqrt(3) / 2
+            keys = self.candidates(cell_center, reach)
+            if not keys:
+                continue
+
+            others = np.array([self.positions[key] for key in keys], dtype=np.float64)
+            offsets = others[None, :, :] - points[indices][:, None, :]
+            inside = np.einsum("qnk,qnk->qn", offsets, offsets) <= limit
+            for row, i in enumerate(indices):
+                results[i] = [keys[j] for j in np.flatnonzero(inside[row])]
+        return results
+
+    def _cell(self, point: Sequence[float]) -> Cell:
+        """Cellule contenant un point."""
+        size = self.cell_size
+        return (
+            int(math.floor(point[0] / size)),
+            int(math.floor(point[1] / size)),
+            int(math.floor(point[2] / size))
+        )
+
+    def _discard(self, cell: Cell, key: Hashable) -> None:
+        """Retire une clé d'une cellule, et la cellule si elle devient vide."""
+        members = self.cells.get(cell)
+        if members is not None:
+            members.pop(key, None)
+            if not members:
+                del self.cells[cell]
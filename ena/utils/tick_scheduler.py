@@ -0,0 +1,132 @@
+"""
+Ordonnanceur à pas de temps fixe et fréquences multiples pour ENA
+"""
+from typing import Callable, Dict, List, Optional
+import time
+from .logger import Logger
+
+class ScheduledTask:
+    """Tâche exécutée à intervalle fixe."""
+
+    def __init__(self, name: str, callback: Callable[[float], None], interval: float,
+                 next_deadline: float, max_catch_up: int):
+        self.name = name
+        self.callback = callback
+        self.interval = interval
+        self.next_deadline = next_deadline
+        self.max_catch_up = max_catch_up
+        self.ticks = 0
+        self.dropped_ticks = 0
+
+class TickScheduler:
+    """Exécute chaque gestionnaire à sa propre fréquence, avec un pas fixe.
+
+    Les échéances sont absolues (départ + k × intervalle) : les retards ne
+    s'accumulent pas. Une tâche en retard rattrape au plus max_catch_up pas
+    par passage, le reste est abandonné pour éviter la spirale de rattrapage.
+    Entre deux échéances, le fil dort jusqu'à la suivante au lieu de boucler.
+    """
+
+    def __init__(self, max_catch_up: int = 5,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.logger = Logger("TickScheduler")
+        self.max_catch_up = max(1, int(max_catch_up))
+        self.clock = clock
+        self.sleep = sleep
+        self.tasks: Dict[str, ScheduledTask] = {}
+        self._running = False
+
+    def add_task(self, name: str, callback: Callable[[float], None], interval: float,
+                 max_catch_up: Optional[int] = None) -> ScheduledTask:
+        """Ajoute une tâche appelée avec delta_time = interval."""
+        if interval <= 0:
+            raise ValueError(f"Intervalle invalide pour la tâche {name}: {interval}")
+
+        task = ScheduledTask(
+            name,
+            callback,
+            float(interval),
+            self.clock() + interval,
+            max(1, int(max_catch_up or self.max_catch_up))
+        )
+        self.tasks[name] = task
+        return task
+
+    def remove_task(self, name: str) -> None:
+        """Retire une tâche."""
+        self.tasks.pop(name, None)
+
+    def next_deadline(self) -> Optional[float]:
+        """Retourne la prochaine échéance, toutes tâches confondues."""
+        if not self.tasks:
+            return None
+        return min(task.next_deadline for task in self.tasks.values())
+
+    def run_pending(self) -> int:
+        """Exécute les pas dus, dans l'ordre des échéances. Retourne leur nombre."""
+        now = self.clock()
+        executed = 0
+        steps: Dict[str, int] = {}
+
+        while True:
+            due = [
+                task for task in self.tasks.values()
+                if task.next_deadline <= now and steps.get(task.name, 0) < task.max_catch_up
+            ]
+            if not due:
+                break
+
+            task = min(due, key=lambda t: t.next_deadline)
+            try:
+                task.callback(task.interval)
+            except Exception as e:
+                self.logger.error(f"Erreur dans la tâche {task.name}: {str(e)}")
+            task.next_deadline += task.interval
+            task.ticks += 1
+            steps[task.name] = steps.get(task.name, 0) + 1
+            executed += 1
+
+        # Abandon du retard restant au-delà de la limite de rattrapage
+        for task in self.tasks.values():
+            if task.next_deadline <= now:
+                behind = int((now - task.next_deadline) // task.interval) + 1
+                task.next_deadline += behind * task.interval
+                task.dropped_ticks += behind
+                self.logger.warning(f"Tâche {task.name} en retard: {behind} pas abandonnés")
+
+        return executed
+
+    def sleep_until_next(self) -> None:
+        """Dort jusqu'à la prochaine échéance."""
+        deadline = self.next_deadline()
+        if deadline is None:
+            return
+
+        remaining = deadline - self.clock()
+        if remaining > 0:
+            self.sleep(remaining)
+
+    def run(self) -> None:
+        """Boucle principale, jusqu'à l'appel de stop()."""
+        self._running = True
+        while self._running:
+            self.run_pending()
+            if self._running:
+                self.sleep_until_next()
+
+    def stop(self) -> None:
+        """Arrête la boucle principale."""
+        self._running = False
+
+    def get_stats(self) -> List[Dict[str, float]]:
+        """Statistiques d'exécution par tâche."""
+        return [
+            {
+                "name": task.name,
+                "interval": task.interval,
+                "ticks": task.ticks,
+                "dropped_ticks": task.dropped_ticks
+            }
+            for task in self.tasks.values()
+        ]
@@ -78,7 +78,22 @@ class AnimalBehavior:
     def _detect_threats(self, world_state: Dict) -> List[Dict]:
         """Détecte les menaces dans l'environnement"""
         threats = []
-        for entity in world_state.get("entities", []):
+        entities = world_state.get("entities", [])
+        
+        # Avec une portée de détection et l'index spatial partagé des entités
+        # (clés = indices dans entities), seules les entités proches sont examinées
+        detection_range = self.species_config.get("detection_range")
+        entity_index = world_state.get("entity_index")
+        if detection_range is not None and entity_index is not None:
+            nearby = sorted(entity_index.query_radius(self.state.position, detection_range))
+            entities = [entities[i] for i in nearby]
+        elif detection_range is not None:
+            entities = [
+                entity for entity in entities
+                if self._calculate_distance(self.state.position, entity["position"]) <= detection_range
+            ]
+            
+        for entity in entities:
             if self._is_threat(entity):
                 threat = {
                     "type": entity["type"],
@@ -13,6 +13,9 @@ import random
 from datetime import datetime, time
 import math
 from pathlib import Path
+import numpy as np
+from ena.core.lod_scheduler import LODScheduler
+from ena.utils.spatial_index import SpatialHash
 
 # États et types énumérés
 class NPCStateType(Enum):
@@ -44,6 +47,49 @@ class RelationType(Enum):
     RIVAL = auto()
 
 # Classes de données principales
+class TrackedPosition(dict):
+    """Position {'x','y','z'} qui signale ses modifications à son PNJ"""
+    __slots__ = ("_owner",)
+    
+    def __init__(self, owner: "NPCState", position: Dict[str, float]):
+        super().__init__(position)
+        self._owner = owner
+        
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._owner._position_changed()
+        
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._owner._position_changed()
+        
+    def __ior__(self, other):
+        self.update(other)
+        return self
+        
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._owner._position_changed()
+        
+    def setdefault(self, key, default=None):
+        value = super().setdefault(key, default)
+        self._owner._position_changed()
+        return value
+        
+    def pop(self, *args):
+        value = super().pop(*args)
+        self._owner._position_changed()
+        return value
+        
+    def popitem(self):
+        item = super().popitem()
+        self._owner._position_changed()
+        return item
+        
+    def clear(self):
+        super().clear()
+        self._owner._position_changed()
+
 @dataclass
 class NPCState:
     """État complet d'un PNJ"""
@@ -63,6 +109,20 @@ class NPCState:
     daily_schedule: Dict[str, Any] = field(default_factory=dict)
     memory: List[Dict[str, Any]] = field(default_factory=list)
     
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name == 'position':
+            # Toute écriture de position (remplacement ou modification sur place) est signalée
+            object.__setattr__(self, name, TrackedPosition(self, value))
+            self._position_changed()
+            return
+        object.__setattr__(self, name, value)
+        
+    def _position_changed(self) -> None:
+        """Prévient le système qui indexe ce PNJ (s'il y en a un)"""
+        watcher = self.__dict__.get('_watcher')
+        if watcher is not None:
+            watcher(self.id)
+    
     def __post_init__(self):
         if not self.emotional_state:
             self.emotional_state = {
@@ -121,6 +181,23 @@ class UnifiedNPCSystem:
         self.crafting_queue = []
         self.dialogue_history = {}
         
+        # Niveaux de détail : emplacement LOD par PNJ, réutilisé après retrait
+        self.lod = LODScheduler(64)
+        self.lod_slots: Dict[str, int] = {}
+        self._lod_free: List[int] = []
+        
+        # Index des menaces, construit une fois par mise à jour globale
+        self._threat_index: Optional[Tuple[List[Dict[str, Any]], SpatialHash]] = None
+        
+        # Grille des positions des PNJ (alliés proches) ; les PNJ signalent leurs
+        # écritures de position, seules celles-ci sont reportées à la requête.
+        # Rang de chaque PNJ dans self.npcs pour conserver l'ordre du parcours
+        self._npc_grid = SpatialHash(50.0)
+        self._npc_order: Dict[str, int] = {}
+        self._npc_next_rank = 0
+        self._npc_moved: set = set()
+        self._npc_grid_valid = False
+        
     # Gestion des PNJ
     def create_npc(self, npc_data: Dict[str, Any]) -> str:
         """Crée un nouveau PNJ avec les données spécifiées"""
@@ -133,8 +210,25 @@ class UnifiedNPCSystem:
             personality_traits=npc_data.get('personality_traits', {})
         )
         self.npcs[npc_id] = npc_state
+        self._watch_npc(npc_state)
         return npc_id
 
+    def set_npc_position(self, npc_id: str, position: Dict[str, float]) -> None:
+        """Déplace un PNJ"""
+        npc = self.npcs.get(npc_id)
+        if npc is None:
+            self.logger.warning(f"NPC {npc_id} non trouvé")
+            return
+        npc.position = position
+
+    def remove_npc(self, npc_id: str) -> bool:
+        """Retire un PNJ et libère son emplacement LOD"""
+        if self.npcs.pop(npc_id, None) is None:
+            return False
+        self._release_lod_slot(npc_id)
+        self._npc_moved.add(npc_id)
+        return True
+
     def update_npc(self, npc_id: str, game_state: Dict[str, Any]) -> None:
         """Met à jour l'état d'un PNJ"""
         if npc_id not in self.npcs:
@@ -243,8 +337,13 @@ class UnifiedNPCSystem:
         """Calcule le niveau de danger pour un PNJ"""
         danger_level = 0.0
         
-        # Menaces directes
-        for threat in game_state.get('threats', []):
+        # Menaces directes (seules les menaces à moins de 100 comptent)
+        threats = game_state.get('threats', [])
+        if self._threat_index is not None and self._threat_index[0] is threats:
+            nearby = sorted(self._threat_index[1].candidates(self._position_tuple(npc.position), 100))
+            threats = [threats[i] for i in nearby]
+            
+        for threat in threats:
             distance = self._calculate_distance(npc.position, threat.get('position', {}))
             threat_level = threat.get('level', 0.0)
             if distance < 100:  # Distance arbitraire
@@ -265,16 +364,70 @@ class UnifiedNPCSystem:
         )
 
     def _get_nearby_allies(self, npc: NPCState, game_state: Dict[str, Any]) -> List[str]:
-        """Trouve les alliés proches du PNJ"""
+        """Trouve les alliés proches du PNJ (dans l'ordre de self.npcs)"""
+        self._refresh_npc_grid()
+            
+        # Seuls les PNJ des cellules voisines sont examinés
+        candidates = self._npc_grid.candidates(self._position_tuple(npc.position), 50)
+        candidates.sort(key=self._npc_order.__getitem__)
+        
         nearby_allies = []
-        for other_id, other_npc in self.npcs.items():
-            if other_id != npc.id:
-                distance = self._calculate_distance(npc.position, other_npc.position)
+        for other_id in candidates:
+            other = self.npcs.get(other_id)
+            if other is not None and other_id != npc.id:
+                distance = self._calculate_distance(npc.position, other.position)
                 relation = npc.relationships.get(other_id, 0.0)
                 if distance < 50 and relation > 0.5:  # Valeurs arbitraires
                     nearby_allies.append(other_id)
         return nearby_allies
 
+    def _watch_npc(self, npc: NPCState) -> None:
+        """Abonne la grille aux écritures de position d'un PNJ"""
+        object.__setattr__(npc, '_watcher', self._npc_moved.add)
+        self._npc_moved.add(npc.id)
+
+    def _refresh_npc_grid(self) -> None:
+        """Reporte dans la grille les seuls PNJ ajoutés, déplacés ou retirés"""
+        if not self._npc_grid_valid:
+            self._sync_npc_grid()
+            return
+        if self._npc_moved:
+            grid = self._npc_grid
+            for npc_id in self._npc_moved:
+                npc = self.npcs.get(npc_id)
+                if npc is not None:
+                    if npc_id not in self._npc_order:
+                        self._npc_order[npc_id] = self._npc_next_rank
+                        self._npc_next_rank += 1
+                    grid.insert(npc_id, self._position_tuple(npc.position))
+                elif npc_id in grid:
+                    grid.remove(npc_id)
+                    self._npc_order.pop(npc_id, None)
+            self._npc_moved.clear()
+        if len(self._npc_order) != len(self.npcs):
+            # PNJ ajoutés ou retirés directement dans self.npcs
+            self._sync_npc_grid()
+
+    def _sync_npc_grid(self) -> None:
+        """Reconstruit l'ordre des PNJ et reporte toutes les positions dans la grille"""
+        grid = self._npc_grid
+        indexed = grid.positions
+        order = {}
+        for rank, (npc_id, npc) in enumerate(self.npcs.items()):
+            order[npc_id] = rank
+            if npc.__dict__.get('_watcher') is None:
+                self._watch_npc(npc)
+            point = self._position_tuple(npc.position)
+            if indexed.get(npc_id) != point:
+                grid.insert(npc_id, point)
+        if len(indexed) > len(order):
+            for npc_id in [npc_id for npc_id in indexed if npc_id not in order]:
+                grid.remove(npc_id)
+        self._npc_order = order
+        self._npc_next_rank = len(order)
+        self._npc_moved.clear()
+        self._npc_grid_valid = True
+
     def _calculate_interaction_impact(self, interaction: Dict[str, Any]) -> float:
         """Calcule l'impact d'une interaction sur la relation"""
         impact_map = {
@@ -322,9 +475,77 @@ class UnifiedNPCSystem:
         """Met à jour l'état global du monde"""
         self.global_state.update(new_state)
         
-        # Mise à jour de tous les PNJ affectés
-        for npc in self.npcs.values():
-            self.update_npc(npc.id, new_state)
+        # Index partagé des menaces pour tous les PNJ de ce tick
+        threats = new_state.get('threats')
+        if threats:
+            self._threat_index = (threats, SpatialHash.from_points(
+                (threat.get('position', {}) for threat in threats), cell_size=100.0
+            ))
+        
+        try:
+            # Mise à jour de tous les PNJ affectés (selon leur palier LOD)
+            for npc, game_state in self._npcs_due(new_state):
+                self.update_npc(npc.id, game_state)
+        finally:
+            self._threat_index = None
+
+    def _npcs_due(self, new_state: Dict[str, Any]) -> List[Tuple[NPCState, Dict[str, Any]]]:
+        """Sélectionne les PNJ à mettre à jour ce tick selon leur distance aux observateurs"""
+        observers = new_state.get('observers')
+        if observers is None and 'player_position' in new_state:
+            observers = [new_state['player_position']]
+        if not observers:
+            return [(npc, new_state) for npc in self.npcs.values()]
+            
+        # PNJ retirés directement de self.npcs (ou état rechargé)
+        for npc_id in [npc_id for npc_id in self.lod_slots if npc_id not in self.npcs]:
+            self._release_lod_slot(npc_id)
+            
+        npcs = list(self.npcs.values())
+        slots = np.array([self._lod_slot(npc.id) for npc in npcs], dtype=np.intp)
+        positions = np.array([self._position_tuple(npc.position) for npc in npcs], dtype=np.float64)
+        
+        # Donneurs de quête et combattants restent à pleine fréquence
+        self.lod.important[slots] = [
+            npc.current_quest is not None or npc.state_type in (NPCStateType.COMBAT, NPCStateType.FLEEING)
+            for npc in npcs
+        ]
+        self.lod.set_observers([self._position_tuple(position) for position in observers])
+        due, elapsed, _ = self.lod.schedule(slots, positions.reshape(-1, 3), new_state.get('delta_time', 0.0))
+        
+        by_slot = {slot: npc for slot, npc in zip(slots.tolist(), npcs)}
+        result = []
+        for slot, npc_delta in zip(due.tolist(), elapsed.tolist()):
+            game_state = new_state
+            if 'delta_time' in new_state:
+                game_state = dict(new_state, delta_time=npc_delta)
+            result.append((by_slot[slot], game_state))
+        return result
+
+    def _lod_slot(self, npc_id: str) -> int:
+        """Retourne l'emplacement LOD d'un PNJ"""
+        slot = self.lod_slots.get(npc_id)
+        if slot is None:
+            if self._lod_free:
+                slot = self._lod_free.pop()
+                self.lod.reset(slot)
+            else:
+                slot = len(self.lod_slots)
+                if slot >= self.lod.capacity:
+                    self.lod.ensure_capacity(max(2 * self.lod.capacity, slot + 1))
+            self.lod_slots[npc_id] = slot
+        return slot
+
+    def _release_lod_slot(self, npc_id: str) -> None:
+        """Rend l'emplacement LOD d'un PNJ retiré"""
+        slot = self.lod_slots.pop(npc_id, None)
+        if slot is not None:
+            self._lod_free.append(slot)
+
+    @staticmethod
+    def _position_tuple(position: Dict[str, float]) -> Tuple[float, float, float]:
+        """Convertit une position {'x','y','z'} en tuple"""
+        return (position.get('x', 0), position.get('y', 0), position.get('z', 0))
 
     def save_state(self, filepath: str) -> None:
         """Sauvegarde l'état du système"""
@@ -351,6 +572,7 @@ class UnifiedNPCSystem:
             
         self.npcs = {npc_id: self._deserialize_npc(npc_data) 
                     for npc_id, npc_data in state['npcs'].items()}
+        self._npc_grid_valid = False
         self.quests = state['quests']
         self.factions = state['factions']
         self.global_state = state['global_state']
@@ -11,6 +11,7 @@ import json
 import math
 from datetime import datetime
 from pathlib import Path
+from ena.utils.spatial_index import SpatialHash
 
 # États et Objectifs du Joueur
 class PlayerState(Enum):
@@ -71,6 +72,7 @@ class PlayerAutonomousSystem:
             'exploration': 0.4
         }
         self.action_cooldowns = {}
+        self.threat_index: Optional[SpatialHash] = None
         self.behavioral_profile = {
             'aggression': 0.5,
             'caution': 0.7,
@@ -108,6 +110,12 @@ class PlayerAutonomousSystem:
         self.context.radiation = game_state.get('radiation', self.context.radiation)
         self.context.position = game_state.get('position', self.context.position)
         self.context.nearby_threats = game_state.get('threats', [])
+        # Index partagé fourni par le jeu, sinon construit sur les menaces du tick
+        self.threat_index = game_state.get('threat_index')
+        if self.threat_index is None:
+            self.threat_index = SpatialHash.from_points(
+                threat.get('position', {}) for threat in self.context.nearby_threats
+            )
         
         if 'inventory' in game_state:
             self.context.inventory = game_state['inventory']
@@ -124,7 +132,13 @@ class PlayerAutonomousSystem:
         """Évalue le niveau de menace actuel"""
         threat_level = 0.0
         
-        for threat in self.context.nearby_threats:
+        # Seules les menaces à moins de 50 comptent
+        threats = self.context.nearby_threats
+        if self.threat_index is not None:
+            nearby = sorted(self.threat_index.candidates(self.context.position, 50))
+            threats = [threats[i] for i in nearby if i < len(threats)]
+            
+        for threat in threats:
             distance = self._calculate_distance(self.context.position, threat.get('position', {}))
             threat_value = threat.get('danger_level', 0.5)
             if distance < 50:
@@ -0,0 +1,394 @@
+"""
+Tests pour le gestionnaire d'IA d'ENA
+"""
+
+import pytest
+import numpy as np
+from ena.utils.config import Config
+from ena.core.ai_manager import AIManager
+from ena.core.lod_scheduler import LODScheduler
+
+def make_config(tmp_path, **overrides):
+    """Crée une configuration par défaut, sans fichier utilisateur"""
+    config = Config(str(tmp_path / "ena_config.json"))
+    for key, value in overrides.items():
+        config.set(key.replace("__", "."), value)
+    return config
+
+@pytest.fixture
+def columnar_manager(tmp_path):
+    return AIManager(make_config(tmp_path, ai__state_backend="columnar", ai__max_npcs=8))
+
+def test_columnar_register_and_views(columnar_manager):
+    """Teste l'enregistrement d'un PNJ dans le store colonnaire"""
+    manager = columnar_manager
+    assert manager.register_npc("npc_1", {"max_health": 80, "spawn_position": [1, 2, 3]})
+
+    slot = manager.store.slot("npc_1")
+    state = manager.get_npc_state("npc_1")
+    assert manager.states["npc_1"]["health"] == 80.0
+    assert list(manager.states["npc_1"]["position"]) == [1.0, 2.0, 3.0]
+    assert manager.states["npc_1"]["faction"] == "neutral"
+
+    # Les écritures passent par les tableaux
+    manager.states["npc_1"]["stamina"] = 42
+    manager.emotions["npc_1"]["fear"] = 0.7
+    assert manager.store.stamina[slot] == 42.0
+    assert state["emotions"]["fear"] == pytest.approx(0.7)
+
+def test_columnar_update_matches_dict_backend(tmp_path):
+    """Le backend colonnaire donne le même état que le backend dictionnaire"""
+    dict_manager = AIManager(make_config(tmp_path))
+    columnar_manager = AIManager(make_config(tmp_path, ai__state_backend="columnar"))
+
+    for manager in (dict_manager, columnar_manager):
+        for i, health in enumerate([10, 55, 99.95, 150]):
+            manager.register_npc(f"npc_{i}", {"max_health": health, "max_stamina": health / 2})
+        for _ in range(3):
+            manager.update(0.1)
+
+    for npc_id in dict_manager.npcs:
+        expected = dict_manager.states[npc_id]
+        actual = columnar_manager.states[npc_id]
+        assert actual["health"] == pytest.approx(expected["health"])
+        assert actual["stamina"] == pytest.approx(expected["stamina"])
+
+def test_store_capacity_and_slot_reuse(columnar_manager):
+    """Teste la limite de capacité et la réutilisation des emplacements"""
+    manager = columnar_manager
+    for i in range(8):
+        assert manager.register_npc(f"npc_{i}", {})
+    assert not manager.register_npc("npc_extra", {})
+
+    slot = manager.store.slot("npc_3")
+    assert manager.unregister_npc("npc_3")
+    assert manager.register_npc("npc_extra", {})
+    assert manager.store.slot("npc_extra") == slot
+    assert manager.states["npc_extra"]["health"] == 100.0
+    assert np.count_nonzero(manager.store.active) == 8
+
+def test_dict_backend_grows_past_max_npcs(tmp_path, monkeypatch):
+    """ai.max_npcs ne limite que le backend colonnaire ; un échec rend l'emplacement"""
+    manager = AIManager(make_config(tmp_path, ai__max_npcs=4))
+    for i in range(10):
+        assert manager.register_npc(f"npc_{i}", {"max_health": 20 if i == 9 else 100})
+    assert manager.store.capacity >= 10
+    manager.update(0.1)
+    assert manager.states["npc_9"]["health"] > 20
+
+    # Échec après l'allocation : aucun PNJ à moitié enregistré
+    def fail(slot, behaviors):
+        raise ValueError("comportements invalides")
+    monkeypatch.setattr(manager.scorer, "set_behaviors", fail)
+    assert not manager.register_npc("broken", {})
+    assert "broken" not in manager.npcs and "broken" not in manager.store
+    assert len(manager.store) == len(manager.npcs) == 10
+
+def test_batch_behavior_selection_matches_scalar(tmp_path):
+    """La sélection vectorisée donne les mêmes comportements que la version scalaire"""
+    manager = AIManager(make_config(tmp_path, ai__state_backend="columnar", ai__max_npcs=300))
+    rng = np.random.default_rng(7)
+    roles = ["civilian", "merchant", "guard"]
+
+    for i in range(300):
+        npc_id = f"npc_{i}"
+        manager.register_npc(npc_id, {"role": roles[i % 3]})
+        state = manager.states[npc_id]
+        state["health"] = float(rng.choice([10, 29.9, 30, 50, 50.1, 100]))
+        state["stamina"] = float(rng.choice([0, 30, 30.5, 100]))
+        state["target"] = "player" if rng.random() < 0.5 else None
+
+    # Comportements personnalisés dans un ordre différent des colonnes, avec égalités
+    manager.set_npc_behaviors("npc_0", {
+        "interact": {"weight": 1.0, "actions": []},
+        "idle": {"weight": 1.2, "actions": []}
+    })
+    manager.states["npc_0"]["target"] = "player"
+    manager.set_npc_behaviors("npc_1", {})
+    assert not manager.scorer.ordered
+
+    slots = manager.store.active_slots()
+    choices = manager._select_behaviors_batch(slots)
+    for slot, choice in zip(slots, choices):
+        npc_id = manager.store.ids[slot]
+        expected = manager._select_behavior(npc_id)
+        actual = manager.scorer.names[choice] if choice >= 0 else None
+        assert actual == expected, npc_id
+
+@pytest.mark.parametrize("backend", ["dict", "columnar"])
+def test_update_npc_priorities_match_scalar_multipliers(tmp_path, backend):
+    """update_npc note les comportements via le scorer, comme les multiplicateurs scalaires"""
+    manager = AIManager(make_config(tmp_path, ai__state_backend=backend, ai__max_npcs=90))
+    rng = np.random.default_rng(3)
+    roles = ["civilian", "merchant", "guard"]
+
+    for i in range(90):
+        npc_id = f"npc_{i}"
+        manager.register_npc(npc_id, {"role": roles[i % 3]})
+        state = manager.states[npc_id]
+        state["health"] = float(rng.choice([0, 10, 35.5, 100, 250]))
+        state["emotions"] = {"fear": float(rng.random()), "anger": float(rng.random())}
+        if rng.random() < 0.5:
+            state["threat_nearby"] = True
+    manager.set_npc_behaviors("npc_0", {"combat": {"weight": 0.7, "actions": []}})
+
+    for npc_id in manager.npcs:
+        state = manager.states[npc_id]
+        expected = {
+            name: data["weight"]
+            * manager._calculate_state_multiplier(state, name)
+            * manager._calculate_environment_multiplier(state, name)
+            * manager._calculate_emotion_multiplier(state, name)
+            for name, data in manager.behaviors[npc_id].items()
+        }
+        actual = manager._calculate_behavior_priorities(npc_id)
+        assert list(actual) == list(expected)
+        assert actual == expected
+
+def test_seeded_actions_are_reproducible_per_npc(tmp_path):
+    """Les tirages d'un PNJ ne dépendent que de la graine et de son identifiant"""
+    small = AIManager(make_config(tmp_path, simulation__seed=1234))
+    large = AIManager(make_config(tmp_path, simulation__seed=1234))
+    small.register_npc("npc_0", {})
+    for i in range(50):
+        large.register_npc(f"npc_{i}", {})
+
+    for manager in (small, large):
+        for _ in range(5):
+            manager.update(0.5)
+
+    assert small.states["npc_0"]["rotation"][1] != 0.0
+    assert small.states["npc_0"]["rotation"] == large.states["npc_0"]["rotation"]
+    assert large.states["npc_1"]["rotation"] != large.states["npc_0"]["rotation"]
+
+def test_npc_draws_ignore_capacity_and_idle_ticks(tmp_path):
+    """Agrandir le store ou sauter des tirages ne change pas la suite d'un PNJ"""
+    from ena.utils.random_streams import SimulationRNG
+    alone = AIManager(make_config(tmp_path, simulation__seed=99, ai__max_npcs=4))
+    crowded = AIManager(make_config(tmp_path, simulation__seed=99, ai__max_npcs=4))
+    alone.register_npc("npc_0", {})
+    crowded.register_npc("npc_0", {})
+    idle = {"idle": {"weight": 1.0, "actions": ["wait"]}}
+
+    trajectories = {id(alone): [], id(crowded): []}
+    for tick in range(6):
+        if tick == 2:
+            # Le store double plusieurs fois ; les nouveaux PNJ ne tirent rien
+            for i in range(1, 40):
+                crowded.register_npc(f"npc_{i}", {})
+                crowded.set_npc_behaviors(f"npc_{i}", idle)
+        if tick == 3:
+            # Tick sans aucun tirage du flux de déplacement
+            alone.set_npc_behaviors("npc_0", idle)
+            crowded.set_npc_behaviors("npc_0", idle)
+        if tick == 4:
+            alone.set_npc_behaviors("npc_0", alone._initialize_behaviors({}))
+            crowded.set_npc_behaviors("npc_0", crowded._initialize_behaviors({}))
+        for manager in (alone, crowded):
+            manager.update(0.5)
+            trajectories[id(manager)].append(list(manager.states["npc_0"]["rotation"]))
+    assert crowded.store.capacity > alone.store.capacity
+    assert trajectories[id(alone)] == trajectories[id(crowded)]
+    assert trajectories[id(alone)][4] != trajectories[id(alone)][3]
+
+    # Au niveau du service : tirages d'une clé indépendants des autres clés et des ticks non lus
+    first, second = SimulationRNG(5), SimulationRNG(5)
+    keys = first.entity_keys(["a", "b", "c"])
+    first.uniform("walk", keys, 2)
+    for rng in (first, second):
+        rng.begin_tick()
+        rng.begin_tick()
+    assert np.array_equal(first.uniform("walk", keys, 2)[1], second.uniform("walk", keys[1:2], 2)[0])
+    assert np.array_equal(first.normal("walk", keys[::-1], 3)[0], second.normal("walk", keys[2:], 3)[0])
+
+def test_lod_scheduler_tiers_and_promotion():
+    """Les PNJ lointains sont mis à jour moins souvent, avec le temps accumulé"""
+    scheduler = LODScheduler(4)
+    scheduler.set_observers([[0, 0, 0]])
+    slots = np.arange(4)
+    positions = np.array([[10, 0, 0], [200, 0, 0], [5000, 0, 0], [5000, 0, 0]], dtype=float)
+    scheduler.important[3] = True
+
+    counts = np.zeros(4, dtype=int)
+    elapsed = np.zeros(4)
+    for _ in range(32):
+        due, npc_delta, _ = scheduler.schedule(slots, positions, 0.5)
+        counts[due] += 1
+        elapsed[due] += npc_delta
+
+    assert counts.tolist() == [32, 8, 2, 32]
+    assert elapsed[1] == pytest.approx(counts[1] * 4 * 0.5)
+
+    # Un PNJ qui se rapproche est promu et mis à jour immédiatement
+    positions[2] = [5, 0, 0]
+    due, _, ticks = scheduler.schedule(slots, positions, 0.5)
+    assert 2 in due
+
+def test_lod_in_ai_manager(tmp_path):
+    """Le LOD de l'AIManager rattrape la régénération des ticks sautés"""
+    manager = AIManager(make_config(tmp_path, ai__state_backend="columnar"))
+    manager.register_npc("near", {"max_health": 50, "spawn_position": [1, 0, 0]})
+    manager.register_npc("far", {"max_health": 50, "spawn_position": [3000, 0, 0]})
+    manager.set_observers([[0, 0, 0]])
+
+    for _ in range(17):
+        manager.update(0.1)
+
+    assert manager.states["near"]["health"] == pytest.approx(51.7)
+    assert manager.states["far"]["health"] == pytest.approx(51.6)
+
+def test_parallel_tick_matches_serial(tmp_path):
+    """Le tick réparti entre processus donne le même état et les mêmes choix"""
+    managers = []
+    for parallel in (False, True):
+        manager = AIManager(make_config(
+            tmp_path,
+            ai__state_backend="columnar",
+            ai__max_npcs=64,
+            ai__lod__enabled=False,
+            ai__parallel_tick=parallel,
+            ai__parallel_min_npcs=1,
+            performance__threading__max_threads=2
+        ))
+        roles = ["civilian", "merchant", "guard"]
+        for i in range(40):
+            manager.register_npc(f"npc_{i}", {"role": roles[i % 3], "max_health": 20 + 2 * i})
+            manager.states[f"npc_{i}"]["target"] = "player" if i % 4 == 0 else None
+        managers.append(manager)
+
+    serial, parallel = managers
+    try:
+        assert parallel.store.allocator.shared
+        for _ in range(3):
+            slots = serial.store.active_slots()
+            serial.store.regenerate(0.1, 0.2)
+            expected = serial._select_behaviors_batch(slots)
+            actual = parallel.parallel.tick(slots, np.ones(len(slots)), parallel.scorer, 0.1, 0.2)
+
+            assert actual.tolist() == expected.tolist()
+            assert np.array_equal(parallel.store.health[slots], serial.store.health[slots])
+            assert np.array_equal(parallel.store.stamina[slots], serial.store.stamina[slots])
+
+        # Un nouveau comportement agrandit les tableaux partagés
+        parallel.set_npc_behaviors("npc_1", {"trade": {"weight": 5.0, "actions": []}})
+        serial.set_npc_behaviors("npc_1", {"trade": {"weight": 5.0, "actions": []}})
+        parallel.update(0.1)
+        serial.update(0.1)
+        assert np.array_equal(parallel.store.health[slots], serial.store.health[slots])
+        assert parallel.lod.engaged.tolist() == serial.lod.engaged.tolist()
+    finally:
+        parallel.shutdown()
+
+_POOL_SCRIPT = """
+import subprocess, sys
+from ena.utils.config import Config
+from ena.core.ai_manager import AIManager
+
+config = Config(sys.argv[1])
+for key, value in {"ai.state_backend": "columnar", "ai.max_npcs": 64, "ai.lod.enabled": False,
+                   "ai.parallel_tick": True, "ai.parallel_min_npcs": 1,
+                   "performance.threading.max_threads": 2}.items():
+    config.set(key, value)
+manager = AIManager(config)
+for i in range(40):
+    manager.register_npc(f"npc_{i}", {"role": "guard"})
+manager.update(0.1)
+
+# Un interpréteur indépendant (son propre resource_tracker) s'attache puis se termine
+attach = "from ena.utils.shared_arrays import attach; block, _ = attach(%r); block.close()"
+descriptor = manager.store.allocator.descriptor("health")
+subprocess.run([sys.executable, "-c", attach % (descriptor,)], check=True)
+
+manager.update(0.1)
+manager.shutdown()
+"""
+
+def test_parallel_pool_shuts_down_without_tracker_warnings(tmp_path):
+    """Les processus attachés ne confient pas les segments à leur resource_tracker"""
+    import os
+    import subprocess
+    import sys
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.environ.get("PYTHONPATH")])))
+    result = subprocess.run(
+        [sys.executable, "-c", _POOL_SCRIPT, str(tmp_path / "ena_config.json")],
+        capture_output=True, text=True, cwd=root, env=env, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+    assert "resource_tracker" not in result.stderr
+    assert "leaked" not in result.stderr
+
+@pytest.mark.parametrize("backend", ["dict", "columnar"])
+def test_incremental_selection_matches_full_reevaluation(tmp_path, backend):
+    """Les choix réutilisés sont identiques à une réévaluation complète"""
+    manager = AIManager(make_config(tmp_path, ai__state_backend=backend, ai__lod__enabled=False))
+    rng = np.random.default_rng(3)
+    roles = ["civilian", "merchant", "guard"]
+    for i in range(60):
+        manager.register_npc(f"npc_{i}", {"role": roles[i % 3], "max_health": 100.0})
+
+    for tick in range(6):
+        # Quelques PNJ changent d'état à chaque tick
+        for i in rng.choice(60, size=5, replace=False):
+            state = manager.states[f"npc_{i}"]
+            state["health"] = float(rng.choice([10, 40, 90]))
+            state["target"] = "player" if rng.random() < 0.5 else None
+        manager.emotions["npc_0"]["fear"] += 0.01 * tick
+
+        manager.update(0.1)
+        for npc_id in manager.npcs:
+            choice = manager.dirty.choice[manager.store.slot(npc_id)]
+            assert manager.scorer.names[choice] == manager._select_behavior(npc_id), npc_id
+
+    stats = manager.dirty.get_stats()
+    assert stats["reused"] > stats["reevaluated"]
+
+    # Les marquages explicites forcent la réévaluation
+    manager.mark_npc_dirty("npc_1")
+    assert manager.dirty.dirty[manager.store.slot("npc_1")]
+
+def test_actions_run_in_batches_with_custom_handlers(tmp_path):
+    """Chaque action est exécutée une fois par tick pour tous les PNJ qui l'ont choisie"""
+    calls = []
+    
+    def dance(batch):
+        calls.append(sorted(batch.npc_ids))
+        rotation = batch.read("rotation")
+        rotation[:, 2] += 90.0 * batch.delta_time
+        batch.write("rotation", rotation)
+    
+    for backend in ("dict", "columnar"):
+        calls.clear()
+        manager = AIManager(make_config(tmp_path, ai__state_backend=backend, ai__lod__enabled=False))
+        manager.register_action("dance", dance)
+        for i in range(4):
+            manager.register_npc(f"npc_{i}", {})
+            manager.set_npc_behaviors(f"npc_{i}", {"party": {"weight": 1.0, "actions": ["dance", "unknown"]}})
+        
+        manager.update(0.5)
+        assert calls == [[f"npc_{i}" for i in range(4)]]
+        assert manager.states["npc_3"]["rotation"][2] == pytest.approx(45.0)
+        
+        # Action isolée (événement npc_action)
+        manager._execute_action("npc_0", "dance", 1.0)
+        assert calls[-1] == ["npc_0"]
+        assert manager.states["npc_0"]["rotation"][2] == pytest.approx(135.0)
+
+def test_batched_random_walk_matches_backends(tmp_path):
+    """Le déplacement vectorisé est identique avec les deux backends"""
+    managers = []
+    for backend in ("dict", "columnar"):
+        manager = AIManager(make_config(tmp_path, ai__state_backend=backend, ai__lod__enabled=False, simulation__seed=5))
+        for i in range(20):
+            manager.register_npc(f"npc_{i}", {"spawn_position": [i, 0, 0], "max_stamina": 100})
+            if i % 2:
+                manager.set_npc_behaviors(f"npc_{i}", {"wander": {"weight": 1.0, "actions": ["random_walk"]}})
+        for _ in range(3):
+            manager.update(0.25)
+        managers.append(manager)
+    
+    dict_manager, columnar_manager = managers
+    for npc_id in dict_manager.npcs:
+        assert list(columnar_manager.states[npc_id]["position"]) == pytest.approx(dict_manager.states[npc_id]["position"])
+        assert list(columnar_manager.states[npc_id]["rotation"]) == pytest.approx(dict_manager.states[npc_id]["rotation"])
+    assert dict_manager.states["npc_1"]["position"] != [1, 0, 0]
@@ -0,0 +1,85 @@
+"""
+Tests pour le gestionnaire de comportements d'ENA
+"""
+
+import numpy as np
+import pytest
+from ena.utils.config import Config
+from ena.core.behavior_manager import BehaviorManager
+
+@pytest.fixture
+def manager(tmp_path):
+    return BehaviorManager(Config(str(tmp_path / "ena_config.json")))
+
+def make_states():
+    """États variés couvrant les conditions par défaut"""
+    return [
+        {"health": 100.0},
+        {"health": 20.0},
+        {"health": 80.0, "target": "player", "target_distance": 3.0},
+        {"health": 80.0, "target": "player", "target_distance": 30.0, "target_hostile": True},
+        {"health": 10.0, "target": "wolf", "position": [0, 0, 0], "target_position": [3, 4, 0]},
+        {"health": 60.0, "stamina": 25.0, "emotions": {"fear": 0.8}}
+    ]
+
+def test_default_conditions(manager):
+    """Teste les conditions des comportements par défaut"""
+    states = make_states()
+    assert manager.evaluate_behavior(states[0], "wander") == 0.8
+    assert manager.evaluate_behavior(states[2], "wander") == 0.0
+    assert manager.evaluate_behavior(states[2], "interact") == 1.2
+    assert manager.evaluate_behavior(states[3], "interact") == 0.0
+    assert manager.evaluate_behavior(states[3], "combat") == 1.5
+    assert manager.evaluate_behavior(states[1], "flee") == 2.0
+    # Distance calculée à partir des positions
+    assert manager.evaluate_behavior(states[4], "interact") == 1.2
+
+def test_user_conditions_and_invalid_behavior(manager):
+    """Teste les conditions ajoutées par add_behavior"""
+    manager.add_behavior("hide", {"priority": 3.0, "conditions": ["emotions.fear > 0.5", "not low_health"]})
+    manager.add_behavior("rest", {"priority": 0.5, "conditions": ["stamina < 30"]})
+    manager.add_behavior("broken", {"priority": 1.0, "conditions": ["health <"]})
+
+    states = make_states()
+    assert manager.evaluate_behavior(states[5], "hide") == 3.0
+    assert manager.evaluate_behavior(states[0], "hide") == 0.0
+    assert manager.evaluate_behavior(states[5], "rest") == 0.5
+    assert manager.evaluate_behavior(states[0], "rest") == 0.0
+    assert manager.get_behavior("broken") is None
+
+def test_bulk_evaluation_matches_scalar(manager):
+    """L'évaluation par masques de bits donne les mêmes priorités que la version scalaire"""
+    manager.add_behavior("hide", {"priority": 3.0, "conditions": ["emotions.fear > 0.5", "not low_health"]})
+    manager.conditions.register("is_wounded", lambda state: state.get("health", 100) < 90)
+    manager.add_behavior("heal", {"priority": 1.1, "conditions": ["is_wounded", "no_target"]})
+
+    states = make_states() * 50
+    names, priorities = manager.evaluate_behaviors(states)
+    assert priorities.shape == (len(states), len(manager.behaviors))
+    for i, state in enumerate(states):
+        for j, name in enumerate(names):
+            assert priorities[i, j] == manager.evaluate_behavior(state, name), (i, name)
+
+def test_bitmasks_span_several_words(manager):
+    """Plus de 64 conditions distinctes utilisent plusieurs mots de 64 bits"""
+    for i in range(70):
+        manager.add_behavior(f"b{i}", {"priority": 1.0, "conditions": [f"health > {i}"]})
+    assert manager.conditions.words == 2
+
+    names, priorities = manager.evaluate_behaviors([{"health": 65.5}], ["b0", "b65", "b66"])
+    assert names == ["b0", "b65", "b66"]
+    assert np.array_equal(priorities, [[1.0, 1.0, 0.0]])
+
+@pytest.mark.parametrize("direct", [False, True])
+def test_condition_registered_after_behavior(manager, direct):
+    """Une condition enregistrée après add_behavior est vue par les deux évaluations"""
+    manager.add_behavior("patrol", {"priority": 1.3, "conditions": ["on_duty", "not low_health"]})
+    states = [{"health": 100.0, "shift": "day"}, {"health": 100.0, "shift": "night"}, {"health": 10.0, "shift": "day"}]
+    # Avant l'enregistrement, on_duty lit le champ de l'état (absent)
+    assert manager.evaluate_behavior(states[0], "patrol") == 0.0
+
+    register = manager.conditions.register if direct else manager.register_condition
+    register("on_duty", lambda state: state.get("shift") == "day")
+    names, priorities = manager.evaluate_behaviors(states, ["patrol"])
+    assert [manager.evaluate_behavior(state, "patrol") for state in states] == list(priorities[:, 0])
+    assert list(priorities[:, 0]) == [1.3, 0.0, 0.0]
@@ -0,0 +1,276 @@
+"""
+Tests pour le gestionnaire d'événements d'ENA
+"""
+
+import asyncio
+import threading
+import time
+import pytest
+from ena.core.event_manager import Event, EventManager
+from ena.core.event_queue import EventQueue
+
+def test_slow_async_listener_does_not_stall_emit():
+    """Les écouteurs synchrones restent immédiats, les lents passent par la file"""
+    events = EventManager()
+    fast, slow = [], []
+    events.subscribe("npc_action", lambda event: fast.append(event.data["id"]))
+
+    def dialogue(event):
+        time.sleep(0.05)
+        slow.append(event.data["id"])
+    events.subscribe_async("npc_action", dialogue)
+    assert events.get_listener_count("npc_action") == 2
+
+    events.start()
+    try:
+        started = time.perf_counter()
+        for i in range(5):
+            events.emit(Event("npc_action", {"id": i}))
+        assert time.perf_counter() - started < 0.05
+        assert fast == list(range(5))
+        assert events.wait_idle(5.0)
+        assert slow == list(range(5))
+    finally:
+        events.stop()
+    assert events.loop is None
+
+def test_overflow_policies():
+    """drop_oldest perd les plus anciens, coalesce garde le dernier par clé"""
+    events = EventManager()
+    received = {"npc_action": [], "npc_move": []}
+
+    async def record(event):
+        received[event.type].append(event.data)
+    events.subscribe_async("npc_action", record)
+    events.subscribe_async("npc_move", record)
+    events.configure_queue("npc_action", maxsize=3, policy="drop_oldest")
+    events.configure_queue("npc_move", maxsize=10, policy="coalesce", key="npc_id")
+
+    # Sans boucle, les événements attendent dans les files
+    for i in range(5):
+        events.emit(Event("npc_action", {"id": i}))
+    for step in range(3):
+        for npc_id in ("a", "b"):
+            events.emit(Event("npc_move", {"npc_id": npc_id, "step": step}))
+    assert events.get_queue_stats("npc_action") == {"pending": 3, "dropped": 2, "coalesced": 0, "blocked": 0}
+    assert events.get_queue_stats("npc_move")["coalesced"] == 4
+
+    async def run():
+        events.start()
+        await events.join()
+        await events.close()
+    asyncio.run(run())
+
+    assert [data["id"] for data in received["npc_action"]] == [2, 3, 4]
+    assert received["npc_move"] == [{"npc_id": "a", "step": 2}, {"npc_id": "b", "step": 2}]
+
+def test_listener_concurrency_limit():
+    """Un écouteur ne dépasse pas sa limite d'appels simultanés"""
+    events = EventManager()
+    running = {"now": 0, "max": 0}
+    done = []
+
+    async def listener(event):
+        running["now"] += 1
+        running["max"] = max(running["max"], running["now"])
+        await asyncio.sleep(0.01)
+        running["now"] -= 1
+        done.append(event.data["id"])
+    events.subscribe_async("npc_action", listener, concurrency=2)
+
+    async def run():
+        events.start()
+        for i in range(8):
+            events.emit(Event("npc_action", {"id": i}))
+        await events.join()
+        await events.close()
+    asyncio.run(run())
+
+    assert running["max"] == 2
+    assert sorted(done) == list(range(8))
+
+def test_block_policy_applies_backpressure():
+    """Sous la politique block, l'émetteur attend au lieu de perdre des événements"""
+    events = EventManager()
+    received = []
+
+    def slow(event):
+        time.sleep(0.02)
+        received.append(event.data["id"])
+    events.subscribe_async("npc_action", slow)
+    events.configure_queue("npc_action", maxsize=1, policy="block")
+
+    events.start()
+    try:
+        started = time.perf_counter()
+        for i in range(6):
+            events.emit(Event("npc_action", {"id": i}))
+        # Au plus un événement en file et un en cours : l'émetteur a attendu
+        assert time.perf_counter() - started >= 0.05
+        assert events.wait_idle(5.0)
+    finally:
+        events.stop()
+    assert received == list(range(6))
+    assert events.get_queue_stats("npc_action")["dropped"] == 0
+    assert events.get_queue_stats("npc_action")["blocked"] > 0
+
+def test_event_queue_block_timeout():
+    """Une file bloquante pleine perd l'événement après le délai"""
+    queue = EventQueue(maxsize=1, policy="block")
+    assert queue.put("a")
+    assert not queue.put("b", timeout=0.01)
+    assert queue.stats()["dropped"] == 1
+
+    threading.Timer(0.01, queue.get).start()
+    assert queue.put("c", timeout=1.0)
+    assert queue.get() == "c"
+    with pytest.raises(ValueError):
+        EventQueue(policy="lifo")
+
+def test_batch_delivery_with_keyed_coalescing(tmp_path):
+    """Les écouteurs par lot reçoivent une liste par flush, fusionnée par clé"""
+    from ena.utils.config import Config
+    from ena.core.world_manager import WorldManager
+    from ena.core.ai_manager import AIManager
+
+    config = Config(str(tmp_path / "ena_config.json"))
+    events = EventManager(config)
+    world = WorldManager(config, events)
+    world.register_region("west", {"bounds": {"min": [0, 0], "max": [100, 100]}})
+    world.register_region("east", {"bounds": {"min": [100, 0], "max": [200, 100]}})
+    world.handle_npc_spawn(Event("npc_spawn", {"id": "npc_0", "region_id": "west", "position": [10, 10, 0]}))
+
+    ai = AIManager(config)
+    calls = []
+
+    def dance(batch):
+        calls.append(list(batch.npc_ids))
+    ai.register_action("dance", dance)
+    for i in range(3):
+        ai.register_npc(f"npc_{i}", {})
+
+    batches, every = [], []
+    events.subscribe_batch("npc_move", world.handle_npc_moves, key="id")
+    events.subscribe_batch("npc_move", batches.append, key="id")
+    events.subscribe_batch("npc_move", every.append)
+    events.subscribe_batch("npc_action", ai.handle_npc_actions)
+
+    for x in (20, 150, 60):
+        events.emit(Event("npc_move", {"id": "npc_0", "position": [x, 10, 0]}))
+    events.emit(Event("npc_move", {"id": "npc_1", "position": [5, 5, 0]}))
+    events.emit_all([Event("npc_action", {"npc_id": f"npc_{i % 3}", "action_type": "dance"}) for i in range(5)])
+    assert events.get_pending_count() == 9
+    # Rien n'est livré avant le flush
+    assert world.get_npc_region("npc_0") == "west" and not batches and not calls
+
+    assert events.flush() == 9
+    assert [event.data["position"][0] for event in batches[0]] == [60, 5]
+    assert len(every[0]) == 4
+    assert world.npcs["npc_0"]["position"][0] == 60
+    # Les actions répétées d'un PNJ sont exécutées dans des lots successifs
+    assert calls == [["npc_0", "npc_1", "npc_2"], ["npc_0", "npc_1"]]
+
+    assert events.flush() == 0
+    assert len(batches) == 1
+    events.unsubscribe("npc_move", batches.append)
+    assert events.get_listener_count("npc_move") == 2
+
+def test_spatial_subscriptions_only_reach_listeners_in_range(tmp_path):
+    """Un événement localisé n'atteint que les abonnements de sa région ou à portée"""
+    from ena.utils.config import Config
+    from ena.core.world_manager import WorldManager
+
+    config = Config(str(tmp_path / "ena_config.json"))
+    events = EventManager(config)
+    world = WorldManager(config, events)
+    world.register_region("west", {"bounds": {"min": [0, 0], "max": [100, 100]}})
+    world.register_region("east", {"bounds": {"min": [100, 0], "max": [200, 100]}})
+
+    heard = {}
+    def listener(name):
+        return lambda event: heard.setdefault(name, []).append(event.data.get("id"))
+
+    # Une grille de PNJ à l'écoute des explosions dans un rayon de 30
+    for i in range(20):
+        for j in range(10):
+            events.subscribe_spatial("explosion", listener(f"npc_{i}_{j}"), center=[i * 10, j * 10, 0], radius=30)
+    events.subscribe_spatial("explosion", listener("east_guard"), region_id="east")
+    events.subscribe("explosion", listener("global"))
+    assert events.get_listener_count("explosion") == 202
+
+    events.emit(Event("explosion", {"id": 1, "position": [150, 50, 0], "radius": 5}))
+    expected = {
+        f"npc_{i}_{j}" for i in range(20) for j in range(10)
+        if ((i * 10 - 150) ** 2 + (j * 10 - 50) ** 2) ** 0.5 <= 35
+    }
+    assert set(heard) == expected | {"east_guard", "global"}
+    # Un événement sans position ni région n'atteint que les écouteurs globaux
+    heard.clear()
+    events.emit(Event("explosion", {"id": 2}))
+    assert set(heard) == {"global"}
+
+    # Un abonnement qui suit un PNJ se déplace avec lui
+    world.handle_npc_spawn(Event("npc_spawn", {"id": "stalker", "region_id": "west", "position": [10, 10, 0]}))
+    follow_id = events.subscribe_spatial("gunshot", listener("stalker"), radius=20, follow="stalker")
+    events.emit(Event("gunshot", {"id": 3, "position": [190, 90, 0]}))
+    world.update_npc_positions({"stalker": [180, 80, 0]})
+    events.emit(Event("gunshot", {"id": 4, "position": [190, 90, 0]}))
+    assert heard["stalker"] == [4]
+
+    world.remove_npc("stalker")
+    events.emit(Event("gunshot", {"id": 5, "position": [190, 90, 0]}))
+    assert heard["stalker"] == [4]
+    assert events.unsubscribe_spatial(follow_id)
+    assert events.get_listener_count("gunshot") == 0
+
+def _produce_moves(name, count):
+    """Producteur de substitution (côté jeu) : déplacements par paquets"""
+    from ena.core.event_ring import EventRing
+    ring = EventRing.attach(name)
+    sent = 0
+    while sent < count:
+        batch = [
+            Event("npc_move", {"id": f"npc_{i % 50}", "position": [i, 0.5, 0]})
+            for i in range(sent, min(count, sent + 100))
+        ]
+        sent += ring.push_many(batch)
+    ring.close()
+
+def test_shared_memory_ring_feeds_event_manager():
+    """Les événements d'un autre processus arrivent dans l'ordre, sans perte"""
+    import multiprocessing
+    from ena.core.event_ring import EventRing, RECORD_DTYPE
+
+    assert RECORD_DTYPE.itemsize == 128
+    ring = EventRing(capacity=500)
+    assert ring.capacity == 512
+    try:
+        # Aller-retour d'un enregistrement complet
+        action = Event("npc_action", {"npc_id": "npc_7", "action_type": "dance", "delta_time": 0.25, "time": 12.5})
+        explosion = Event("explosion", {"region_id": "west", "position": [1, 2], "radius": 30.0, "intensity": 0.5})
+        assert ring.push_many([action, explosion]) == 2
+        decoded = ring.pop()
+        assert [event.type for event in decoded] == ["npc_action", "explosion"]
+        assert decoded[0].data == action.data
+        assert decoded[1].data == {"region_id": "west", "position": [1.0, 2.0, 0.0], "radius": 30.0, "intensity": 0.5}
+        with pytest.raises(ValueError):
+            ring.push(Event("npc_move", {"id": "x" * 40}))
+
+        # Une file pleine refuse sans attendre
+        assert ring.push_many([Event("npc_despawn", {"id": "a"})] * 600) == 512
+        assert ring.dropped == 88 and len(ring) == 512
+        assert len(ring.pop(100)) == 100 and len(ring.pop()) == 412
+
+        events = EventManager()
+        received = []
+        events.subscribe("npc_move", lambda event: received.append(event.data["position"][0]))
+        producer = multiprocessing.get_context("fork").Process(target=_produce_moves, args=(ring.name, 20000))
+        producer.start()
+        deadline = time.perf_counter() + 30.0
+        while len(received) < 20000 and time.perf_counter() < deadline:
+            ring.drain(events, max_events=1000)
+        producer.join(10.0)
+        assert producer.exitcode == 0
+        assert received == [float(i) for i in range(20000)]
+    finally:
+        ring.close()
@@ -0,0 +1,160 @@
+"""
+Tests du système NPC unifié : niveaux de détail et index spatiaux
+"""
+
+import random
+import pytest
+from src.npc.npc_unified_system import UnifiedNPCSystem
+from ena.utils.spatial_index import SpatialHash
+
+@pytest.fixture
+def npc_system():
+    return UnifiedNPCSystem()
+
+def test_lod_global_update(npc_system):
+    """Teste la fréquence de mise à jour selon la distance au joueur"""
+    near_id = npc_system.create_npc({'position': {'x': 5, 'y': 0, 'z': 0}})
+    far_id = npc_system.create_npc({'position': {'x': 4000, 'y': 0, 'z': 0}})
+
+    for _ in range(16):
+        npc_system.update_global_state({'player_position': {'x': 0, 'y': 0, 'z': 0}})
+
+    assert len(npc_system.npcs[near_id].memory) == 16
+    assert len(npc_system.npcs[far_id].memory) == 1
+
+    # Sans observateur, tous les PNJ sont mis à jour
+    npc_system.update_global_state({})
+    assert len(npc_system.npcs[far_id].memory) == 2
+
+def test_lod_slots_are_reused_after_removal(npc_system):
+    """Les emplacements LOD des PNJ retirés sont rendus puis réutilisés"""
+    player = {'player_position': {'x': 0, 'y': 0, 'z': 0}}
+    for round_index in range(50):
+        npc_ids = [npc_system.create_npc({'position': {'x': 10 * i, 'y': 0, 'z': 0}}) for i in range(20)]
+        npc_system.update_global_state(player)
+        for npc_id in npc_ids[:10]:
+            assert npc_system.remove_npc(npc_id)
+        # Retrait direct du dictionnaire : l'emplacement est rendu au tick suivant
+        for npc_id in npc_ids[10:]:
+            del npc_system.npcs[npc_id]
+    npc_system.update_global_state(player)
+    assert not npc_system.lod_slots
+    assert npc_system.lod.capacity == 64
+    assert not npc_system.remove_npc('unknown')
+
+    # Un nouveau PNJ reprend un emplacement libéré
+    npc_id = npc_system.create_npc({'position': {'x': 4000, 'y': 0, 'z': 0}})
+    npc_system.update_global_state(player)
+    assert npc_system.lod_slots[npc_id] < 20
+
+def test_indexed_danger_level_matches_linear_scan(npc_system):
+    """Le niveau de danger via l'index des menaces est identique au parcours linéaire"""
+    npc_ids = [
+        npc_system.create_npc({'position': {'x': 37 * i, 'y': 0, 'z': 11 * i}})
+        for i in range(20)
+    ]
+    game_state = {
+        'threats': [
+            {'position': {'x': 23 * j, 'y': 5, 'z': 17 * j}, 'level': 0.05 * (j % 7)}
+            for j in range(40)
+        ]
+    }
+
+    expected = {
+        npc_id: npc_system._calculate_danger_level(npc_system.npcs[npc_id], game_state)
+        for npc_id in npc_ids
+    }
+    index = SpatialHash.from_points((t['position'] for t in game_state['threats']), cell_size=100.0)
+    npc_system._threat_index = (game_state['threats'], index)
+    for npc_id in npc_ids:
+        assert npc_system._calculate_danger_level(npc_system.npcs[npc_id], game_state) == expected[npc_id]
+    npc_system._threat_index = None
+
+def test_indexed_nearby_allies_match_linear_scan(npc_system):
+    """Les alliés proches via la grille sont identiques au parcours de tous les PNJ"""
+    rng = random.Random(7)
+    npc_ids = [
+        npc_system.create_npc({'position': {'x': rng.uniform(0, 300), 'y': rng.uniform(0, 300), 'z': 0}})
+        for _ in range(120)
+    ]
+    for npc_id in npc_ids:
+        npc_system.npcs[npc_id].relationships = {
+            other_id: rng.uniform(-1, 1) for other_id in rng.sample(npc_ids, 60)
+        }
+
+    def linear_scan(npc):
+        return [
+            other_id for other_id, other in npc_system.npcs.items()
+            if other_id != npc.id
+            and npc_system._calculate_distance(npc.position, other.position) < 50
+            and npc.relationships.get(other_id, 0.0) > 0.5
+        ]
+
+    def check():
+        for npc in npc_system.npcs.values():
+            assert npc_system._get_nearby_allies(npc, {}) == linear_scan(npc)
+
+    check()
+    # Positions modifiées sur place ou remplacées, PNJ retiré puis ajouté
+    npc_system.npcs[npc_ids[0]].position['x'] += 120
+    npc_system.npcs[npc_ids[1]].position = {'x': 10, 'y': 10}
+    del npc_system.npcs[npc_ids[2]]
+    npc_system.create_npc({'position': {'x': 150, 'y': 150, 'z': 0}})
+    check()
+
+    expected = {npc.id: len(linear_scan(npc)) for npc in npc_system.npcs.values()}
+    for npc in npc_system.npcs.values():
+        npc.emotional_state['trust'] = 0.0
+    npc_system.update_global_state({})
+    for npc in npc_system.npcs.values():
+        assert npc.emotional_state['trust'] == pytest.approx(min(1.0, 0.1 * expected[npc.id]))
+
+def test_ally_grid_follows_position_writes_with_a_reused_state(npc_system, monkeypatch, tmp_path):
+    """Les déplacements sont vus sans resynchronisation complète, même avec le même état de jeu"""
+    rng = random.Random(11)
+    npc_ids = [
+        npc_system.create_npc({'position': {'x': rng.uniform(0, 200), 'y': rng.uniform(0, 200), 'z': 0}})
+        for _ in range(60)
+    ]
+    for npc_id in npc_ids:
+        npc_system.npcs[npc_id].relationships = {other_id: 1.0 for other_id in npc_ids}
+
+    def linear_scan(npc):
+        return [
+            other_id for other_id, other in npc_system.npcs.items()
+            if other_id != npc.id
+            and npc_system._calculate_distance(npc.position, other.position) < 50
+            and npc.relationships.get(other_id, 0.0) > 0.5
+        ]
+
+    syncs = []
+    sync = npc_system._sync_npc_grid
+    monkeypatch.setattr(npc_system, '_sync_npc_grid', lambda: syncs.append(1) or sync())
+    game_state = {}
+    for npc_id in npc_ids:
+        npc_system.update_npc(npc_id, game_state)
+    assert len(syncs) == 1
+
+    # Remplacement, modification sur place et set_npc_position, avec le même état
+    lone, ally, other = (npc_system.npcs[npc_id] for npc_id in npc_ids[:3])
+    lone.position = {'x': 1000, 'y': 1000, 'z': 0}
+    ally.position['x'] = 1010
+    ally.position['y'] = 1000
+    assert npc_system._get_nearby_allies(lone, game_state) == linear_scan(lone) == [ally.id]
+    npc_system.set_npc_position(other.id, {'x': 1000, 'y': 1020, 'z': 0})
+    assert npc_system._get_nearby_allies(lone, game_state) == linear_scan(lone) == [ally.id, other.id]
+    assert npc_system.remove_npc(ally.id)
+    new_id = npc_system.create_npc({'position': {'x': 990, 'y': 1000, 'z': 0}})
+    lone.relationships[new_id] = 1.0
+    assert npc_system._get_nearby_allies(lone, game_state) == linear_scan(lone) == [other.id, new_id]
+    assert len(syncs) == 1
+
+    # Un état rechargé remplace self.npcs : la grille est reconstruite
+    path = tmp_path / 'state.json'
+    npc_system.save_state(str(path))
+    npc_system.load_state(str(path))
+    lone = npc_system.npcs[lone.id]
+    lone.position['x'] = 0
+    for npc in npc_system.npcs.values():
+        assert npc_system._get_nearby_allies(npc, game_state) == linear_scan(npc)
+    assert len(syncs) == 2
@@ -0,0 +1,48 @@
+"""
+Tests pour l'index spatial partagé
+"""
+
+import math
+import random
+import pytest
+from ena.utils.spatial_index import SpatialHash
+
+@pytest.fixture
+def points():
+    rng = random.Random(3)
+    return [(rng.uniform(-300, 300), rng.uniform(-300, 300), rng.uniform(-20, 20)) for _ in range(400)]
+
+def brute_force(points, center, radius):
+    return sorted(i for i, p in enumerate(points) if math.dist(p, center) <= radius)
+
+def test_radius_queries_match_brute_force(points):
+    """Les requêtes par rayon, simples et groupées, donnent le résultat exact"""
+    index = SpatialHash.from_points(points, cell_size=40.0)
+    centers = points[:25] + [(0, 0, 0), (1000, 1000, 0)]
+
+    for center in centers:
+        assert sorted(index.query_radius(center, 75.0)) == brute_force(points, center, 75.0)
+
+    batch = index.query_radius_batch(centers, 75.0)
+    for center, result in zip(centers, batch):
+        assert sorted(result) == brute_force(points, center, 75.0)
+
+def test_incremental_moves_and_knn(points):
+    """Les déplacements et suppressions sont pris en compte par les requêtes"""
+    index = SpatialHash(cell_size=25.0)
+    for i, point in enumerate(points):
+        index.insert(i, point)
+
+    moved = list(points)
+    for i in range(0, len(points), 3):
+        moved[i] = (points[i][0] + 60, points[i][1] - 45, points[i][2])
+        index.move(i, moved[i])
+    index.remove(7)
+    moved[7] = None
+
+    remaining = [p if p is not None else (1e9, 1e9, 1e9) for p in moved]
+    assert sorted(index.query_radius((10, 10, 0), 90)) == brute_force(remaining, (10, 10, 0), 90)
+
+    nearest = index.query_knn({'x': 0, 'y': 0, 'z': 0}, 5)
+    expected = sorted(range(len(remaining)), key=lambda i: math.dist(remaining[i], (0, 0, 0)))[:5]
+    assert [key for key, _ in nearest] == expected
@@ -0,0 +1,54 @@
+"""
+Tests pour l'ordonnanceur à pas fixe d'ENA
+"""
+
+import pytest
+from ena.utils.tick_scheduler import TickScheduler
+
+class FakeClock:
+    """Horloge contrôlée par le test"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, duration):
+        self.sleeps.append(duration)
+        self.now += duration
+
+def test_tasks_run_at_their_own_rate():
+    """Chaque tâche est exécutée à sa fréquence avec un pas fixe"""
+    clock = FakeClock()
+    scheduler = TickScheduler(clock=clock, sleep=clock.sleep)
+    calls = {"ai": [], "world": []}
+    scheduler.add_task("ai", calls["ai"].append, 0.125)
+    scheduler.add_task("world", calls["world"].append, 0.5)
+
+    while clock.now < 1.0:
+        scheduler.run_pending()
+        scheduler.sleep_until_next()
+    scheduler.run_pending()
+
+    assert len(calls["ai"]) == 8
+    assert len(calls["world"]) == 2
+    assert set(calls["ai"]) == {0.125}
+    # Pas d'attente active : un sommeil par échéance
+    assert all(duration > 0 for duration in clock.sleeps)
+
+def test_catch_up_is_limited_without_drift():
+    """Un gros retard est rattrapé partiellement, sans dérive des échéances"""
+    clock = FakeClock()
+    scheduler = TickScheduler(max_catch_up=3, clock=clock, sleep=clock.sleep)
+    calls = []
+    task = scheduler.add_task("ai", calls.append, 0.1)
+
+    clock.now = 1.05
+    assert scheduler.run_pending() == 3
+    assert task.dropped_ticks == 7
+    assert task.next_deadline == pytest.approx(1.1)
+
+    clock.now = 1.1
+    assert scheduler.run_pending() == 1
@@ -0,0 +1,573 @@
+"""
+Tests pour le gestionnaire du monde d'ENA
+"""
+
+import pytest
+import numpy as np
+from ena.utils.config import Config
+from ena.core.world_manager import WorldManager
+from ena.core.weather import WEATHER_TYPES
+
+def make_config(tmp_path, **overrides):
+    """Crée une configuration par défaut, sans fichier utilisateur"""
+    config = Config(str(tmp_path / "ena_config.json"))
+    for key, value in overrides.items():
+        config.set(key.replace("__", "."), value)
+    return config
+
+def make_world(tmp_path, regions=5, **overrides):
+    world = WorldManager(make_config(tmp_path, **overrides))
+    for i in range(regions):
+        world.register_region(f"region_{i}", {
+            "initial_population": 100,
+            "initial_resources": {"food": 50.0}
+        })
+    return world
+
+def test_seeded_world_is_reproducible(tmp_path):
+    """Deux mondes avec la même graine évoluent de façon identique"""
+    worlds = [
+        make_world(tmp_path, simulation__seed=99, world__weather_change_probability=0.5)
+        for _ in range(2)
+    ]
+    for world in worlds:
+        for _ in range(20):
+            world.update(1.0)
+
+    first, second = (w.regions for w in worlds)
+    for region_id in first:
+        assert first[region_id]["state"]["environment"] == second[region_id]["state"]["environment"]
+        assert first[region_id]["state"]["weather"] == second[region_id]["state"]["weather"]
+    weathers = {r["state"]["weather"] for r in first.values()}
+    assert weathers != {"clear"}
+
+def reference_region_step(state, delta_time, noise):
+    """Mise à jour scalaire d'une région, telle qu'avant la vectorisation"""
+    env = state["environment"]
+    env["temperature"] = float(np.clip(env["temperature"] + 0.1 * noise[0] * delta_time, -50, 50))
+    env["humidity"] = float(np.clip(env["humidity"] + 0.05 * noise[1] * delta_time, 0, 1))
+
+    danger_factor = 1.0 - (state["danger_level"] / 100.0)
+    resource_factor = min(1.0, sum(state["resources"].values()) / 100.0)
+    growth_rate = 0.001 * danger_factor * resource_factor
+    state["population"] = round(state["population"] + state["population"] * growth_rate * delta_time)
+
+    for resource, amount in state["resources"].items():
+        amount -= 0.01 * state["population"] * delta_time
+        if amount < 100:
+            amount += 0.05 * (1.0 - amount / 100.0) * delta_time
+        state["resources"][resource] = max(0, amount)
+
+    control = state["faction_control"]
+    total = sum(control.values())
+    if total > 0:
+        for faction in control:
+            control[faction] /= total
+        shares = dict(control)
+        for faction, value in shares.items():
+            others = sum(c for f, c in shares.items() if f != faction)
+            control[faction] = value + 0.1 * (others - value) * delta_time
+
+def test_vectorized_regions_match_scalar_update(tmp_path):
+    """Le pas vectoriel reproduit la mise à jour région par région"""
+    world = WorldManager(make_config(tmp_path, simulation__seed=4))
+    rng = np.random.default_rng(1)
+    expected = {}
+    for i in range(30):
+        factions = ["red", "blue", "green"][: i % 4]
+        if i % 2:
+            factions = factions[::-1]
+        data = {
+            "initial_population": int(rng.integers(0, 5000)),
+            "initial_danger": float(rng.uniform(0, 100)),
+            "initial_resources": {name: float(rng.uniform(0, 150)) for name in ["food", "water", "ore"][: i % 3 + 1]},
+            "initial_control": {name: float(rng.uniform(0.1, 1)) for name in factions},
+            "base_temperature": float(rng.uniform(-60, 60))
+        }
+        world.register_region(f"region_{i}", data)
+        expected[f"region_{i}"] = world._initialize_region_state({
+            **data,
+            "initial_resources": dict(data["initial_resources"]),
+            "initial_control": dict(data["initial_control"])
+        })
+
+    for _ in range(5):
+        world.update(2.0)
+        noise = world.rng.normal("world.environment", world._region_keys, 2)
+        for region_id, state in expected.items():
+            reference_region_step(state, 2.0, noise[world._region_rows[region_id]])
+
+    for region_id, state in expected.items():
+        actual = world.get_region_state(region_id)
+        assert actual["population"] == state["population"]
+        assert dict(actual["environment"]) == pytest.approx(state["environment"])
+        assert dict(actual["resources"]) == pytest.approx(state["resources"])
+        assert list(actual["faction_control"]) == list(state["faction_control"])
+        assert dict(actual["faction_control"]) == pytest.approx(state["faction_control"])
+
+def test_event_lifecycle_uses_expiry_heap_and_bounded_archive(tmp_path):
+    """Les événements terminés quittent les actifs et l'archive reste bornée"""
+    world = make_world(tmp_path, regions=2, world__event_archive_size=3)
+    assert world.spawn_event("storm", "missing_region", {}) is None
+
+    short = world.spawn_event("storm", "region_0", {"duration": 2.0, "initial_intensity": 4.0, "decay_rate": 0.5})
+    long = world.spawn_event("fire", "region_1", {"duration": 10.0})
+    assert short != long
+    assert list(world.regions["region_0"]["events"]) == [short]
+
+    world.update(1.0)
+    state = world.get_event_state(short)
+    assert state["active"]
+    assert state["progress"] == pytest.approx(0.5)
+    assert state["intensity"] == pytest.approx(4.0 * np.exp(-0.5))
+
+    world.update(1.0)
+    assert short not in world.events
+    assert long in world.events
+    assert not world.regions["region_0"]["events"]
+    archived = world.get_event_state(short)
+    assert not archived["active"]
+    assert archived["progress"] == 1.0
+    assert archived["intensity"] == pytest.approx(4.0 * np.exp(-1.0))
+
+    # Identifiants jamais réutilisés, archive limitée aux plus récents
+    ids = [world.spawn_event("spark", "region_0", {"duration": 0.5}) for _ in range(5)]
+    assert len(set(ids)) == 5
+    world.update(1.0)
+    assert list(world.event_timeline.archive) == ids[-3:]
+    assert len(world.events) == 1
+
+def test_event_effects_use_region_accumulators(tmp_path):
+    """Les effets des événements sont cumulés par région et retirés à leur fin"""
+    world = make_world(tmp_path, regions=2)
+    store = world.region_store
+    row = world._region_rows["region_0"]
+
+    heat = world.spawn_event("heatwave", "region_0", {
+        "duration": 3.0,
+        "initial_intensity": 2.0,
+        "effects": {"temperature": 0.5, "radiation": {"type": "additive", "value": 1.0}}
+    })
+    world.spawn_event("fallout", "region_0", {
+        "duration": 10.0,
+        "effects": {"toxicity": {"type": "additive", "value": 10.0}, "humidity": {"type": "multiplicative", "value": 0.5}}
+    })
+    assert store.effect_add[row].tolist() == [1.0, 0.0, 2.0, 10.0]
+    assert store.effect_log_factor[row][1] == pytest.approx(np.log(0.5))
+    assert not store.effect_add[world._region_rows["region_1"]].any()
+
+    radiation = world.get_region_state("region_0")["environment"]["radiation"]
+    humidity = world.get_region_state("region_1")["environment"]["humidity"]
+    world.update(1.0)
+    environment = world.get_region_state("region_0")["environment"]
+    assert environment["radiation"] == pytest.approx(radiation + 2.0)
+    assert environment["toxicity"] == pytest.approx(10.0)
+    assert environment["humidity"] < humidity
+
+    # Un changement d'intensité remplace la contribution de l'événement
+    assert world.set_event_intensity(heat, 1.0)
+    assert store.effect_add[row].tolist() == [0.5, 0.0, 1.0, 10.0]
+
+    for _ in range(3):
+        world.update(1.0)
+    assert heat not in world.events
+    assert store.effect_add[row].tolist() == [0.0, 0.0, 0.0, 10.0]
+
+def test_decaying_event_effects_follow_intensity(tmp_path):
+    """Les contributions des événements à intensité décroissante sont rafraîchies"""
+    world = make_world(tmp_path, regions=1)
+    row = world._region_rows["region_0"]
+    world.spawn_event("smog", "region_0", {"duration": 10.0, "decay_rate": 0.5, "effects": {"toxicity": 4.0}})
+
+    world.update(2.0)
+    assert world.region_store.effect_add[row][3] == pytest.approx(4.0 * np.exp(-1.0))
+    for _ in range(4):
+        world.update(2.0)
+    assert not world.events
+    assert world.region_store.effect_add[row][3] == 0.0
+
+def test_region_graph_sparse_products():
+    """Produits creux et voisins du graphe d'adjacence"""
+    from ena.core.region_graph import RegionGraph
+    graph = RegionGraph(4)
+    graph.connect(0, 1)
+    graph.connect(1, 2)
+    graph.connect(1, 0)
+    assert len(graph) == 2
+    assert list(graph.neighbors(1)) == [0, 2]
+    assert list(graph.neighbors(3)) == []
+
+    values = np.array([1.0, 2.0, 3.0, 4.0])
+    dense = np.zeros((4, 4))
+    for a, b in graph.edges:
+        dense[a, b] = dense[b, a] = 1.0
+    assert np.allclose(graph.multiply(values), dense @ values)
+    matrix = np.arange(8.0).reshape(4, 2)
+    assert np.allclose(graph.multiply(matrix), dense @ matrix)
+    assert np.allclose(graph.neighbor_mean(values), [2.0, 2.0, 2.0, 0.0])
+    assert list(graph.random_neighbors(np.array([1, 1, 3]), np.array([0.1, 0.9, 0.5]))) == [0, 2, 3]
+
+def test_weather_fronts_travel_between_neighbors(tmp_path):
+    """Les fronts se déplacent vers les voisins et la météo suit la pression"""
+    from ena.core.event_manager import EventManager
+    from ena.core.weather import WEATHER_TYPES
+    events = EventManager()
+    changes = []
+    events.subscribe("weather_changed", changes.append)
+
+    config = make_config(
+        tmp_path, simulation__seed=5, world__weather_change_probability=0.0,
+        world__weather__front_move_rate=1.0, world__weather__front_decay_rate=0.0,
+        world__weather__transition_rate=1.0
+    )
+    world = WorldManager(config, events)
+    for i in range(4):
+        neighbors = [f"region_{i + 1}"] if i < 3 else []
+        world.register_region(f"region_{i}", {"neighbors": neighbors})
+    assert world.get_neighbors("region_1") == ["region_0", "region_2"]
+    assert world.get_neighbors("region_3") == ["region_2"]
+
+    # Un front unique, déplacé à chaque seconde vers une région voisine
+    weather = world.weather_system
+    weather.front_rows = np.array([0], dtype=np.intp)
+    weather.front_strength = np.array([1.0])
+    visited = set()
+    for _ in range(10):
+        world.update(1.0)
+        assert weather.front_count == 1
+        row = int(weather.front_rows[0])
+        visited.add(row)
+        assert weather.pressure[row] == 1.0
+    assert len(visited) > 1
+
+    assert changes
+    regions = world.regions
+    for event in changes:
+        assert event.data["previous"] != event.data["weather"]
+    for region_id, region in regions.items():
+        assert region["state"]["weather"] == WEATHER_TYPES[weather.weather[world._region_rows[region_id]]]
+    assert 0.0 < regions["region_0"]["state"]["time_of_day"] < 1.0
+
+def test_faction_influence_diffuses_to_neighbors(tmp_path):
+    """Diffusion creuse identique au calcul dense, et faction dominante"""
+    world = WorldManager(make_config(
+        tmp_path, world__factions__diffusion_rate=0.05, world__factions__border_contest=3.0
+    ))
+    controls = [{"red": 1.0}, {"red": 0.5, "blue": 0.5}, {"blue": 2.0}, {}, {"green": 1.0}]
+    for i, control in enumerate(controls):
+        neighbors = [f"region_{i + 1}"] if i < 3 else []
+        world.register_region(f"region_{i}", {"initial_control": control, "neighbors": neighbors})
+    assert world.get_dominant_faction("region_2") == ("blue", 1.0)
+    assert world.get_dominant_faction("region_3") == (None, 0.0)
+
+    # Référence dense : parts normalisées, moyenne des voisins, lutte simultanée
+    names = ["red", "blue", "green"]
+    adjacency = np.zeros((5, 5))
+    for i in range(3):
+        adjacency[i, i + 1] = adjacency[i + 1, i] = 1.0
+    shares = np.array([[c.get(name, 0.0) for name in names] for c in controls])
+    for _ in range(3):
+        shares = shares / np.maximum(shares.sum(axis=1, keepdims=True), 1e-300)
+        degree = adjacency.sum(axis=1)
+        mean = adjacency @ shares / np.maximum(degree, 1)[:, None]
+        border = (degree > 0) & (shares.sum(axis=1) > 0) & (mean.argmax(axis=1) != shares.argmax(axis=1))
+        shares = shares + 0.05 * np.where(degree[:, None] > 0, mean - shares, 0.0)
+        rate = 0.1 * np.where(border, 3.0, 1.0)
+        present = shares > 0
+        shares = shares + rate[:, None] * (shares.sum(axis=1, keepdims=True) - 2.0 * shares)
+        shares = np.where(present, shares, 0.0)
+        world.update(1.0)
+
+    for i in range(5):
+        actual = world.get_region_state(f"region_{i}")["faction_control"]
+        assert [actual.get(name, 0.0) for name in names] == pytest.approx(shares[i].tolist())
+    # Influence arrivée par diffusion, sans atteindre la région isolée
+    assert list(world.get_region_state("region_3")["faction_control"]) == ["blue", "red"]
+    assert list(world.get_region_state("region_0")["faction_control"]) == ["red", "blue"]
+    assert list(world.get_region_state("region_4")["faction_control"]) == ["green"]
+
+    dominant, share = world.get_dominant_faction("region_2")
+    assert dominant == "blue"
+    assert share == pytest.approx(shares[2, 1] / shares[2].sum())
+    world.get_region_state("region_2")["faction_control"]["red"] = 10.0
+    assert world.get_dominant_faction("region_2")[0] == "red"
+
+def test_dormant_regions_catch_up_in_closed_form(tmp_path):
+    """Une région endormie rattrapée à son réveil suit l'intégration par tick"""
+    worlds = [
+        WorldManager(make_config(tmp_path, world__dormancy__enabled=enabled, world__dormancy__delay=5.0))
+        for enabled in (False, True)
+    ]
+    regions = {
+        "city": {"initial_population": 50000, "initial_danger": 20.0,
+                 "initial_resources": {"food": 1e6, "water": 5e5},
+                 "initial_control": {"red": 0.7, "blue": 0.2, "green": 0.1}},
+        "village": {"initial_population": 100, "initial_resources": {"food": 40.0},
+                    "initial_control": {"red": 1.0}},
+        "outpost": {"initial_population": 2000, "initial_resources": {"ore": 80.0}},
+        # Stock épuisé en cours de sommeil : la croissance s'arrête avec lui
+        "town": {"initial_population": 20000, "initial_resources": {"food": 5000.0}}
+    }
+    for world in worlds:
+        for region_id, data in regions.items():
+            world.register_region(region_id, data)
+    ticking, dormant = worlds
+    dormant.enter_region("outpost")
+
+    for _ in range(300):
+        for world in worlds:
+            world.update(1.0)
+    assert dormant.is_region_dormant("city")
+    assert dormant.is_region_dormant("village")
+    assert dormant.is_region_dormant("town")
+    assert not dormant.is_region_dormant("outpost")
+    assert not ticking.is_region_dormant("city")
+
+    for region_id in regions:
+        expected = ticking.get_region_state(region_id)
+        actual = dormant.get_region_state(region_id)
+        assert not dormant.is_region_dormant(region_id)
+        assert actual["population"] == pytest.approx(expected["population"], rel=1e-3)
+        assert dict(actual["resources"]) == pytest.approx(dict(expected["resources"]), rel=1e-3, abs=1e-6)
+        assert dict(actual["faction_control"]) == pytest.approx(dict(expected["faction_control"]), rel=1e-6)
+        for field, (low, high) in {"temperature": (-50, 50), "humidity": (0, 1)}.items():
+            assert low <= actual["environment"][field] <= high
+    assert dormant.get_region_state("village")["population"] == 100
+
+    # Un événement réveille la région et l'empêche de s'endormir
+    dormant.leave_region("outpost")
+    event_id = dormant.spawn_event("storm", "city", {"duration": 30.0})
+    for _ in range(20):
+        dormant.update(1.0)
+    assert not dormant.is_region_dormant("city")
+    assert dormant.is_region_dormant("village")
+    for _ in range(20):
+        dormant.update(1.0)
+    assert dormant.get_event_state(event_id)["active"] is False
+    assert dormant.is_region_dormant("city")
+    assert dormant.is_region_dormant("outpost")
+
+def test_fast_forward_matches_ticks_when_resources_run_out(tmp_path):
+    """Un saut de temps suit l'intégration par tick même quand les stocks s'épuisent"""
+    regions = {
+        "town": {"initial_population": 20000, "initial_resources": {"food": 5000.0}},
+        "camp": {"initial_population": 10000, "initial_danger": 50.0,
+                 "initial_resources": {"food": 3000.0, "water": 700.0, "ore": 60.0}}
+    }
+    worlds = [WorldManager(make_config(tmp_path, world__dormancy__enabled=False)) for _ in range(2)]
+    for world in worlds:
+        for region_id, data in regions.items():
+            world.register_region(region_id, data)
+    ticking, skipping = worlds
+
+    for _ in range(3000):
+        ticking.update(0.2)
+    skipping.fast_forward(600.0)
+
+    for region_id in regions:
+        expected = ticking.get_region_state(region_id)
+        actual = skipping.get_region_state(region_id)
+        assert actual["population"] == pytest.approx(expected["population"], rel=1e-3)
+        assert dict(actual["resources"]) == pytest.approx(dict(expected["resources"]), rel=1e-3, abs=1e-6)
+    assert skipping.get_region_state("town")["resources"]["food"] == 0.0
+
+def test_fast_forward_weather_matches_ticks(tmp_path):
+    """La météo d'un saut de temps suit, en fréquences, la météo tick par tick"""
+    # Taux accélérés pour atteindre le régime établi en peu de ticks
+    rates = dict(world__dormancy__enabled=False, world__max_regions=200,
+                 world__weather_change_probability=0.005,
+                 world__weather__front_move_rate=0.05,
+                 world__weather__front_decay_rate=0.01,
+                 world__weather__transition_rate=0.2,
+                 world__fast_forward_weather_step=12.0)
+    worlds = [WorldManager(make_config(tmp_path, simulation__seed=seed, **rates)) for seed in (1, 2)]
+    for world in worlds:
+        for i in range(200):
+            world.register_region(f"region_{i}", {
+                "initial_population": 100,
+                "neighbors": [f"region_{i + 1}"] if i < 199 else []
+            })
+    ticking, skipping = worlds
+
+    frequencies = [np.zeros(len(WEATHER_TYPES)), np.zeros(len(WEATHER_TYPES))]
+    for sample in range(70):
+        for _ in range(100):
+            ticking.rng.begin_tick()
+            ticking._step_weather(0.2)
+        skipping.fast_forward(20.0)
+        if sample >= 10:
+            for world, counts in zip(worlds, frequencies):
+                counts += np.bincount(world.weather_system.weather[:200], minlength=len(WEATHER_TYPES))
+    expected, actual = (counts / counts.sum() for counts in frequencies)
+    assert actual == pytest.approx(expected, abs=0.05)
+
+def test_fast_forward_twelve_hours(tmp_path):
+    """Saut de 12 heures : grands pas, événements terminés et résumé émis"""
+    import time
+    from ena.core.event_manager import EventManager
+    from ena.core.ai_manager import AIManager
+    events = EventManager()
+    digests = []
+    events.subscribe("world_fast_forward", digests.append)
+
+    config = make_config(tmp_path, simulation__seed=3, world__max_regions=1000)
+    world = WorldManager(config, events)
+    for i in range(1000):
+        world.register_region(f"region_{i}", {
+            "initial_population": 5000,
+            "initial_resources": {"food": 1e5},
+            "initial_control": {"red": 0.6, "blue": 0.4} if i % 2 else {"blue": 1.0},
+            "neighbors": [f"region_{i + 1}"] if i < 999 else []
+        })
+    event_id = world.spawn_event("heatwave", "region_3", {
+        "duration": 3600.0, "decay_rate": 0.001, "effects": {"temperature": 0.01}
+    })
+    ai = AIManager(make_config(tmp_path, simulation__seed=3, ai__state_backend="columnar"))
+    for i in range(50):
+        ai.register_npc(f"npc_{i}", {"position": [0.0, 0.0, 0.0]})
+
+    start = time.perf_counter()
+    digest = world.fast_forward(12 * 3600.0, ai)
+    assert time.perf_counter() - start < 1.0
+
+    assert digests and digests[0].data is digest
+    assert world.time == pytest.approx(12 * 3600.0)
+    assert digest["events_expired"] == [event_id]
+    assert world.get_event_state(event_id)["active"] is False
+    assert digest["population"]["after"] > digest["population"]["before"]
+    assert sum(digest["weather"].values()) == 1000
+    assert digest["npcs"]["npcs"] == 50
+    assert sum(digest["npcs"]["behaviors"].values()) == 50
+    assert ai.store.health[ai.store.active_slots()].min() == 100
+
+    # Les régions voisines se disputent l'influence : les parts restent des proportions
+    state = world.get_region_state("region_2")
+    assert set(state["faction_control"]) == {"red", "blue"}
+    assert all(0.0 <= share <= 1.0 for share in state["faction_control"].values())
+    assert -50.0 <= state["environment"]["temperature"] <= 50.0
+    assert world.is_region_dormant("region_500")
+
+def test_npc_membership_follows_positions(tmp_path):
+    """Index PNJ <-> région tenu à jour par les positions, avec événements"""
+    from ena.core.event_manager import EventManager, Event
+    events = EventManager()
+    moves = []
+    for event_type in ("npc_entered_region", "npc_left_region"):
+        events.subscribe(event_type, lambda event: moves.append((event.type, event.data["npc_id"], event.data["region_id"])))
+
+    world = WorldManager(make_config(tmp_path), events)
+    world.register_region("west", {"bounds": {"min": [0, -10, 0], "max": [100, 10, 100]}})
+    world.register_region("east", {"bounds": {"min": [100, -10, 0], "max": [200, 10, 100]}})
+    world.register_region("limbo", {})
+
+    for i in range(3):
+        world.handle_npc_spawn(Event("npc_spawn", {"id": f"npc_{i}", "region_id": "west", "position": [10.0 * i, 0, 10]}))
+    assert world.get_region_npcs("west") == ["npc_0", "npc_1", "npc_2"]
+    assert world.regions["west"]["npcs"] == {"npc_0": None, "npc_1": None, "npc_2": None}
+
+    moves.clear()
+    transitions = world.update_npc_positions({
+        "npc_0": [150.0, 0, 50],   # passe à l'est
+        "npc_1": [100.0, 0, 50],   # frontière commune : reste à l'ouest
+        "npc_2": [500.0, 0, 50],   # hors de toute région : reste à l'ouest
+        "ghost": [150.0, 0, 50]
+    })
+    assert transitions == [("npc_0", "west", "east")]
+    assert moves == [("npc_left_region", "npc_0", "west"), ("npc_entered_region", "npc_0", "east")]
+    assert world.get_npc_region("npc_0") == "east"
+    assert world.get_region_npcs("west") == ["npc_1", "npc_2"]
+    assert world.get_region_npcs("east") == ["npc_0"]
+    assert world.npcs["npc_2"]["position"] == [500.0, 0.0, 50.0]
+
+    events.subscribe("npc_move", world.handle_npc_move)
+    events.emit(Event("npc_move", {"id": "npc_2", "position": [120.0, 5.0, 5.0]}))
+    assert world.get_region_npcs("east") == ["npc_0", "npc_2"]
+    assert world.npcs["npc_2"]["region_id"] == "east"
+
+    moves.clear()
+    assert world.remove_npc("npc_0")
+    assert moves == [("npc_left_region", "npc_0", "east")]
+    assert world.get_region_npcs("east") == ["npc_2"]
+    assert world.get_npc_region("npc_0") is None
+
+@pytest.mark.parametrize("backend", ["dict", "columnar"])
+def test_event_rewards_are_applied_in_one_batch(tmp_path, backend):
+    """Récompenses régionales partagées entre les PNJ présents, appliquées en fin de tick"""
+    from ena.core.event_manager import Event
+    from ena.core.ai_manager import AIManager
+    from ena.core.faction_manager import FactionManager
+    config = make_config(tmp_path, ai__state_backend=backend, ai__max_npcs=8)
+    world = WorldManager(config)
+    ai = AIManager(config)
+    factions = FactionManager(config)
+    factions.create_faction("duty", {})
+    factions.create_faction("freedom", {})
+    world.attach_managers(ai, factions)
+    world.register_region("zone", {})
+
+    for i in range(3):
+        ai.register_npc(f"npc_{i}", {"faction": "freedom", "initial_inventory": {"bread": 1}})
+        world.handle_npc_spawn(Event("npc_spawn", {"id": f"npc_{i}", "region_id": "zone"}))
+    world.handle_npc_spawn(Event("npc_spawn", {"id": "stranger", "region_id": "zone"}))
+
+    rewards = {
+        "experience": 100,
+        "resources": {"artifact": 5, "bread": 2},
+        "reputation": {"duty": 4.0, "monolith": 1.0}
+    }
+    # Sans PNJ affectés ni récompense régionale demandée, rien n'est attribué
+    unclaimed = world.spawn_event("anomaly", "zone", {"duration": 1.0, "rewards": rewards})
+    event_id = world.spawn_event("emission", "zone", {"duration": 1.0, "rewards": rewards, "reward_region": True})
+    world.update(2.0)
+    assert world.get_reward_history(event_id=unclaimed) == []
+
+    experience = [ai.states[f"npc_{i}"]["experience"] for i in range(3)]
+    assert experience == [25.0, 25.0, 25.0]
+    inventories = [dict(ai.states[f"npc_{i}"]["inventory"]) for i in range(3)]
+    assert [inventory.get("artifact", 0) for inventory in inventories] == [2, 1, 1]
+    assert [inventory["bread"] for inventory in inventories] == [2, 2, 1]
+    assert factions.get_reputation("duty", "npc_0") == 1.0
+    assert factions.get_reputation("duty", "stranger") == 1.0
+
+    history = world.get_reward_history(event_id=event_id)
+    assert len(history) == 4 * 5
+    assert sum(entry["amount"] for entry in history if entry["type"] == "experience") == 100
+    stranger = world.get_reward_history(npc_id="stranger")
+    assert {(entry["type"], entry["applied"]) for entry in stranger} == {
+        ("experience", False), ("resources", False), ("reputation", True), ("reputation", False)
+    }
+    assert not any(entry["applied"] for entry in history if entry["key"] == "monolith")
+    assert len(world.rewards) == 0
+
+def test_resource_registry_regenerates_and_finds_nearest(tmp_path):
+    """Gisements régénérés en un pas vectoriel, recherche du plus proche disponible"""
+    world = WorldManager(make_config(tmp_path, world__resource_capacity=2))
+    assert world.register_resource("herb_far", {"type": "herb", "position": [300, 0, 0], "amount": 5.0,
+                                                "max_amount": 10.0, "regeneration_rate": 0.1, "curve": "saturating"})
+    assert world.register_resource("herb_near", {"type": "herb", "position": [10, 0, 0], "amount": 0.0,
+                                                 "max_amount": 10.0, "regeneration_rate": 0.5})
+    assert world.register_resource("stash", {"type": "stash", "position": [0, 0, 0], "amount": 3, "curve": "none"})
+    assert world.register_resource("colony", {"type": "mushroom", "position": [0, 0, 5], "amount": 1.0,
+                                              "max_amount": 100.0, "regeneration_rate": 0.2, "curve": "logistic"})
+    assert not world.register_resource("bad", {"type": "herb", "curve": "logistic"})
+
+    # Seul le gisement approvisionné est trouvé
+    assert world.find_nearest_resource("herb", [0, 0, 0]) == ("herb_far", 300.0)
+    assert world.find_nearest_resource("herb", [0, 0, 0], max_radius=100) is None
+    assert world.find_nearest_resource("herb", [0, 0, 0], min_amount=5.0) is None
+
+    world.update(4.0)
+    resources = world.resources
+    assert resources.get("herb_near")["amount"] == pytest.approx(2.0)
+    assert resources.get("herb_far")["amount"] == pytest.approx(10 - 5 * np.exp(-0.4))
+    assert resources.get("stash")["amount"] == 3
+    assert resources.get("colony")["amount"] == pytest.approx(100 / (1 + 99 * np.exp(-0.8)))
+    assert world.find_nearest_resource("herb", [0, 0, 0]) == ("herb_near", 10.0)
+    assert world.find_nearest_resource("herb", [0, 0, 0], min_amount=5.0)[0] == "herb_far"
+
+    assert world.harvest_resource("herb_near", 5.0) == pytest.approx(2.0)
+    assert world.find_nearest_resource("herb", [0, 0, 0])[0] == "herb_far"
+    assert world.harvest_resource("stash", 1) == 1
+    assert resources.unregister("stash")
+    assert world.find_nearest_resource("stash", [0, 0, 0]) is None
+    assert len(resources) == 3